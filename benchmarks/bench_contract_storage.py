@@ -0,0 +1,104 @@
+"""
+Bytes per row and insert latency of the legacy and slim ``contracts`` layouts.
+
+Without ``--supabase-url`` only payload sizes are measured. With it, rows are
+inserted in both layouts (run it against a database where the legacy
+``analysis`` column still exists, or against benchmarks.mock_postgrest).
+
+Usage:
+    python -m benchmarks.bench_contract_storage --rows 2000 --output storage.json
+    python -m benchmarks.bench_contract_storage --supabase-url http://127.0.0.1:9200 --supabase-key mock
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Callable
+
+from services.contract_storage import ANALYSIS_COLUMNS, contract_row, payload_bytes
+
+
+def build_analysis(rng: random.Random) -> dict[str, Any]:
+    """One synthetic analysis shaped like the model's output."""
+    return {
+        "contract_type": rng.choice(["NDA", "MSA", "SOW", "Lease", "Employment Agreement"]),
+        "parties": [f"Acme {rng.randint(1, 999)} Inc.", f"Globex {rng.randint(1, 999)} LLC"],
+        "key_dates": [f"20{rng.randint(18, 27)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                      for _ in range(rng.randint(1, 5))],
+        "key_terms": rng.sample(["Confidentiality", "Auto-renewal", "Net 30", "Indemnification",
+                                 "Limitation of liability", "Termination for convenience",
+                                 "Governing law: New York", "Exclusivity", "Non-solicitation"], 4),
+        "risk_level": rng.choice(["Low", "Medium", "High"]),
+        "summary": " ".join(rng.choice(["mutual", "services", "agreement", "fees", "term",
+                                        "liability", "capped", "renewal", "notice", "party"])
+                            for _ in range(rng.randint(25, 60))),
+    }
+
+
+def legacy_row(metadata: dict[str, Any], analysis: dict[str, Any]) -> dict[str, Any]:
+    """Insert payload as written before the slim layout."""
+    row = contract_row(metadata, analysis)
+    del row["analysis_extra"]
+    row["analysis"] = analysis
+    return row
+
+
+def _time_inserts(insert: Callable[[dict], Any], rows: list[dict]) -> dict[str, float]:
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        insert(row)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+    }
+
+
+def run(rows: int, seed: int, supabase_url: str = None, supabase_key: str = None) -> dict:
+    """Compare both layouts over ``rows`` synthetic analyses."""
+    rng = random.Random(seed)
+    metadata = {"filename": "contract.pdf", "pages": 12, "file_size": 184320, "content_type": "application/pdf"}
+    analyses = [build_analysis(rng) for _ in range(rows)]
+    layouts = {
+        "legacy": [legacy_row(metadata, a) for a in analyses],
+        "slim": [contract_row(metadata, a) for a in analyses],
+    }
+
+    result: dict[str, Any] = {"benchmark": "contract_storage", "rows": rows, "typed_columns": list(ANALYSIS_COLUMNS)}
+    for name, payloads in layouts.items():
+        result[name] = {"payload_bytes_per_row": round(statistics.fmean(payload_bytes(p) for p in payloads), 1)}
+    result["payload_reduction"] = round(
+        1 - result["slim"]["payload_bytes_per_row"] / result["legacy"]["payload_bytes_per_row"], 3)
+
+    if supabase_url:
+        from supabase import create_client
+
+        table = create_client(supabase_url, supabase_key).table("contracts")
+        for name, payloads in layouts.items():
+            result[name]["insert"] = _time_inserts(lambda row: table.insert(row).execute(), payloads)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--supabase-url", help="Also time inserts against this PostgREST endpoint")
+    parser.add_argument("--supabase-key", default="mock")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.seed, args.supabase_url, args.supabase_key)
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Document conversion benchmark for ``ContractProcessor``.
+
+Generates the fixed corpus from ``benchmarks.corpus`` (PDF, DOCX and TXT at
+1/10/50/200 pages) and measures, per file, docling ``convert`` time,
+``export_to_markdown`` time, end-to-end ``ContractProcessor.process`` time,
+pages/sec and peak RSS. Every case runs in a fresh interpreter so peak RSS
+and cold-start costs are not polluted by earlier cases.
+
+Usage:
+    python -m benchmarks.bench_docling --repeat 3 --output bench_docling.json
+    python -m benchmarks.bench_docling --formats pdf --pages 1 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import FORMATS, PAGE_COUNTS, build_corpus
+
+
+def _rss_mb() -> float:
+    """Peak RSS of this process in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure_case(path: str, pages: int, repeat: int) -> dict:
+    """
+    Measure one corpus file in the current process.
+
+    The first conversion is reported separately as ``cold_convert_s`` since it
+    includes model loading; the remaining timings are medians over ``repeat``
+    warm runs.
+    """
+    rss_start = _rss_mb()
+
+    start = time.perf_counter()
+    from services.document_processor import ContractProcessor
+    processor = ContractProcessor()
+    pipeline = processor.choose_pipeline(Path(path))
+    converter = processor._converter_for(pipeline)
+    init_s = time.perf_counter() - start
+    rss_after_init = _rss_mb()
+
+    start = time.perf_counter()
+    result = converter.convert(path)
+    cold_convert_s = time.perf_counter() - start
+
+    convert_times, export_times, process_times = [], [], []
+    markdown = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = converter.convert(path)
+        convert_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        markdown = result.document.export_to_markdown()
+        export_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        asyncio.run(processor.process(path))
+        process_times.append(time.perf_counter() - start)
+
+    convert_s = statistics.median(convert_times)
+    return {
+        "pipeline": pipeline.value,
+        "init_s": round(init_s, 4),
+        "cold_convert_s": round(cold_convert_s, 4),
+        "convert_s": round(convert_s, 4),
+        "export_markdown_s": round(statistics.median(export_times), 4),
+        "process_s": round(statistics.median(process_times), 4),
+        "pages_per_sec": round(pages / convert_s, 2) if convert_s else None,
+        "reported_pages": len(getattr(result.document, "pages", {}) or {}),
+        "markdown_chars": len(markdown),
+        "rss_start_mb": rss_start,
+        "rss_after_init_mb": rss_after_init,
+        "peak_rss_mb": _rss_mb(),
+    }
+
+
+def run_case(entry: dict, repeat: int, timeout: float) -> dict:
+    """Run ``measure_case`` for one corpus entry in a child interpreter."""
+    command = [
+        sys.executable, "-m", "benchmarks.bench_docling",
+        "--case", entry["path"], "--case-pages", str(entry["pages"]),
+        "--repeat", str(repeat),
+    ]
+    case = {k: entry[k] for k in ("format", "pages", "size_bytes")}
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, text=True, timeout=timeout,
+            cwd=Path(__file__).resolve().parents[1],
+            env={**os.environ, "LOG_LEVEL": "WARNING"},
+        )
+    except subprocess.TimeoutExpired:
+        return {**case, "error": f"timed out after {timeout}s"}
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {**case, "error": lines[-1] if lines else f"exit code {completed.returncode}"}
+    return {**case, **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def run(
+    formats: tuple[str, ...],
+    page_counts: tuple[int, ...],
+    repeat: int,
+    corpus_dir: Path,
+    timeout: float
+) -> dict:
+    """Generate the corpus and benchmark every (format, pages) case."""
+    manifest = build_corpus(corpus_dir, formats, page_counts)
+    cases = []
+    for entry in manifest:
+        result = run_case(entry, repeat, timeout)
+        print(f"{entry['format']:>4} {entry['pages']:>4}p  "
+              f"{result.get('convert_s', '-')}s  {result.get('error', '')}", file=sys.stderr)
+        cases.append(result)
+
+    try:
+        from importlib.metadata import version
+        docling_version = version("docling")
+    except Exception:
+        docling_version = None
+
+    return {
+        "benchmark": "docling_conversion",
+        "docling_version": docling_version,
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--pages", nargs="+", type=int, default=list(PAGE_COUNTS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=1800, help="Per-case timeout in seconds")
+    parser.add_argument("--corpus-dir", help="Keep the generated corpus in this directory")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--case-pages", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(measure_case(args.case, args.case_pages, args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="docling-corpus-") as tmp:
+        result = run(
+            tuple(args.formats), tuple(args.pages), args.repeat,
+            Path(args.corpus_dir or tmp), args.timeout,
+        )
+
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Cold-start import profile of the API module.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter and
+reports total import time, the slowest modules by cumulative time and
+whether heavy dependencies (docling, torch) were imported before the server
+could bind. With ``--max-ms`` it exits non-zero when the import budget is
+exceeded, or when a module listed in ``--forbid`` was imported.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5 --output bench_import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HEAVY_MODULES = ("docling", "torch", "transformers", "easyocr")
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse ``-X importtime`` lines into {module, self_us, cumulative_us}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def profile_once(module: str) -> tuple[float, list[dict]]:
+    """Import ``module`` in a fresh interpreter; return wall ms and import rows."""
+    env = {"OPENAI_API_KEY": "bench", "LOG_LEVEL": "WARNING", **os.environ}
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return wall_ms, parse_importtime(completed.stderr)
+
+
+def run(module: str, repeat: int, top: int) -> dict:
+    """Profile ``module`` imports ``repeat`` times and summarize the median run."""
+    runs = [profile_once(module) for _ in range(repeat)]
+    walls = [wall for wall, _ in runs]
+    median_wall = statistics.median(walls)
+    _, rows = min(runs, key=lambda run: abs(run[0] - median_wall))
+
+    top_level = {}
+    for row in rows:
+        root = row["module"].split(".")[0]
+        if row["module"] == root:
+            top_level[root] = row["cumulative_us"]
+
+    imported = {row["module"].split(".")[0] for row in rows}
+    return {
+        "benchmark": "import_time",
+        "module": module,
+        "repeat": repeat,
+        "wall_ms": {
+            "median": round(median_wall, 1),
+            "min": round(min(walls), 1),
+            "max": round(max(walls), 1),
+        },
+        "import_ms": round(sum(row["self_us"] for row in rows) / 1000, 1),
+        "modules_imported": len(rows),
+        "heavy_modules_imported": sorted(imported & set(HEAVY_MODULES)),
+        "slowest_packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(top_level.items(), key=lambda kv: -kv[1])[:top]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, help="Fail if median wall time exceeds this")
+    parser.add_argument("--forbid", nargs="*", default=list(HEAVY_MODULES),
+                        help="Fail if any of these packages is imported (with --max-ms)")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    result = run(args.module, args.repeat, args.top)
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+    print(payload)
+
+    if args.max_ms is not None:
+        violations = []
+        if result["wall_ms"]["median"] > args.max_ms:
+            violations.append(f"import took {result['wall_ms']['median']}ms > {args.max_ms}ms")
+        forbidden = sorted(set(result["heavy_modules_imported"]) & set(args.forbid))
+        if forbidden:
+            violations.append(f"heavy modules imported at startup: {', '.join(forbidden)}")
+        if violations:
+            print("Import budget exceeded:\n  " + "\n  ".join(violations), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
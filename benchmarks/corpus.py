@@ -0,0 +1,195 @@
+"""
+Deterministic, license-free contract corpus for document conversion benchmarks.
+
+Writes the same synthetic contract text as PDF (text layer, one Helvetica
+font), DOCX (explicit page breaks) and TXT (form feeds between pages) at a
+requested page count, without any third-party writer libraries.
+
+Usage:
+    python -m benchmarks.corpus --output-dir corpus --pages 1 10 50 200
+"""
+import argparse
+import random
+import textwrap
+import zipfile
+from pathlib import Path
+
+from benchmarks.bench_rule_extractor import build_document
+
+FORMATS = ("pdf", "docx", "txt")
+PAGE_COUNTS = (1, 10, 50, 200)
+
+LINES_PER_PAGE = 46
+CHARS_PER_LINE = 90
+
+
+def build_pages(pages: int, seed: int = 7) -> list[list[str]]:
+    """Lay out synthetic contract text as ``pages`` pages of wrapped lines."""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    sections = 12
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines = []
+        for paragraph in build_document(rng, sections).split("\n\n"):
+            lines.extend(textwrap.wrap(paragraph.lstrip("# "), CHARS_PER_LINE) or [""])
+            lines.append("")
+        sections *= 2
+    return [
+        lines[i * LINES_PER_PAGE:(i + 1) * LINES_PER_PAGE]
+        for i in range(pages)
+    ]
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    """Write a minimal PDF 1.4 file with one text-layer page per entry."""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects: dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: (
+            f"<< /Type /Pages /Count {len(pages)} /Kids ["
+            + " ".join(f"{pid} 0 R" for pid in page_ids)
+            + "] >>"
+        ).encode(),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, lines in zip(page_ids, pages):
+        stream = "BT /F1 10 Tf 14 TL 56 770 Td\n" + "".join(
+            f"({_pdf_escape(line)}) '\n" for line in lines
+        ) + "ET"
+        data = stream.encode("latin-1")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        ).encode()
+        objects[page_id + 1] = (
+            f"<< /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for obj_id in sorted(objects):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    path.write_bytes(bytes(out))
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def write_docx(path: Path, pages: list[list[str]]) -> None:
+    """Write a minimal DOCX with one paragraph per text block and page breaks."""
+    body = []
+    for index, lines in enumerate(pages):
+        if index:
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        paragraph: list[str] = []
+        for line in lines + [""]:
+            if line:
+                paragraph.append(line)
+                continue
+            if paragraph:
+                body.append(
+                    '<w:p><w:r><w:t xml:space="preserve">'
+                    + _xml_escape(" ".join(paragraph))
+                    + "</w:t></w:r></w:p>"
+                )
+                paragraph = []
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        "<w:body>" + "".join(body) + "</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+
+
+def write_txt(path: Path, pages: list[list[str]]) -> None:
+    """Write plain text with form feeds between pages."""
+    path.write_text("\f".join("\n".join(lines) for lines in pages), encoding="utf-8")
+
+
+_WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+
+def build_corpus(
+    output_dir: Path,
+    formats: tuple[str, ...] = FORMATS,
+    page_counts: tuple[int, ...] = PAGE_COUNTS,
+    seed: int = 7
+) -> list[dict]:
+    """
+    Write the corpus and return one manifest entry per file.
+
+    Args:
+        output_dir: Directory to write into (created if missing)
+        formats: Subset of ``pdf``, ``docx``, ``txt``
+        page_counts: Page counts to generate for every format
+        seed: Seed for the synthetic contract text
+
+    Returns:
+        List of ``{"format", "pages", "path", "size_bytes"}`` entries
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for pages in page_counts:
+        layout = build_pages(pages, seed)
+        for fmt in formats:
+            path = output_dir / f"contract_{pages:03d}p.{fmt}"
+            _WRITERS[fmt](path, layout)
+            manifest.append({
+                "format": fmt,
+                "pages": pages,
+                "path": str(path),
+                "size_bytes": path.stat().st_size,
+            })
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default="corpus")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--pages", nargs="+", type=int, default=list(PAGE_COUNTS))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for entry in build_corpus(Path(args.output_dir), tuple(args.formats), tuple(args.pages), args.seed):
+        print(f"{entry['path']}\t{entry['size_bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Load-test driver for ``POST /api/v1/analyze``.
+
+Sends contracts at a fixed concurrency and reports throughput, error rate
+and p50/p95/p99 latency overall and per stage (from the ``Server-Timing``
+header). With ``--thresholds`` it exits non-zero when a budget is exceeded,
+so it can gate CI against performance regressions.
+
+Usage:
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 \\
+        --concurrency 16 --requests 400 --thresholds benchmarks/thresholds.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+
+import httpx
+
+from benchmarks.bench_rule_extractor import build_document
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of a list (q in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """Parse ``stage;dur=12.3, other;dur=4`` into milliseconds per stage."""
+    timings = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "dur" and name:
+                timings[name.strip()] = float(value)
+    return timings
+
+
+async def run(
+    url: str,
+    payload: bytes,
+    filename: str,
+    concurrency: int,
+    total: int,
+    query: str = ""
+) -> dict:
+    """Drive the analyze endpoint and aggregate latencies."""
+    endpoint = f"{url.rstrip('/')}/api/v1/analyze{query}"
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    remaining = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    endpoint, files={"file": (filename, payload, "application/octet-stream")}
+                )
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            if response.status_code == 200:
+                latencies["total"].append((time.perf_counter() - start) * 1000)
+                for stage, ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    latencies[stage].append(ms)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    return {
+        "benchmark": "analyze_load",
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - ok / total, 4) if total else 0.0,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency_ms": {
+            stage: {
+                f"p{q}": round(percentile(values, q), 1) for q in (50, 95, 99)
+            }
+            for stage, values in latencies.items()
+        },
+    }
+
+
+def check_thresholds(result: dict, thresholds: dict) -> list[str]:
+    """Return human-readable budget violations (empty if within budget)."""
+    violations = []
+    if result["throughput_rps"] < thresholds.get("min_throughput_rps", 0):
+        violations.append(
+            f"throughput {result['throughput_rps']} rps < {thresholds['min_throughput_rps']}"
+        )
+    if result["error_rate"] > thresholds.get("max_error_rate", 1):
+        violations.append(f"error rate {result['error_rate']} > {thresholds['max_error_rate']}")
+    for key, budgets in thresholds.items():
+        if not key.startswith("max_p") or not isinstance(budgets, dict):
+            continue
+        q = key[len("max_"):-len("_ms")]
+        for stage, budget in budgets.items():
+            observed = result["latency_ms"].get(stage, {}).get(q)
+            if observed is None:
+                violations.append(f"no {q} latency recorded for stage '{stage}'")
+            elif observed > budget:
+                violations.append(f"{stage} {q} {observed}ms > {budget}ms")
+    return violations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--file", help="Contract to upload (default: generated markdown contract)")
+    parser.add_argument("--mode", choices=["full", "rules_only"], default="full")
+    parser.add_argument("--thresholds", help="JSON file with performance budgets")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as fh:
+            payload, filename = fh.read(), args.file.rsplit("/", 1)[-1]
+    else:
+        payload = build_document(random.Random(7), sections=40).encode("utf-8")
+        filename = "load_test_contract.md"
+
+    query = f"?mode={args.mode}"
+    if args.warmup:
+        asyncio.run(run(args.url, payload, filename, 1, args.warmup, query))
+    result = asyncio.run(
+        run(args.url, payload, filename, args.concurrency, args.requests, query)
+    )
+
+    payload_json = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload_json)
+    print(payload_json)
+
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as fh:
+            violations = check_thresholds(result, json.load(fh))
+        if violations:
+            print("Performance budget exceeded:\n  " + "\n  ".join(violations), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
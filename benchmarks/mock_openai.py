@@ -0,0 +1,177 @@
+"""
+Offline OpenAI-compatible stand-in for load tests and CI.
+
+Serves ``POST /v1/chat/completions`` with configurable latency
+distributions, error rates, periodic 429 bursts and canned valid or
+malformed JSON analyses. Point the API at it with
+``OPENAI_BASE_URL=http://127.0.0.1:9100/v1``.
+
+Usage:
+    python -m benchmarks.mock_openai --port 9100 --latency lognormal:0.8:0.4 \\
+        --error-rate 0.01 --malformed-rate 0.02 --burst-every 30 --burst-duration 2
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+CANNED_ANALYSIS = {
+    "contract_type": "NDA",
+    "parties": ["Acme Inc.", "Globex LLC"],
+    "key_dates": ["2024-01-01"],
+    "key_terms": ["Confidentiality", "Two-year term"],
+    "risk_level": "Low",
+    "summary": "Mutual NDA between Acme and Globex with a two-year term.",
+}
+
+
+class MockOpenAIConfig(BaseModel):
+    """Behaviour of the mock OpenAI server."""
+
+    latency: str = Field(
+        default="constant:0.05",
+        description="constant:S | uniform:LO:HI | lognormal:MEDIAN:SIGMA | exponential:MEAN (seconds)",
+    )
+    error_rate: float = Field(default=0.0, description="Fraction of requests answered with HTTP 500")
+    malformed_rate: float = Field(default=0.0, description="Fraction of completions that are not JSON")
+    burst_every_s: float = Field(default=0.0, description="Start a 429 burst every N seconds (0 = never)")
+    burst_duration_s: float = Field(default=0.0, description="Length of each 429 burst")
+    canned_response: Optional[dict] = Field(default=None, description="Analysis JSON to return")
+    seed: Optional[int] = Field(default=None, description="Random seed for reproducible runs")
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Draw one latency (seconds) from a distribution spec."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(":") if v]
+    if kind == "constant":
+        return values[0]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exponential":
+        return rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def create_app(config: Optional[MockOpenAIConfig] = None) -> FastAPI:
+    """Build the mock OpenAI ASGI app."""
+    config = config or MockOpenAIConfig()
+    rng = random.Random(config.seed)
+    started = time.monotonic()
+    canned = json.dumps(config.canned_response or CANNED_ANALYSIS)
+    stats = {"requests": 0, "errors": 0, "throttled": 0, "malformed": 0}
+
+    app = FastAPI(title="Mock OpenAI")
+    app.state.stats = stats
+
+    def in_burst() -> bool:
+        if config.burst_every_s <= 0:
+            return False
+        return (time.monotonic() - started) % config.burst_every_s < config.burst_duration_s
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        if in_burst():
+            stats["throttled"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": "1"},
+                content={"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+            )
+
+        await asyncio.sleep(sample_latency(config.latency, rng))
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Mock server error", "type": "server_error"}},
+            )
+
+        content = canned
+        if rng.random() < config.malformed_rate:
+            stats["malformed"] += 1
+            content = "Sorry, I cannot produce JSON for this contract."
+
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="constant:0.05")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-duration", type=float, default=0.0)
+    parser.add_argument("--canned-response", help="Path to a JSON analysis to return")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned_response:
+        with open(args.canned_response, encoding="utf-8") as fh:
+            canned = json.load(fh)
+
+    import uvicorn
+
+    uvicorn.run(
+        create_app(MockOpenAIConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            burst_every_s=args.burst_every,
+            burst_duration_s=args.burst_duration,
+            canned_response=canned,
+            seed=args.seed,
+        )),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+In-memory Supabase/PostgREST stand-in for load tests and CI.
+
+Implements the subset of PostgREST the services use: insert, select with
+``eq/neq/lt/lte/gt/gte/in/is`` and ``or=(...)`` filters, ordering, limit and
+offset, update, delete and canned RPC responses. Point the API at it with
+``SUPABASE_URL=http://127.0.0.1:9200 SUPABASE_KEY=mock``.
+
+Usage:
+    python -m benchmarks.mock_postgrest --port 9200 --latency constant:0.005
+"""
+import argparse
+import asyncio
+import random
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from benchmarks.mock_openai import sample_latency
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+_OR_TERM_RE = re.compile(r"(and|or)\((.*)\)$")
+
+
+def _coerce(value: Any, raw: str) -> Any:
+    """Coerce a query-string operand to the type of the stored value."""
+    if isinstance(value, bool):
+        return raw == "true"
+    if isinstance(value, int):
+        return int(raw)
+    if isinstance(value, float):
+        return float(raw)
+    return raw
+
+
+def _split_top_level(expr: str) -> list[str]:
+    """Split ``a,b(c,d),e`` on commas that are not nested in parentheses."""
+    parts, depth, current = [], 0, []
+    for char in expr:
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _predicate(column: str, operand: str) -> Callable[[dict], bool]:
+    """Build a row predicate for ``column=op.value``."""
+    negate = operand.startswith("not.")
+    if negate:
+        operand = operand[4:]
+    op, _, raw = operand.partition(".")
+    raw = raw.strip('"')
+
+    def check(row: dict) -> bool:
+        value = row.get(column)
+        if op == "is":
+            result = value is None if raw == "null" else value == (raw == "true")
+        elif value is None:
+            result = False
+        elif op == "in":
+            options = [v.strip('"') for v in raw.strip("()").split(",")]
+            result = str(value) in options
+        else:
+            other = _coerce(value, raw)
+            result = {
+                "eq": value == other,
+                "neq": value != other,
+                "lt": value < other,
+                "lte": value <= other,
+                "gt": value > other,
+                "gte": value >= other,
+            }.get(op, False)
+        return not result if negate else result
+
+    return check
+
+
+def _logical(kind: str, expr: str) -> Callable[[dict], bool]:
+    """Build a predicate for PostgREST ``or=(...)`` / ``and(...)`` groups."""
+    checks = []
+    for term in _split_top_level(expr):
+        nested = _OR_TERM_RE.match(term)
+        if nested:
+            checks.append(_logical(nested.group(1), nested.group(2)))
+        else:
+            column, _, operand = term.partition(".")
+            checks.append(_predicate(column, operand))
+    if kind == "or":
+        return lambda row: any(check(row) for check in checks)
+    return lambda row: all(check(row) for check in checks)
+
+
+class MockPostgrest:
+    """Table storage and query evaluation for the stand-in."""
+
+    def __init__(self, rpc_responses: Optional[dict[str, Any]] = None):
+        self.tables: dict[str, list[dict]] = {}
+        self.rpc_responses = rpc_responses or {}
+
+    def filter_rows(self, table: str, params: dict[str, str]) -> list[dict]:
+        rows = self.tables.get(table, [])
+        checks = []
+        for key, value in params.items():
+            if key in _RESERVED_PARAMS:
+                continue
+            if key in ("or", "and"):
+                checks.append(_logical(key, value[1:-1] if value.startswith("(") else value))
+            else:
+                checks.append(_predicate(key, value))
+        return [row for row in rows if all(check(row) for check in checks)]
+
+    def select(self, table: str, params: dict[str, str]) -> list[dict]:
+        rows = self.filter_rows(table, params)
+
+        for term in reversed(params.get("order", "").split(",")):
+            if not term:
+                continue
+            column, _, direction = term.partition(".")
+            rows = sorted(
+                rows,
+                key=lambda row: (row.get(column) is None, row.get(column)),
+                reverse=direction.startswith("desc"),
+            )
+
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        rows = rows[offset:offset + int(limit) if limit else None]
+
+        columns = [
+            c.strip() for c in params.get("select", "*").split(",")
+            if c.strip() and "(" not in c
+        ]
+        if columns and "*" not in columns:
+            rows = [{c: row.get(c) for c in columns} for row in rows]
+        return rows
+
+    def insert(self, table: str, payload: Any) -> list[dict]:
+        rows = payload if isinstance(payload, list) else [payload]
+        now = datetime.now(timezone.utc).isoformat()
+        stored = []
+        for row in rows:
+            record = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **row}
+            self.tables.setdefault(table, []).append(record)
+            stored.append(record)
+        return stored
+
+    def update(self, table: str, params: dict[str, str], changes: dict) -> list[dict]:
+        rows = self.filter_rows(table, params)
+        for row in rows:
+            row.update(changes)
+        return rows
+
+    def delete(self, table: str, params: dict[str, str]) -> list[dict]:
+        doomed = self.filter_rows(table, params)
+        ids = {id(row) for row in doomed}
+        self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in ids]
+        return doomed
+
+
+def create_app(
+    latency: str = "constant:0",
+    rpc_responses: Optional[dict[str, Any]] = None,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """Build the mock PostgREST ASGI app."""
+    store = MockPostgrest(rpc_responses)
+    rng = random.Random(seed)
+    app = FastAPI(title="Mock PostgREST")
+    app.state.store = store
+
+    def wants_representation(request: Request) -> bool:
+        return "return=representation" in request.headers.get("prefer", "")
+
+    @app.middleware("http")
+    async def add_latency(request: Request, call_next):
+        await asyncio.sleep(sample_latency(latency, rng))
+        return await call_next(request)
+
+    @app.post("/rest/v1/rpc/{function}")
+    async def rpc(function: str):
+        return store.rpc_responses.get(function, [])
+
+    @app.get("/rest/v1/{table}")
+    async def select(table: str, request: Request):
+        return store.select(table, dict(request.query_params))
+
+    @app.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        rows = store.insert(table, await request.json())
+        if wants_representation(request):
+            return JSONResponse(status_code=201, content=rows)
+        return Response(status_code=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update(table: str, request: Request):
+        rows = store.update(table, dict(request.query_params), await request.json())
+        return rows if wants_representation(request) else Response(status_code=204)
+
+    @app.delete("/rest/v1/{table}")
+    async def delete(table: str, request: Request):
+        rows = store.delete(table, dict(request.query_params))
+        return rows if wants_representation(request) else Response(status_code=204)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency", default="constant:0")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(
+        create_app(latency=args.latency, seed=args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -28,12 +28,39 @@ class Settings(BaseSettings):
 
     # OpenAI Settings
     openai_api_key: str
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint (e.g. local stand-in)
     openai_model: str = "gpt-4o-mini"
     openai_max_tokens: int = 800
     openai_temperature: float = 0.0
     openai_timeout: int = 60
     openai_max_retries: int = 3
 
+    # Hedged Requests (duplicate slow OpenAI calls, first response wins)
+    openai_hedge_enabled: bool = False
+    openai_hedge_percentile: float = 0.95
+    openai_hedge_budget_ratio: float = 0.05  # max extra requests per request
+    openai_hedge_min_delay_ms: int = 500
+    openai_hedge_min_samples: int = 20
+
+    # Model Routing (small model for short/simple contracts, large otherwise)
+    model_routing_enabled: bool = False
+    openai_small_model: str = "gpt-4o-mini"
+    openai_large_model: str = "gpt-4o"
+    routing_small_max_tokens: int = 2500
+    routing_small_max_sections: int = 60
+    routing_small_contract_types: list[str] = ["NDA"]
+    routing_high_risk_signals: int = 3
+    # Blended USD per 1K tokens, used for cost tracking only
+    openai_default_cost_per_1k_tokens: float = 0.0003
+    openai_small_cost_per_1k_tokens: float = 0.0003
+    openai_large_cost_per_1k_tokens: float = 0.005
+
+    # OpenAI Batch API (bulk analysis, off the interactive rate limits)
+    openai_batch_completion_window: str = "24h"
+    openai_batch_poll_interval_s: float = 30.0
+    openai_batch_max_requests: int = 50000  # per submitted batch file
+    openai_batch_work_dir: str = "data/batches"
+
     # Supabase Settings
     supabase_url: Optional[str] = None
     supabase_key: Optional[str] = None
@@ -48,8 +75,68 @@ class Settings(BaseSettings):
     stripe_webhook_secret: Optional[str] = None
     stripe_publishable_key: Optional[str] = None
 
+    # Subscription Cache (per process; invalidated on plan changes and Stripe webhooks)
+    subscription_cache_ttl_s: float = 60.0  # 0 disables
+    subscription_cache_max_entries: int = 10000
+
     # Document Processing Settings
     max_contract_chars: int = 12000
+    # Split large PDFs into page ranges converted across worker processes.
+    # Every worker loads its own docling/torch models (~1-2 GB resident each)
+    parallel_pdf_enabled: bool = False
+    parallel_pdf_min_pages: int = 40
+    parallel_pdf_chunk_pages: int = 20
+    parallel_pdf_workers: int = 2  # 0 = one per CPU core
+    # Probe the PDF text layer: born-digital PDFs skip OCR and table models
+    pdf_pipeline_auto: bool = True
+    pdf_text_probe_pages: int = 3
+    pdf_text_layer_min_chars: int = 200  # avg chars/page to count as born-digital
+    # Load docling models in the background after startup
+    docling_warmup_enabled: bool = True
+    # Start the model call on leading pages while later pages still convert
+    streaming_analysis_enabled: bool = True
+
+    # Near-Duplicate Detection (MinHash/LSH)
+    near_duplicate_enabled: bool = False
+    near_duplicate_index_path: str = "data/near_duplicates.sqlite3"
+    near_duplicate_threshold: float = 0.85  # send only differing sections
+    near_duplicate_reuse_threshold: float = 0.97  # return cached analysis as-is
+
+    # Full-Text Search over analyzed contracts
+    search_enabled: bool = True
+    search_backend: str = "auto"  # auto (postgres with Supabase, else sqlite), postgres, sqlite
+    search_index_path: str = "data/search.sqlite3"
+    search_max_body_chars: int = 200000  # extracted text indexed per contract
+
+    # Extracted Text Store (zstd-compressed, keyed by SHA-256 of the uploaded file)
+    text_store_enabled: bool = True
+    text_store_backend: str = "local"  # local or s3
+    text_store_path: str = "data/texts"
+    text_store_s3_bucket: Optional[str] = None
+    text_store_s3_prefix: str = "extracted-text/"
+    text_store_s3_endpoint_url: Optional[str] = None  # S3-compatible stand-in, e.g. MinIO
+    text_store_zstd_level: int = 10
+
+    # Re-analysis of records from an older analyzer fingerprint (prompt/model/settings)
+    reanalysis_batch_size: int = 100
+    reanalysis_openai_share: float = 0.25  # of ADMISSION_MAX_OPENAI_CALLS in flight at once
+    reanalysis_backend: str = "online"  # online (bulk priority) or batch (OpenAI Batch API)
+    reanalysis_checkpoint_path: str = "data/reanalysis.checkpoint.json"
+
+    # Data Retention (plan data_retention_days; python -m services.retention)
+    retention_default_days: int = 30  # anonymous uploads and users without an active plan
+    retention_batch_size: int = 500  # rows deleted per transaction
+    retention_rows_per_second: int = 2000  # delete pacing; 0 disables
+    retention_partitioned_tables: list[str] = ["usage_tracking"]  # monthly partitioned; expired by partition drop
+    retention_partition_months_ahead: int = 3  # partitions created ahead on every --execute run
+    retention_text_grace_s: int = 3600  # text blobs written or re-used this recently are kept
+
+    # Portfolio Analytics (rollup compaction window for late/updated rows)
+    analytics_compaction_lookback_days: int = 35
+
+    # Contract Export (streamed in keyset pages)
+    export_batch_size: int = 1000  # rows per database page (PostgREST max-rows default)
+    export_parquet_row_group_rows: int = 10000
 
     # CORS Settings
     cors_origins: list[str] = ["*"]
@@ -57,6 +144,28 @@ class Settings(BaseSettings):
     cors_allow_methods: list[str] = ["*"]
     cors_allow_headers: list[str] = ["*"]
 
+    # Admission Control (bound in-flight work per worker)
+    admission_enabled: bool = True
+    admission_max_inflight_mb: int = 200
+    admission_max_inflight_pages: int = 1000
+    admission_max_openai_calls: int = 16
+    admission_max_queue: int = 50
+    admission_queue_timeout_ms: int = 2000
+    admission_retry_after_s: int = 2
+
+    # Fair Scheduling (weighted fair queueing per tenant for extraction and LLM calls)
+    scheduler_enabled: bool = True
+    scheduler_extraction_concurrency: int = 4
+    scheduler_llm_concurrency: int = 16
+    scheduler_plan_weights: dict[str, float] = {
+        "starter": 1, "professional": 2, "business": 4, "enterprise": 8
+    }
+    scheduler_plan_max_concurrency: dict[str, int] = {
+        "starter": 2, "professional": 4, "business": 8, "enterprise": 12
+    }
+    scheduler_anonymous_plan: str = "starter"  # plan used for unauthenticated callers
+    scheduler_interactive_reserved_slots: int = 1  # per lane, never given to bulk work
+
     # Rate Limiting
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 10
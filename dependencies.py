@@ -1,6 +1,7 @@
 """
 FastAPI dependencies for dependency injection.
 """
+import asyncio
 from typing import Optional
 from fastapi import Depends, Request
 
@@ -11,10 +12,21 @@ from services.database import SupabaseService
 from services.auth_service import AuthService
 from services.subscription_service import SubscriptionService
 from services.payment_service import PaymentService
+from services.admission import AdmissionController
+from services.scheduler import TenantScheduler
+from services.search import SearchIndex, create_search_index
+from services.text_store import TextStore, create_text_store
+from exceptions import AuthenticationError
+from models import Tenant
+from models.subscription_models import User
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+# Owner of every contract when auth is not configured: a deployment without
+# Supabase has no users and serves a single local tenant
+LOCAL_OWNER_ID = "local"
+
 # Global instances (initialized on startup)
 _processor: Optional[ContractProcessor] = None
 _analyzer: Optional[ContractAnalyzer] = None
@@ -22,6 +34,23 @@ _db: Optional[SupabaseService] = None
 _auth_service: Optional[AuthService] = None
 _subscription_service: Optional[SubscriptionService] = None
 _payment_service: Optional[PaymentService] = None
+_admission: Optional[AdmissionController] = None
+_scheduler: Optional[TenantScheduler] = None
+_search: Optional[SearchIndex] = None
+_text_store: Optional[TextStore] = None
+
+# Processor loaded by a preloading master process (serve.py) before fork
+_preloaded_processor: Optional[ContractProcessor] = None
+
+
+def set_preloaded_processor(processor: ContractProcessor):
+    """
+    Register a processor built before forking workers.
+    Workers reuse it (and its copy-on-write shared models) instead of
+    constructing their own.
+    """
+    global _preloaded_processor
+    _preloaded_processor = processor
 
 
 def initialize_services(settings: Settings):
@@ -30,15 +59,24 @@ def initialize_services(settings: Settings):
     Called during application startup.
     """
     global _processor, _analyzer, _db, _auth_service, _subscription_service, _payment_service
+    global _admission, _scheduler, _search, _text_store
 
     logger.info("Initializing services...")
 
+    # Initialize admission control and per-tenant fair scheduling
+    _admission = AdmissionController(settings) if settings.admission_enabled else None
+    _scheduler = TenantScheduler(settings) if settings.scheduler_enabled else None
+
     # Initialize processor
-    _processor = ContractProcessor()
-    logger.info("ContractProcessor initialized")
+    if _preloaded_processor is not None:
+        _processor = _preloaded_processor
+        logger.info("ContractProcessor reused from preloading master")
+    else:
+        _processor = ContractProcessor(settings)
+        logger.info("ContractProcessor initialized")
 
     # Initialize analyzer
-    _analyzer = ContractAnalyzer(settings)
+    _analyzer = ContractAnalyzer(settings, admission=_admission, scheduler=_scheduler)
     logger.info("ContractAnalyzer initialized")
 
     # Initialize database (optional)
@@ -58,7 +96,8 @@ def initialize_services(settings: Settings):
             # Initialize payment service (if Stripe configured)
             if settings.stripe_api_key:
                 _payment_service = PaymentService(
-                    _db.client, settings.stripe_api_key)
+                    _db.client, settings.stripe_api_key,
+                    subscription_service=_subscription_service)
                 logger.info("PaymentService initialized")
             else:
                 logger.info("Stripe not configured, skipping payment service")
@@ -77,29 +116,140 @@ def initialize_services(settings: Settings):
         _subscription_service = None
         _payment_service = None
 
+    # Initialize full-text search
+    _search = create_search_index(settings, _db.client if _db is not None else None)
+
+    # Initialize extracted text store
+    _text_store = create_text_store(settings)
+
     logger.info("All services initialized successfully")
 
 
+async def warm_up_services(settings: Settings):
+    """
+    Preload slow-to-initialize services in the background.
+    Started after startup so the server binds without waiting on docling.
+    """
+    if _processor is None or _processor.ready or not settings.docling_warmup_enabled:
+        return
+    await asyncio.to_thread(_processor.warm_up)
+
+
 def shutdown_services():
     """
     Cleanup service instances.
     Called during application shutdown.
     """
     global _processor, _analyzer, _db, _auth_service, _subscription_service, _payment_service
+    global _admission, _scheduler, _search, _text_store
 
     logger.info("Shutting down services...")
 
     # Cleanup if needed
+    if _processor is not None:
+        _processor.close()
+    if _analyzer is not None and _analyzer.near_duplicates is not None:
+        _analyzer.near_duplicates.close()
+    if _search is not None:
+        _search.close()
+    if _text_store is not None:
+        _text_store.close()
+
     _processor = None
     _analyzer = None
     _db = None
     _auth_service = None
     _subscription_service = None
     _payment_service = None
+    _admission = None
+    _scheduler = None
+    _search = None
+    _text_store = None
 
     logger.info("Services shutdown complete")
 
 
+def get_admission() -> Optional[AdmissionController]:
+    """Dependency to get the AdmissionController (None if disabled)."""
+    return _admission
+
+
+def get_scheduler() -> Optional[TenantScheduler]:
+    """Dependency to get the TenantScheduler (None if disabled)."""
+    return _scheduler
+
+
+async def get_optional_user(request: Request) -> Optional[User]:
+    """
+    Dependency to identify the caller without requiring authentication.
+
+    Uses the ``X-API-Key`` header or a Bearer token when auth is configured.
+    Missing or invalid credentials resolve to None (anonymous).
+    """
+    if _auth_service is None:
+        return None
+
+    api_key = request.headers.get("x-api-key")
+    authorization = request.headers.get("authorization", "")
+    try:
+        if api_key:
+            return await _auth_service.verify_api_key(api_key)
+        if authorization.lower().startswith("bearer "):
+            return await _auth_service.verify_token(authorization[7:])
+    except AuthenticationError as e:
+        logger.debug(f"Treating request as anonymous: {str(e)}")
+    return None
+
+
+async def get_owner_id(user: Optional[User] = Depends(get_optional_user)) -> Optional[str]:
+    """
+    Dependency to resolve whose contracts the caller reads and writes.
+
+    Identified users own their contracts. Without auth configured every
+    caller is the local tenant; with auth configured anonymous callers own
+    nothing (None).
+    """
+    if user is not None:
+        return str(user.id)
+    return LOCAL_OWNER_ID if _auth_service is None else None
+
+
+async def get_tenant(
+    request: Request,
+    user: Optional[User] = Depends(get_optional_user)
+) -> Optional[Tenant]:
+    """
+    Dependency to resolve the tenant an analysis is scheduled for.
+
+    Identified users are weighted by their active subscription plan.
+    Anonymous callers are scheduled per client address on the anonymous
+    plan; analysis itself stays unauthenticated.
+    """
+    if _scheduler is None:
+        return None
+
+    if user is None:
+        client = request.client.host if request.client else "unknown"
+        return _scheduler.tenant(f"ip:{client}")
+
+    plan = None
+    if _subscription_service is not None:
+        subscription = await _subscription_service.get_user_subscription(user.id)
+        if subscription is not None:
+            plan = subscription.plan.name.value
+    return _scheduler.tenant(f"user:{user.id}", plan)
+
+
+def get_search() -> Optional[SearchIndex]:
+    """Dependency to get the full-text SearchIndex (None if disabled)."""
+    return _search
+
+
+def get_text_store() -> Optional[TextStore]:
+    """Dependency to get the extracted TextStore (None if disabled)."""
+    return _text_store
+
+
 def get_processor() -> ContractProcessor:
     """Dependency to get ContractProcessor instance."""
     if _processor is None:
@@ -60,3 +60,36 @@ class OpenAIError(ContractAnalyzerException):
     def __init__(self, message: str = "OpenAI API error", details: Optional[dict[str, Any]] = None):
         super().__init__(message, status_code=502, details=details)
 
+
+class ServiceOverloadedError(ContractAnalyzerException):
+    """Raised when admission control rejects a request under load."""
+    
+    def __init__(
+        self,
+        message: str = "Service overloaded",
+        retry_after: int = 1,
+        details: Optional[dict[str, Any]] = None
+    ):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=503, details=details)
+
+
+class AuthenticationError(ContractAnalyzerException):
+    """Raised when credentials are missing or invalid."""
+    
+    def __init__(self, message: str = "Authentication required", details: Optional[dict[str, Any]] = None):
+        super().__init__(message, status_code=401, details=details)
+
+
+class NotFoundError(ContractAnalyzerException):
+    """Raised when a requested resource does not exist."""
+    
+    def __init__(self, message: str = "Resource not found", details: Optional[dict[str, Any]] = None):
+        super().__init__(message, status_code=404, details=details)
+
+
+class PaymentError(ContractAnalyzerException):
+    """Raised when payment provider operations fail."""
+    
+    def __init__(self, message: str = "Payment processing failed", details: Optional[dict[str, Any]] = None):
+        super().__init__(message, status_code=402, details=details)
@@ -1,14 +1,16 @@
 """
 Production-ready Contract Analyzer API with FastAPI.
 """
+import asyncio
+import contextlib
 import time
 import tempfile
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -16,25 +18,42 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from config import get_settings, Settings
-from models import AnalyzeResponse, ErrorResponse, HealthResponse, DocumentMetadata
+from models import (
+    AnalysisMode,
+    AnalyzeResponse,
+    ErrorResponse,
+    HealthResponse,
+    DocumentMetadata,
+    Priority
+)
 from exceptions import (
     ContractAnalyzerException,
     DocumentProcessingError,
     ContractAnalysisError,
     DatabaseError,
+    ServiceOverloadedError,
     ValidationError as AppValidationError
 )
 from logger import setup_logging, get_logger
-from middleware import RequestIDMiddleware, LoggingMiddleware, SecurityHeadersMiddleware
+from middleware import RequestIDMiddleware, LoggingMiddleware, RequestScopeMiddleware, SecurityHeadersMiddleware
 from dependencies import (
     initialize_services,
     shutdown_services,
     get_processor,
+    get_admission,
+    get_owner_id,
+    get_scheduler,
+    get_search,
+    get_tenant,
+    get_text_store,
+    warm_up_services,
     get_analyzer,
     get_db,
     get_request_id
 )
-from routers import auth, subscriptions
+from routers import analytics, auth, contracts, subscriptions
+from services.scheduler import current_priority, current_tenant, scheduled_sections
+from services.text_store import content_key
 
 # Initialize logging
 setup_logging()
@@ -46,6 +65,9 @@ settings = get_settings()
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+# Process start time for uptime reporting
+started_at = time.time()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -63,10 +85,14 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize services: {str(e)}", exc_info=True)
         raise
 
+    # Load docling models in the background; /health/ready reports progress
+    warmup_task = asyncio.create_task(warm_up_services(settings))
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    warmup_task.cancel()
     shutdown_services()
     logger.info("Application shutdown complete")
 
@@ -86,6 +112,7 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Add middleware (order matters - first added is outermost)
+app.add_middleware(RequestScopeMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RequestIDMiddleware)
@@ -102,6 +129,8 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router, prefix=settings.api_v1_prefix)
 app.include_router(subscriptions.router, prefix=settings.api_v1_prefix)
+app.include_router(contracts.router, prefix=settings.api_v1_prefix)
+app.include_router(analytics.router, prefix=settings.api_v1_prefix)
 
 
 # Exception Handlers
@@ -119,6 +148,10 @@ async def contract_analyzer_exception_handler(request: Request, exc: ContractAna
         }
     )
 
+    headers = None
+    if isinstance(exc, ServiceOverloadedError):
+        headers = {"Retry-After": str(exc.retry_after)}
+
     return JSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
@@ -128,7 +161,8 @@ async def contract_analyzer_exception_handler(request: Request, exc: ContractAna
             details=[{"message": str(v), "field": k}
                      for k, v in exc.details.items()] if exc.details else None,
             timestamp=datetime.utcnow()
-        ).model_dump(mode='json')
+        ).model_dump(mode='json'),
+        headers=headers
     )
 
 
@@ -198,15 +232,67 @@ async def root():
     }
 
 
+def _processor_check(processor) -> str:
+    """Document processor state: ready, warming or unhealthy."""
+    if processor.ready or not settings.docling_warmup_enabled:
+        return "healthy"
+    if processor.warmup_error:
+        return "unhealthy"
+    return "warming"
+
+
+@app.get("/health/live", response_model=HealthResponse, tags=["Health"])
+async def liveness():
+    """
+    Liveness probe: the process is up and serving the event loop.
+    Does not depend on models or external services.
+    """
+    return HealthResponse(
+        status="healthy",
+        version=settings.app_version,
+        timestamp=datetime.utcnow(),
+        checks={"api": "healthy"}
+    )
+
+
+@app.get("/health/ready", response_model=HealthResponse, tags=["Health"],
+         responses={503: {"model": HealthResponse}})
+async def readiness(processor=Depends(get_processor)):
+    """
+    Readiness probe: docling models are loaded and requests will not pay
+    for warm-up. Returns 503 while warming so load balancers hold traffic.
+    """
+    checks = {
+        "api": "healthy",
+        "document_processor": _processor_check(processor),
+        "warmup_seconds": processor.warmup_seconds
+    }
+    ready = checks["document_processor"] == "healthy"
+    body = HealthResponse(
+        status="healthy" if ready else "starting",
+        version=settings.app_version,
+        timestamp=datetime.utcnow(),
+        checks=checks
+    )
+    if not ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=body.model_dump(mode="json")
+        )
+    return body
+
+
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check(db=Depends(get_db)):
+async def health_check(db=Depends(get_db), processor=Depends(get_processor)):
     """
     Health check endpoint for monitoring.
     Returns service status and component health.
     """
+    processor_state = _processor_check(processor)
     checks = {
         "api": "healthy",
-        "database": "not_configured"
+        "database": "not_configured",
+        "document_processor": "degraded" if processor_state == "warming" else processor_state
     }
 
     # Check database if configured
@@ -234,6 +320,30 @@ async def health_check(db=Depends(get_db)):
     )
 
 
+@app.get("/metrics", tags=["Health"])
+async def metrics(
+    analyzer=Depends(get_analyzer),
+    admission=Depends(get_admission),
+    scheduler=Depends(get_scheduler)
+):
+    """
+    Runtime metrics for tuning and monitoring.
+    Includes model routing decisions and per-tier latency, tokens and cost,
+    OpenAI hedging statistics when enabled, admission budget usage and
+    per-tenant fair scheduling queue depth.
+    """
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics disabled")
+
+    return {
+        "uptime_seconds": round(time.time() - started_at, 1),
+        "model_routing": analyzer.router.snapshot(),
+        "hedging": analyzer.hedging.snapshot() if analyzer.hedging else None,
+        "admission": admission.snapshot() if admission else None,
+        "fair_scheduler": scheduler.snapshot() if scheduler else None,
+    }
+
+
 @app.post(
     f"{settings.api_v1_prefix}/analyze",
     response_model=AnalyzeResponse,
@@ -243,11 +353,21 @@ async def health_check(db=Depends(get_db)):
 @limiter.limit(f"{settings.rate_limit_per_minute}/minute" if settings.rate_limit_enabled else "1000/minute")
 async def analyze_contract(
     request: Request,
+    response: Response,
     file: UploadFile = File(...,
                             description="Contract file to analyze (PDF, DOCX, etc.)"),
+    mode: AnalysisMode = Query(
+        AnalysisMode.FULL,
+        description="`full` for AI analysis, `rules_only` for fast deterministic triage"),
     processor=Depends(get_processor),
     analyzer=Depends(get_analyzer),
     db=Depends(get_db),
+    admission=Depends(get_admission),
+    scheduler=Depends(get_scheduler),
+    search=Depends(get_search),
+    text_store=Depends(get_text_store),
+    tenant=Depends(get_tenant),
+    owner_id=Depends(get_owner_id),
     request_id: str = Depends(get_request_id)
 ):
     """
@@ -256,16 +376,28 @@ async def analyze_contract(
     This endpoint:
     1. Accepts a contract file upload
     2. Extracts text from the document
-    3. Analyzes the contract using AI
+    3. Runs the deterministic rule tier, then analyzes the contract using AI
+       (skipped when `mode=rules_only`)
     4. Optionally persists results to database
     5. Returns structured analysis results
 
     **Supported file formats:** PDF, DOCX, DOC, TXT
 
     **Rate limit:** {settings.rate_limit_per_minute} requests per minute
+
+    Under load, requests over the in-flight byte, page or OpenAI call
+    budgets wait briefly and are then rejected with 503 and `Retry-After`.
+    Extraction and model calls are shared fairly between tenants, weighted
+    by subscription plan (callers identify with `X-API-Key` or a Bearer
+    token; anonymous callers are scheduled per client address). Requests
+    here are interactive and are served ahead of bulk batch and job work.
     """
     start_time = time.time()
     tmp_path = None
+    ticket = None
+    stage_timings: dict[str, float] = {}
+    current_tenant.set(tenant)
+    current_priority.set(Priority.INTERACTIVE)
 
     try:
         # Validate file
@@ -275,6 +407,13 @@ async def analyze_contract(
                 details={"field": "file"}
             )
 
+        # Reserve in-flight byte budget before reading the upload into memory
+        if admission:
+            stage_start = time.perf_counter()
+            ticket = await admission.admit(
+                file.size or int(request.headers.get("content-length", 0)))
+            stage_timings["admission"] = time.perf_counter() - stage_start
+
         # Check file size
         content = await file.read()
         file_size = len(content)
@@ -299,27 +438,87 @@ async def analyze_contract(
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             tmp.write(content)
             tmp_path = tmp.name
-
-        # Process document
-        processed = await processor.process(tmp_path)
-
-        # Analyze contract
-        analysis_obj = await analyzer.analyze(processed["text"])
+        text_key = content_key(content) if text_store else None
+        del content
+
+        # Reserve page budget before conversion
+        pages_estimate = processor.estimate_pages(tmp_path)
+        if ticket:
+            stage_start = time.perf_counter()
+            await ticket.acquire_pages(pages_estimate)
+            stage_timings["admission"] += time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        if mode == AnalysisMode.FULL and settings.streaming_analysis_enabled:
+            # Extract and analyze concurrently: the model starts on the
+            # leading pages while later pages are still converting
+            sections = processor.stream_sections(tmp_path)
+            if scheduler:
+                sections = scheduled_sections(scheduler.extraction, sections, cost=pages_estimate)
+            streamed = await analyzer.analyze_stream(sections, user_id=owner_id)
+            processed = {
+                "text": streamed.text,
+                "metadata": processor.build_metadata(
+                    tmp_path, streamed.pages, streamed.pipeline),
+            }
+            analysis_obj = streamed.analysis
+            near_duplicate = streamed.near_duplicate
+            stage_timings["extract"] = streamed.extract_s
+            stage_timings["analyze"] = time.perf_counter() - stage_start - streamed.extract_s
+        else:
+            # Process document once it is this tenant's turn to extract
+            turn = (scheduler.extraction.slot(cost=pages_estimate)
+                    if scheduler else contextlib.nullcontext())
+            async with turn:
+                processed = await processor.process(tmp_path)
+            stage_timings["extract"] = time.perf_counter() - stage_start
+
+            # Analyze contract
+            stage_start = time.perf_counter()
+            near_duplicate = None
+            if mode == AnalysisMode.FULL:
+                near_duplicate = await analyzer.find_near_duplicate(processed["text"], owner_id)
+            analysis_obj = await analyzer.analyze(
+                processed["text"], mode=mode, near_duplicate=near_duplicate, user_id=owner_id)
+            stage_timings["analyze"] = time.perf_counter() - stage_start
         analysis = analysis_obj.model_dump()
 
         # Persist to database if available
+        stage_start = time.perf_counter()
         record_id = None
+
+        # Keep the extracted text so the contract can be re-analyzed without docling
+        if text_store:
+            text_key = await text_store.store_text(text_key, processed["text"])
+
         if db:
             try:
-                record = await db.insert_contract(processed["metadata"], analysis)
+                record = await db.insert_contract(
+                    processed["metadata"], analysis,
+                    user_id=owner_id, text_key=text_key,
+                    analyzer_fingerprint=analyzer.fingerprint_for(mode),
+                    body_text=search.row_body(processed["text"]) if search else None)
                 record_id = record.get("id") if record else None
             except DatabaseError as e:
                 # Log but don't fail the request if database is unavailable
                 logger.warning(f"Failed to persist to database: {str(e)}")
 
+        # Index for full-text search; without a database the request id is the record id
+        if search:
+            await search.index_contract(
+                record_id or (request_id if db is None else None), owner_id,
+                processed["metadata"], analysis, processed["text"])
+
+        stage_timings["persist"] = time.perf_counter() - stage_start
+
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
 
+        # Per-stage timings for load tests and browser devtools
+        response.headers["Server-Timing"] = ", ".join(
+            f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stage_timings.items()
+        )
+
         logger.info(f"Analysis completed successfully: {file.filename}", extra={
             "filename": file.filename,
             "contract_type": analysis["contract_type"],
@@ -332,10 +531,14 @@ async def analyze_contract(
             analysis=analysis_obj,
             metadata=DocumentMetadata(**processed["metadata"]),
             record_id=record_id,
+            near_duplicate=near_duplicate,
             processing_time_ms=processing_time_ms
         )
 
     finally:
+        if ticket:
+            ticket.release()
+
         # Cleanup temporary file
         if tmp_path:
             try:
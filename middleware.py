@@ -9,6 +9,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from logger import get_logger, request_id_var
+from services.subscription_service import subscription_request_scope
 
 logger = get_logger(__name__)
 
@@ -111,3 +112,11 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         
         return response
 
+
+class RequestScopeMiddleware(BaseHTTPMiddleware):
+    """Middleware to memoize per-request lookups (the caller's subscription)."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        """Run the request inside a fresh subscription lookup scope."""
+        with subscription_request_scope():
+            return await call_next(request)
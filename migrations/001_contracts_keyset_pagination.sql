@@ -0,0 +1,16 @@
+-- Keyset pagination for GET /api/v1/contracts
+--
+-- Pages are ordered by (created_at desc, id desc) and continue after the last
+-- row of the previous page. idx_contracts_created_at orders by created_at
+-- only, so rows sharing a timestamp need a sort; these indexes cover the
+-- tie-breaker and the contract_type / risk_level filters, keeping every page
+-- a bounded index range scan.
+
+create index concurrently if not exists idx_contracts_created_at_id
+  on public.contracts(created_at desc, id desc);
+
+create index concurrently if not exists idx_contracts_type_created_at_id
+  on public.contracts(contract_type, created_at desc, id desc);
+
+create index concurrently if not exists idx_contracts_risk_created_at_id
+  on public.contracts(risk_level, created_at desc, id desc);
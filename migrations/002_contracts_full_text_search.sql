@@ -0,0 +1,71 @@
+-- Full-text search over analyzed contracts (GET /api/v1/contracts/search)
+--
+-- search_tsv combines, by weight: summary (A), key terms and parties (B) and
+-- the extracted text (D). The extracted text is kept only as a tsvector
+-- (body_tsv, written by set_contract_body_tsv after each insert) so rows do
+-- not carry the raw document. Adding the stored generated column rewrites
+-- the table once; run during a quiet period on large tables.
+
+alter table public.contracts add column if not exists body_tsv tsvector;
+
+alter table public.contracts add column if not exists search_tsv tsvector
+  generated always as (
+    setweight(to_tsvector('english', coalesce(summary, '')), 'A') ||
+    setweight(jsonb_to_tsvector('english', coalesce(key_terms, '[]'::jsonb), '["string"]'), 'B') ||
+    setweight(jsonb_to_tsvector('english', coalesce(parties, '[]'::jsonb), '["string"]'), 'B') ||
+    coalesce(body_tsv, ''::tsvector)
+  ) stored;
+
+create index concurrently if not exists idx_contracts_search_tsv
+  on public.contracts using gin (search_tsv);
+
+create or replace function public.set_contract_body_tsv(p_id uuid, p_text text)
+returns void
+language sql
+as $$
+  update public.contracts
+     set body_tsv = setweight(to_tsvector('english', coalesce(p_text, '')), 'D')
+   where id = p_id;
+$$;
+
+-- Ranks only the GIN matches and computes headlines for the returned page
+create or replace function public.search_contracts(
+  p_query text,
+  p_limit integer default 20,
+  p_contract_type text default null,
+  p_risk_level text default null
+)
+returns table (
+  id uuid,
+  filename text,
+  contract_type text,
+  risk_level text,
+  summary text,
+  created_at timestamptz,
+  rank real,
+  headline text
+)
+language sql
+stable
+as $$
+  with q as (
+    select websearch_to_tsquery('english', p_query) as query
+  ),
+  top as (
+    select c.id, c.filename, c.contract_type, c.risk_level, c.summary, c.key_terms, c.created_at,
+           ts_rank_cd(c.search_tsv, q.query, 32) as rank
+      from public.contracts c, q
+     where c.search_tsv @@ q.query
+       and (p_contract_type is null or c.contract_type = p_contract_type)
+       and (p_risk_level is null or c.risk_level = p_risk_level)
+     order by rank desc, c.created_at desc
+     limit least(greatest(p_limit, 1), 100)
+  )
+  select top.id, top.filename, top.contract_type, top.risk_level, top.summary, top.created_at, top.rank,
+         ts_headline('english',
+                     coalesce(top.summary, '') || ' ' || coalesce(top.key_terms::text, ''),
+                     q.query,
+                     'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5')
+    from top, q
+   order by top.rank desc, top.created_at desc;
+$$;
@@ -0,0 +1,138 @@
+-- Portfolio analytics rollups (GET /api/v1/analytics/portfolio)
+--
+-- contracts gains an owner (user_id; null for anonymous uploads). Two rollup
+-- tables are maintained by an insert trigger so portfolio reports read a
+-- bounded number of rows per tenant instead of scanning contracts:
+--   contract_rollups_monthly: contracts per (tenant, month, type, risk)
+--   contract_party_rollups:   contracts per (tenant, counterparty)
+-- compact_contract_rollups(since) rebuilds a recent window from contracts to
+-- fold in updates, deletions and late-arriving rows the trigger cannot see.
+-- Run it periodically: python -m services.analytics --days 35
+
+alter table public.contracts add column if not exists user_id uuid references public.users(id) on delete set null;
+
+create index concurrently if not exists idx_contracts_user_created_at_id
+  on public.contracts(user_id, created_at desc, id desc);
+create index concurrently if not exists idx_contracts_updated_at
+  on public.contracts(updated_at);
+
+create table if not exists public.contract_rollups_monthly (
+  tenant_key text not null,  -- user_id, or 'anonymous'
+  month date not null,
+  contract_type text not null,
+  risk_level text not null,
+  contracts bigint not null default 0,
+  pages bigint not null default 0,
+  primary key (tenant_key, month, contract_type, risk_level)
+);
+
+create table if not exists public.contract_party_rollups (
+  tenant_key text not null,
+  party text not null,
+  contracts bigint not null default 0,
+  last_seen timestamptz,
+  primary key (tenant_key, party)
+);
+
+create index if not exists idx_contract_party_rollups_top
+  on public.contract_party_rollups(tenant_key, contracts desc);
+
+create or replace function public.contract_parties(p_parties jsonb)
+returns setof text
+language sql
+immutable
+as $$
+  select distinct trim(value)
+    from jsonb_array_elements_text(
+           case when jsonb_typeof(p_parties) = 'array' then p_parties else '[]'::jsonb end
+         ) as value
+   where trim(value) <> '';
+$$;
+
+create or replace function public.rollup_contract_insert()
+returns trigger
+language plpgsql
+as $$
+declare
+  v_key text := coalesce(new.user_id::text, 'anonymous');
+begin
+  insert into public.contract_rollups_monthly as r
+         (tenant_key, month, contract_type, risk_level, contracts, pages)
+  values (v_key,
+          date_trunc('month', new.created_at)::date,
+          coalesce(new.contract_type, 'Unknown'),
+          coalesce(new.risk_level, 'Unknown'),
+          1,
+          coalesce(new.pages, 0))
+  on conflict (tenant_key, month, contract_type, risk_level)
+  do update set contracts = r.contracts + 1, pages = r.pages + excluded.pages;
+
+  insert into public.contract_party_rollups as p (tenant_key, party, contracts, last_seen)
+  select v_key, party, 1, new.created_at
+    from public.contract_parties(new.parties) as party
+  on conflict (tenant_key, party)
+  do update set contracts = p.contracts + 1,
+                last_seen = greatest(p.last_seen, excluded.last_seen);
+
+  return new;
+end;
+$$;
+
+drop trigger if exists rollup_contract_insert on public.contracts;
+create trigger rollup_contract_insert
+  after insert on public.contracts
+  for each row
+  execute function public.rollup_contract_insert();
+
+create or replace function public.compact_contract_rollups(p_since timestamptz)
+returns integer
+language plpgsql
+as $$
+declare
+  v_from date;
+  v_rows integer;
+begin
+  -- Block trigger upserts until the rebuilt rollups commit; reads continue
+  lock table public.contract_rollups_monthly, public.contract_party_rollups in exclusive mode;
+
+  -- Start from the earliest month touched by rows updated since p_since
+  select least(date_trunc('month', p_since)::date,
+               coalesce(min(date_trunc('month', created_at)::date), date_trunc('month', p_since)::date))
+    into v_from
+    from public.contracts
+   where updated_at >= p_since;
+
+  delete from public.contract_rollups_monthly where month >= v_from;
+  insert into public.contract_rollups_monthly (tenant_key, month, contract_type, risk_level, contracts, pages)
+  select coalesce(user_id::text, 'anonymous'),
+         date_trunc('month', created_at)::date,
+         coalesce(contract_type, 'Unknown'),
+         coalesce(risk_level, 'Unknown'),
+         count(*),
+         coalesce(sum(pages), 0)
+    from public.contracts
+   where created_at >= v_from
+   group by 1, 2, 3, 4;
+  get diagnostics v_rows = row_count;
+
+  -- Counterparty totals are all-time: rebuild them for tenants with recent activity
+  create temporary table touched_tenants on commit drop as
+  select distinct coalesce(user_id::text, 'anonymous') as tenant_key
+    from public.contracts
+   where created_at >= v_from or updated_at >= p_since;
+
+  delete from public.contract_party_rollups
+   where tenant_key in (select tenant_key from touched_tenants);
+  insert into public.contract_party_rollups (tenant_key, party, contracts, last_seen)
+  select coalesce(c.user_id::text, 'anonymous'), party, count(*), max(c.created_at)
+    from public.contracts c
+    cross join lateral public.contract_parties(c.parties) as party
+   where coalesce(c.user_id::text, 'anonymous') in (select tenant_key from touched_tenants)
+   group by 1, 2;
+
+  return v_rows;
+end;
+$$;
+
+-- Initial backfill
+select public.compact_contract_rollups('-infinity');
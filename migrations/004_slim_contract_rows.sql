@@ -0,0 +1,72 @@
+-- Slim contracts row format
+--
+-- Every row used to carry the analysis twice: as typed columns
+-- (contract_type, risk_level, summary, parties, key_dates, key_terms) and
+-- again as the full `analysis` JSONB. The typed columns are now the source of
+-- truth; `analysis_extra` holds only analysis keys that have no column (null
+-- when there are none) and the API rebuilds `analysis` from both.
+--
+-- Existing rows are migrated in keyset batches by slim_contracts_batch;
+-- contract_storage_stats reports bytes per row before and after:
+--   python -m services.contract_storage
+-- Once it reports no legacy rows left, drop the old column:
+--   alter table public.contracts drop column analysis;
+
+alter table public.contracts add column if not exists analysis_extra jsonb;
+
+-- Backfill updates change storage only: don't bump updated_at, which would
+-- make the next compact_contract_rollups rebuild every month.
+create or replace function public.handle_updated_at()
+returns trigger as $$
+begin
+  if current_setting('contracts.storage_backfill', true) = 'on' then
+    return new;
+  end if;
+  new.updated_at = now();
+  return new;
+end;
+$$ language plpgsql;
+
+create or replace function public.slim_contracts_batch(p_after uuid, p_limit integer)
+returns table (processed integer, last_id uuid)
+language plpgsql
+as $$
+begin
+  perform set_config('contracts.storage_backfill', 'on', true);
+
+  return query
+  with batch as (
+    select id
+      from public.contracts
+     where (p_after is null or id > p_after)
+     order by id
+     limit p_limit
+  ), slimmed as (
+    update public.contracts c
+       set analysis_extra = nullif(
+             c.analysis - array['contract_type', 'parties', 'key_dates',
+                                'key_terms', 'risk_level', 'summary'],
+             '{}'::jsonb),
+           analysis = null
+      from batch
+     where c.id = batch.id
+       and c.analysis is not null
+    returning c.id
+  )
+  select (select count(*) from batch)::integer,
+         (select id from batch order by id desc limit 1);
+end;
+$$;
+
+create or replace function public.contract_storage_stats()
+returns table (total_rows bigint, legacy_rows bigint, avg_row_bytes numeric, table_bytes bigint)
+language sql
+stable
+as $$
+  select count(*),
+         -- via to_jsonb so the report keeps working after `analysis` is dropped
+         count(*) filter (where to_jsonb(c) ->> 'analysis' is not null),
+         round(avg(pg_column_size(c.*)), 1),
+         pg_total_relation_size('public.contracts')
+    from public.contracts c;
+$$;
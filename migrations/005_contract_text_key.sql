@@ -0,0 +1,13 @@
+-- Extracted text store reference
+--
+-- The markdown docling extracts is kept zstd-compressed in a
+-- content-addressed text store (local directory or S3-compatible bucket,
+-- see services/text_store.py), keyed by the SHA-256 of the uploaded file.
+-- text_key points a contract at it so re-analysis can skip conversion.
+-- Rows analyzed before this migration have no stored text (null).
+
+alter table public.contracts add column if not exists text_key text;
+
+-- Blob lifecycle: find the contracts still referencing a key
+create index concurrently if not exists idx_contracts_text_key
+  on public.contracts(text_key) where text_key is not null;
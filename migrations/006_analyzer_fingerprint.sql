@@ -0,0 +1,12 @@
+-- Analyzer fingerprint per record
+--
+-- analyzer_fingerprint identifies the prompt, models and analysis settings
+-- that produced a row's analysis (ContractAnalyzer.fingerprint; 'rules_only'
+-- for rule-tier analyses). Rows from another fingerprint are stale and are
+-- refreshed from their stored text by: python -m services.reanalysis
+-- Rows analyzed before this migration have no fingerprint and count as stale.
+--
+-- The job pages through stale rows in primary-key order, so it needs no
+-- extra index: each run reads the table once.
+
+alter table public.contracts add column if not exists analyzer_fingerprint text;
@@ -0,0 +1,211 @@
+-- Data retention (SubscriptionPlan.data_retention_days)
+--
+-- services/retention.py deletes each tenant's expired contracts and usage
+-- rows in small batches, oldest first, one transaction per batch:
+--   retention_policies(default_days)           tenant -> retention in days
+--   retention_preview(user_id, cutoff)         dry run: rows and bytes that would go
+--   purge_expired_contracts(user_id, cutoff, n) delete one batch, fix rollups
+--   purge_expired_usage(user_id, cutoff, n)     delete one batch of usage rows
+-- Monthly range-partitioned tables (named <table>_pYYYYMM) can instead expire
+-- whole partitions, which is a metadata-only drop:
+--   ensure_monthly_partitions(table, from, months_ahead)
+--   drop_partitions_before(table, before, dry_run)
+-- See migrations/optional/contracts_monthly_partitions.sql to partition
+-- contracts.
+--
+--   python -m services.retention            # dry run
+--   python -m services.retention --execute
+
+create index concurrently if not exists idx_usage_user_created_at
+  on public.usage_tracking(user_id, created_at);
+
+-- Anonymous uploads (user_id null) and users without an active or trial
+-- subscription get p_default_days.
+create or replace function public.retention_policies(p_default_days integer)
+returns table (user_id uuid, retention_days integer)
+language sql
+stable
+as $$
+  select u.id,
+         coalesce(max(sp.data_retention_days) filter (where s.status in ('trial', 'active')),
+                  p_default_days)
+    from public.users u
+    left join public.subscriptions s on s.user_id = u.id
+    left join public.subscription_plans sp on sp.id = s.plan_id
+   group by u.id
+  union all
+  select null::uuid, p_default_days;
+$$;
+
+create or replace function public.retention_preview(p_user_id uuid, p_cutoff timestamptz)
+returns table (table_name text, row_count bigint, bytes bigint, text_keys bigint)
+language sql
+stable
+as $$
+  select 'contracts', count(*), coalesce(sum(pg_column_size(c.*)), 0), count(distinct c.text_key)
+    from public.contracts c
+   where c.created_at < p_cutoff
+     and (c.user_id = p_user_id or (p_user_id is null and c.user_id is null))
+  union all
+  select 'usage_tracking', count(*), coalesce(sum(pg_column_size(ut.*)), 0), 0
+    from public.usage_tracking ut
+   where p_user_id is not null
+     and ut.user_id = p_user_id
+     and ut.created_at < p_cutoff
+     and ut.billing_period_end < now();
+$$;
+
+create or replace function public.purge_expired_contracts(
+  p_user_id uuid,
+  p_cutoff timestamptz,
+  p_limit integer
+)
+returns table (deleted integer, bytes bigint, text_keys text[])
+language plpgsql
+as $$
+declare
+  v_ids uuid[];
+  v_key text := coalesce(p_user_id::text, 'anonymous');
+begin
+  -- Separate branches keep each on idx_contracts_user_created_at_id
+  if p_user_id is null then
+    select array_agg(id) into v_ids from (
+      select id from public.contracts
+       where user_id is null and created_at < p_cutoff
+       order by created_at
+       limit p_limit
+       for update skip locked) batch;
+  else
+    select array_agg(id) into v_ids from (
+      select id from public.contracts
+       where user_id = p_user_id and created_at < p_cutoff
+       order by created_at
+       limit p_limit
+       for update skip locked) batch;
+  end if;
+
+  if v_ids is null then
+    return query select 0, 0::bigint, array[]::text[];
+    return;
+  end if;
+
+  -- The rollup trigger only sees inserts and compaction only sees rows that
+  -- still exist, so take deleted rows out of the rollups here.
+  return query
+  with gone as (
+    delete from public.contracts c
+     where c.id = any(v_ids)
+    returning pg_column_size(c.*) as row_bytes, c.created_at, c.contract_type,
+              c.risk_level, c.pages, c.parties, c.text_key
+  ), monthly as (
+    update public.contract_rollups_monthly r
+       set contracts = r.contracts - g.n, pages = r.pages - g.p
+      from (select date_trunc('month', created_at)::date as month,
+                   coalesce(contract_type, 'Unknown') as contract_type,
+                   coalesce(risk_level, 'Unknown') as risk_level,
+                   count(*) as n, coalesce(sum(pages), 0) as p
+              from gone group by 1, 2, 3) g
+     where r.tenant_key = v_key and r.month = g.month
+       and r.contract_type = g.contract_type and r.risk_level = g.risk_level
+  ), parties as (
+    update public.contract_party_rollups p
+       set contracts = greatest(p.contracts - g.n, 0)
+      from (select party, count(*) as n
+              from gone cross join lateral public.contract_parties(gone.parties) as party
+             group by 1) g
+     where p.tenant_key = v_key and p.party = g.party
+  )
+  select count(*)::integer,
+         coalesce(sum(row_bytes), 0)::bigint,
+         coalesce(array_agg(distinct text_key) filter (where text_key is not null), array[]::text[])
+    from gone;
+
+  delete from public.contract_rollups_monthly where tenant_key = v_key and contracts <= 0;
+  delete from public.contract_party_rollups where tenant_key = v_key and contracts <= 0;
+end;
+$$;
+
+-- Usage rows of a billing period that has not ended are never deleted.
+create or replace function public.purge_expired_usage(
+  p_user_id uuid,
+  p_cutoff timestamptz,
+  p_limit integer
+)
+returns table (deleted integer, bytes bigint)
+language sql
+as $$
+  with batch as (
+    select id from public.usage_tracking
+     where user_id = p_user_id and created_at < p_cutoff and billing_period_end < now()
+     order by created_at
+     limit p_limit
+     for update skip locked
+  ), gone as (
+    delete from public.usage_tracking ut
+     using batch
+     where ut.id = batch.id
+    returning pg_column_size(ut.*) as row_bytes
+  )
+  select count(*)::integer, coalesce(sum(row_bytes), 0)::bigint from gone;
+$$;
+
+-- Create <table>_pYYYYMM partitions from p_from through p_months_ahead
+-- months after the current one.
+create or replace function public.ensure_monthly_partitions(
+  p_parent regclass,
+  p_from date,
+  p_months_ahead integer default 3
+)
+returns integer
+language plpgsql
+as $$
+declare
+  v_month date := date_trunc('month', p_from)::date;
+  v_last date := (date_trunc('month', now()) + make_interval(months => p_months_ahead))::date;
+  v_name text;
+  v_created integer := 0;
+begin
+  while v_month <= v_last loop
+    v_name := format('%s_p%s', (select relname from pg_class where oid = p_parent), to_char(v_month, 'YYYYMM'));
+    if to_regclass(format('public.%I', v_name)) is null then
+      execute format('create table public.%I partition of %s for values from (%L) to (%L)',
+                     v_name, p_parent, v_month, (v_month + interval '1 month')::date);
+      v_created := v_created + 1;
+    end if;
+    v_month := (v_month + interval '1 month')::date;
+  end loop;
+  return v_created;
+end;
+$$;
+
+-- Drop partitions whose whole month is before p_before; with p_dry_run only
+-- report what would be dropped.
+create or replace function public.drop_partitions_before(
+  p_parent regclass,
+  p_before timestamptz,
+  p_dry_run boolean default true
+)
+returns table (partition_name text, bytes bigint)
+language plpgsql
+as $$
+declare
+  v_child record;
+begin
+  for v_child in
+    select c.oid, c.relname
+      from pg_inherits i
+      join pg_class c on c.oid = i.inhrelid
+     where i.inhparent = p_parent
+       and c.relname ~ '_p[0-9]{6}$'
+       and (to_date(right(c.relname, 6), 'YYYYMM') + interval '1 month') <= p_before
+     order by c.relname
+  loop
+    partition_name := v_child.relname;
+    bytes := pg_total_relation_size(v_child.oid);
+    if not p_dry_run then
+      execute format('drop table public.%I', v_child.relname);
+    end if;
+    return next;
+  end loop;
+end;
+$$;
@@ -0,0 +1,178 @@
+-- Monthly partitioned usage_tracking and per-period usage counters
+--
+-- get_current_usage used to count the current period's usage_tracking rows
+-- on every call. It joined a table that only grows, and its created_at filter
+-- did not match idx_usage_user_period (user_id, billing_period_start,
+-- billing_period_end). Now:
+--   * usage_period_counters keeps one row per user, usage type and billing
+--     period. A statement-level insert trigger on usage_tracking upserts it,
+--     with one upsert per distinct key per statement.
+--   * get_current_usage and check_usage_limit read a single row.
+--   * usage_tracking is range-partitioned by month of created_at, so the
+--     retention job drops whole months (RETENTION_PARTITIONED_TABLES).
+--
+-- Partitions exist 3 months ahead. ensure_monthly_partitions
+-- (migrations/007_data_retention.sql) adds more; the retention job calls it
+-- on every --execute run, so schedule that at least monthly.
+--
+-- Apply after 007 in a maintenance window: usage_tracking is rewritten under
+-- an exclusive lock. The old table is kept as usage_tracking_unpartitioned;
+-- drop it once the copy is verified. Re-running this migration is a no-op for
+-- the conversion and rebuilds the counters.
+
+begin;
+
+do $$
+begin
+  if exists (select 1 from pg_partitioned_table where partrelid = 'public.usage_tracking'::regclass) then
+    return;
+  end if;
+
+  lock table public.usage_tracking in access exclusive mode;
+
+  alter table public.usage_tracking rename to usage_tracking_unpartitioned;
+  alter table public.usage_tracking_unpartitioned drop constraint if exists usage_tracking_pkey;
+  alter index if exists public.idx_usage_user_period rename to idx_usage_unpartitioned_user_period;
+  alter index if exists public.idx_usage_subscription rename to idx_usage_unpartitioned_subscription;
+  alter index if exists public.idx_usage_type rename to idx_usage_unpartitioned_type;
+  alter index if exists public.idx_usage_user_created_at rename to idx_usage_unpartitioned_user_created_at;
+
+  create table public.usage_tracking (
+    like public.usage_tracking_unpartitioned including defaults
+  ) partition by range (created_at);
+
+  alter table public.usage_tracking alter column created_at set not null;
+  alter table public.usage_tracking add primary key (id, created_at);
+  alter table public.usage_tracking
+    add foreign key (user_id) references public.users(id) on delete cascade,
+    add foreign key (subscription_id) references public.subscriptions(id) on delete set null,
+    add foreign key (contract_analysis_id) references public.contract_analyses(id) on delete set null;
+
+  perform public.ensure_monthly_partitions(
+    'public.usage_tracking',
+    coalesce((select min(created_at) from public.usage_tracking_unpartitioned), now())::date,
+    3);
+
+  insert into public.usage_tracking (
+    id, user_id, subscription_id, contract_analysis_id, usage_type, quantity, metadata,
+    billing_period_start, billing_period_end, created_at)
+  select id, user_id, subscription_id, contract_analysis_id, usage_type, quantity, metadata,
+         billing_period_start, billing_period_end, coalesce(created_at, now())
+    from public.usage_tracking_unpartitioned;
+
+  -- Retention deletes per user and created_at; lookups of one period's rows
+  -- now go through usage_period_counters
+  create index idx_usage_user_created_at on public.usage_tracking(user_id, created_at);
+  create index idx_usage_subscription on public.usage_tracking(subscription_id);
+
+  alter table public.usage_tracking enable row level security;
+  create policy usage_select_own on public.usage_tracking for select using (auth.uid() = user_id);
+end;
+$$;
+
+create table if not exists public.usage_period_counters (
+  user_id uuid not null references public.users(id) on delete cascade,
+  usage_type varchar(50) not null,
+  period_start timestamptz not null,
+  period_end timestamptz not null,
+  events bigint not null default 0,  -- usage_tracking rows
+  quantity bigint not null default 0,  -- sum of usage_tracking.quantity
+  updated_at timestamptz not null default now(),
+  primary key (user_id, usage_type, period_start)
+);
+
+alter table public.usage_period_counters enable row level security;
+drop policy if exists usage_counters_select_own on public.usage_period_counters;
+create policy usage_counters_select_own on public.usage_period_counters
+  for select using (auth.uid() = user_id);
+
+-- One upsert per (user, type, period) per statement; rows are taken in key
+-- order so concurrent multi-row inserts cannot deadlock on counter rows.
+create or replace function public.count_usage_rows()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into public.usage_period_counters as c
+         (user_id, usage_type, period_start, period_end, events, quantity)
+  select user_id, usage_type, billing_period_start, max(billing_period_end),
+         count(*), coalesce(sum(quantity), 0)
+    from inserted
+   group by user_id, usage_type, billing_period_start
+   order by user_id, usage_type, billing_period_start
+  on conflict (user_id, usage_type, period_start) do update
+     set events = c.events + excluded.events,
+         quantity = c.quantity + excluded.quantity,
+         period_end = greatest(c.period_end, excluded.period_end),
+         updated_at = now();
+  return null;
+end;
+$$;
+
+-- Rebuild the counters and attach the trigger with inserts blocked, so no
+-- row is counted twice or missed
+lock table public.usage_tracking in share row exclusive mode;
+
+insert into public.usage_period_counters as c
+       (user_id, usage_type, period_start, period_end, events, quantity)
+select user_id, usage_type, billing_period_start, max(billing_period_end),
+       count(*), coalesce(sum(quantity), 0)
+  from public.usage_tracking
+ group by user_id, usage_type, billing_period_start
+on conflict (user_id, usage_type, period_start) do update
+   set events = excluded.events,
+       quantity = excluded.quantity,
+       period_end = excluded.period_end,
+       updated_at = now();
+
+drop trigger if exists count_usage_rows on public.usage_tracking;
+create trigger count_usage_rows
+  after insert on public.usage_tracking
+  referencing new table as inserted
+  for each statement
+  execute function public.count_usage_rows();
+
+-- Usage in the subscription's current billing period: one counter row.
+-- Usage rows are stamped with the period of the subscription they were
+-- tracked under (SubscriptionService.track_usage).
+create or replace function public.get_current_usage(p_user_id uuid)
+returns table (
+  contracts_used integer,
+  contracts_limit integer,
+  overage integer,
+  billing_period_start timestamptz,
+  billing_period_end timestamptz
+)
+language sql
+stable
+as $$
+  select coalesce(c.events, 0)::integer,
+         sp.contracts_per_month,
+         greatest(coalesce(c.events, 0)::integer - sp.contracts_per_month, 0),
+         s.current_period_start,
+         s.current_period_end
+    from public.subscriptions s
+    join public.subscription_plans sp on sp.id = s.plan_id
+    left join public.usage_period_counters c
+      on c.user_id = s.user_id
+     and c.usage_type = 'contract_analysis'
+     and c.period_start = s.current_period_start
+   where s.user_id = p_user_id
+     and s.status in ('trial', 'active')
+   order by s.created_at desc
+   limit 1;
+$$;
+
+-- Overage is allowed (and charged), so any trial or active subscription may
+-- proceed; no usage needs to be read.
+create or replace function public.check_usage_limit(p_user_id uuid)
+returns boolean
+language sql
+stable
+as $$
+  select exists (
+    select 1 from public.subscriptions
+     where user_id = p_user_id and status in ('trial', 'active'));
+$$;
+
+commit;
@@ -0,0 +1,52 @@
+-- Scope full-text search to the caller's contracts
+--
+-- search_contracts (migrations/002_contracts_full_text_search.sql) matched
+-- every tenant's rows. It now takes p_user_id and only ranks that user's
+-- contracts; anonymous uploads (user_id null) are never returned. The GIN
+-- match on search_tsv is combined with idx_contracts_user_created_at_id
+-- (migrations/003_portfolio_rollups.sql) in a bitmap AND.
+
+drop function if exists public.search_contracts(text, integer, text, text);
+
+create or replace function public.search_contracts(
+  p_user_id uuid,
+  p_query text,
+  p_limit integer default 20,
+  p_contract_type text default null,
+  p_risk_level text default null
+)
+returns table (
+  id uuid,
+  filename text,
+  contract_type text,
+  risk_level text,
+  summary text,
+  created_at timestamptz,
+  rank real,
+  headline text
+)
+language sql
+stable
+as $$
+  with q as (
+    select websearch_to_tsquery('english', p_query) as query
+  ),
+  top as (
+    select c.id, c.filename, c.contract_type, c.risk_level, c.summary, c.key_terms, c.created_at,
+           ts_rank_cd(c.search_tsv, q.query, 32) as rank
+      from public.contracts c, q
+     where c.user_id = p_user_id
+       and c.search_tsv @@ q.query
+       and (p_contract_type is null or c.contract_type = p_contract_type)
+       and (p_risk_level is null or c.risk_level = p_risk_level)
+     order by rank desc, c.created_at desc
+     limit least(greatest(p_limit, 1), 100)
+  )
+  select top.id, top.filename, top.contract_type, top.risk_level, top.summary, top.created_at, top.rank,
+         ts_headline('english',
+                     coalesce(top.summary, '') || ' ' || coalesce(top.key_terms::text, ''),
+                     q.query,
+                     'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5')
+    from top, q
+   order by top.rank desc, top.created_at desc;
+$$;
@@ -0,0 +1,31 @@
+-- Index the extracted text in the same statement that inserts the contract
+--
+-- body_tsv (migrations/002_contracts_full_text_search.sql) was written by
+-- set_contract_body_tsv after each insert: a second full-row UPDATE that
+-- resent up to SEARCH_MAX_BODY_CHARS of text, rewrote the row (and its
+-- generated search_tsv) and bumped updated_at. insert_contract takes the row
+-- and the text together and computes body_tsv as part of the INSERT.
+--
+-- p_row carries the columns built by services/contract_storage.py
+-- contract_row; missing keys fall back to the column defaults below. Only id
+-- and created_at are returned so the tsvectors are not sent back.
+
+create or replace function public.insert_contract(p_row jsonb, p_body text default null)
+returns table (id uuid, created_at timestamptz)
+language sql
+as $$
+  insert into public.contracts as c (
+    filename, pages, file_size, content_type,
+    contract_type, parties, key_dates, key_terms, risk_level, summary, analysis_extra,
+    text_key, analyzer_fingerprint, user_id, body_tsv
+  )
+  select r.filename, coalesce(r.pages, 1), r.file_size, r.content_type,
+         r.contract_type, r.parties, r.key_dates, r.key_terms, r.risk_level, r.summary, r.analysis_extra,
+         r.text_key, r.analyzer_fingerprint, r.user_id,
+         case when p_body is not null then setweight(to_tsvector('english', p_body), 'D') end
+    from jsonb_populate_record(null::public.contracts, p_row) r
+  returning c.id, c.created_at;
+$$;
+
+-- No longer called by the application
+drop function if exists public.set_contract_body_tsv(uuid, text);
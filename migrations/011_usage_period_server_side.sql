@@ -0,0 +1,45 @@
+-- Stamp usage rows with the billing period on the server
+--
+-- SubscriptionService.track_usage stamped billing_period_start/end from the
+-- subscription it had cached for up to SUBSCRIPTION_CACHE_TTL_S. Right after
+-- a period rollover, workers still holding the old subscription counted
+-- usage against the previous period, and get_current_usage (which reads the
+-- counter for the subscription's current period) never saw it.
+--
+-- A BEFORE INSERT row trigger now takes the period and subscription from the
+-- user's current trial or active subscription, the same row
+-- get_current_usage reads, so the count_usage_rows statement trigger
+-- (migrations/008_usage_partitions_and_counters.sql) and any later counter
+-- rebuild key usage on the period that is current when it is recorded. Rows
+-- of users without such a subscription keep the client's stamp. The lookup
+-- uses idx_subscriptions_user_id.
+
+create or replace function public.stamp_usage_period()
+returns trigger
+language plpgsql
+as $$
+declare
+  current_sub record;
+begin
+  select s.id, s.current_period_start, s.current_period_end
+    into current_sub
+    from public.subscriptions s
+   where s.user_id = new.user_id
+     and s.status in ('trial', 'active')
+   order by s.created_at desc
+   limit 1;
+
+  if found then
+    new.subscription_id := current_sub.id;
+    new.billing_period_start := current_sub.current_period_start;
+    new.billing_period_end := current_sub.current_period_end;
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists stamp_usage_period on public.usage_tracking;
+create trigger stamp_usage_period
+  before insert on public.usage_tracking
+  for each row
+  execute function public.stamp_usage_period();
@@ -0,0 +1,68 @@
+-- Opt-in: range-partition public.contracts by month of created_at
+--
+-- With contracts partitioned, the retention job expires whole months with
+-- drop_partitions_before once they are older than the longest retention of
+-- any tenant (add "contracts" to RETENTION_PARTITIONED_TABLES). Per-tenant
+-- batch deletes still handle tenants with shorter retention.
+--
+-- Apply after migrations 001-007 in a maintenance window: the table is
+-- rewritten under an exclusive lock. The primary key becomes
+-- (id, created_at), as partitioned tables require. Keep
+-- contracts_unpartitioned until the copy is verified, then drop it.
+
+begin;
+
+lock table public.contracts in access exclusive mode;
+
+alter table public.contracts rename to contracts_unpartitioned;
+alter table public.contracts_unpartitioned drop constraint if exists contracts_pkey;
+
+create table public.contracts (
+  like public.contracts_unpartitioned including defaults including generated including storage
+) partition by range (created_at);
+
+alter table public.contracts alter column created_at set not null;
+alter table public.contracts add primary key (id, created_at);
+
+select public.ensure_monthly_partitions(
+  'public.contracts',
+  coalesce((select min(created_at) from public.contracts_unpartitioned), now())::date,
+  3);
+
+-- Copy rows (search_tsv is generated) before the rollup trigger exists
+insert into public.contracts (
+  id, filename, pages, file_size, content_type, contract_type, parties, key_dates,
+  key_terms, risk_level, summary, analysis_extra, text_key, analyzer_fingerprint,
+  user_id, body_tsv, created_at, updated_at)
+select id, filename, pages, file_size, content_type, contract_type, parties, key_dates,
+       key_terms, risk_level, summary, analysis_extra, text_key, analyzer_fingerprint,
+       user_id, body_tsv, coalesce(created_at, now()), updated_at
+  from public.contracts_unpartitioned;
+
+create index idx_contracts_created_at_id on public.contracts(created_at desc, id desc);
+create index idx_contracts_type_created_at_id on public.contracts(contract_type, created_at desc, id desc);
+create index idx_contracts_risk_created_at_id on public.contracts(risk_level, created_at desc, id desc);
+create index idx_contracts_user_created_at_id on public.contracts(user_id, created_at desc, id desc);
+create index idx_contracts_updated_at on public.contracts(updated_at);
+create index idx_contracts_search_tsv on public.contracts using gin (search_tsv);
+create index idx_contracts_text_key on public.contracts(text_key) where text_key is not null;
+-- Lookups by id alone (re-analysis, search hits) scan one index per partition
+create index idx_contracts_id on public.contracts(id);
+
+alter table public.contracts enable row level security;
+create policy "Enable read access for all users" on public.contracts
+  for select using (true);
+create policy "Enable insert access for all users" on public.contracts
+  for insert with check (true);
+
+create trigger set_updated_at
+  before update on public.contracts
+  for each row
+  execute function public.handle_updated_at();
+
+create trigger rollup_contract_insert
+  after insert on public.contracts
+  for each row
+  execute function public.rollup_contract_insert();
+
+commit;
@@ -0,0 +1,336 @@
+"""
+Pydantic models for API requests and responses.
+"""
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, Any
+from datetime import date, datetime
+from enum import Enum
+
+
+class AnalysisMode(str, Enum):
+    """How much of the analysis pipeline to run."""
+    FULL = "full"
+    RULES_ONLY = "rules_only"
+
+
+class ContractAnalysis(BaseModel):
+    """Contract analysis result schema."""
+    
+    contract_type: str = Field(description="Type of contract (NDA, MSA, etc.)")
+    parties: list[str] = Field(description="Parties involved")
+    key_dates: list[str] = Field(description="Important dates")
+    key_terms: list[str] = Field(description="Key terms and conditions")
+    risk_level: str = Field(description="Overall risk: Low, Medium, High")
+    summary: str = Field(description="Brief summary of the contract")
+
+
+class RuleExtraction(BaseModel):
+    """Candidates produced by the deterministic rule tier."""
+    
+    contract_type: Optional[str] = Field(default=None, description="Contract type detected from the title")
+    parties: list[str] = Field(default_factory=list, description="Parties found in the preamble")
+    key_dates: list[str] = Field(default_factory=list, description="Dates found in the text (ISO when parseable)")
+    amounts: list[str] = Field(default_factory=list, description="Monetary amounts found in the text")
+    governing_law: Optional[str] = Field(default=None, description="Governing law jurisdiction")
+    risk_signals: list[str] = Field(default_factory=list, description="Risk keywords that matched")
+    rules_fired: list[str] = Field(default_factory=list, description="Rule families that produced output")
+
+
+class NearDuplicateMatch(BaseModel):
+    """Nearest previously analyzed contract found by the MinHash/LSH index."""
+    
+    doc_id: str = Field(description="Content id of the matched contract")
+    similarity: float = Field(description="Estimated Jaccard similarity (0-1)")
+    reused: bool = Field(default=False, description="Whether the cached analysis was returned as-is")
+    changed_sections: list[str] = Field(default_factory=list, description="Sections that differ from the match")
+    analysis: Optional[ContractAnalysis] = Field(default=None, exclude=True, description="Cached analysis of the match")
+
+
+class ModelTier(str, Enum):
+    """Model tiers the analyzer can route to."""
+    DEFAULT = "default"
+    SMALL = "small"
+    LARGE = "large"
+
+
+class RoutingFeatures(BaseModel):
+    """Cheap document features used for model routing."""
+    
+    token_estimate: int = Field(description="Estimated prompt tokens")
+    section_count: int = Field(description="Number of sections/paragraphs")
+    rules_fired: list[str] = Field(default_factory=list, description="Rule families that produced output")
+    contract_type: Optional[str] = Field(default=None, description="Contract type detected by the rule tier")
+    risk_signal_count: int = Field(default=0, description="Distinct risk signals found by the rule tier")
+
+
+class RouteDecision(BaseModel):
+    """Model routing decision for one analysis."""
+    
+    tier: ModelTier = Field(description="Selected model tier")
+    model: str = Field(description="Model name sent to OpenAI")
+    reason: str = Field(description="Why this tier was selected")
+    features: RoutingFeatures = Field(description="Features the decision was based on")
+
+
+class ConversionPipeline(str, Enum):
+    """Docling pipeline configurations used for document conversion."""
+    DEFAULT = "default"  # docling's stock configuration (non-PDF inputs)
+    LIGHT = "light"  # born-digital PDFs: no OCR, no table-structure model
+    FULL = "full"  # scanned PDFs: OCR and table structure
+
+
+class DocumentSection(BaseModel):
+    """Markdown for a contiguous page range, streamed in page order."""
+    
+    start_page: int = Field(description="First page of the section (1-based)")
+    end_page: int = Field(description="Last page of the section (inclusive)")
+    total_pages: int = Field(description="Page count of the whole document")
+    pipeline: ConversionPipeline = Field(default=ConversionPipeline.DEFAULT, description="Conversion pipeline used")
+    text: str = Field(description="Markdown for the page range")
+
+
+class StreamedAnalysis(BaseModel):
+    """Result of analyzing a document while its sections were still converting."""
+    
+    analysis: ContractAnalysis
+    text: str = Field(description="Full document markdown")
+    pages: int = Field(description="Page count of the document")
+    pipeline: ConversionPipeline = Field(default=ConversionPipeline.DEFAULT, description="Conversion pipeline used")
+    near_duplicate: Optional[NearDuplicateMatch] = None
+    extract_s: float = Field(description="Seconds until the last section arrived")
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one contract submitted through the batch backend."""
+
+    job_id: str = Field(description="Caller-supplied id the request was submitted under")
+    analysis: Optional[ContractAnalysis] = Field(default=None, description="Validated analysis, if it succeeded")
+    error: Optional[str] = Field(default=None, description="Why the item failed")
+    model: Optional[str] = Field(default=None, description="Model the request was routed to")
+    tokens_used: Optional[int] = Field(default=None, description="Total tokens reported by the provider")
+
+
+class ReanalysisReport(BaseModel):
+    """Progress of a re-analysis job run."""
+
+    fingerprint: str = Field(description="Analyzer fingerprint records are refreshed to")
+    scanned: int = Field(default=0, description="Stale records read")
+    analyzed: int = Field(default=0, description="Records re-analyzed and updated")
+    failed: int = Field(default=0, description="Records whose re-analysis failed (still stale)")
+    missing_text: int = Field(default=0, description="Records whose stored text was not found")
+    after_id: Optional[str] = Field(default=None, description="Checkpoint: last record id processed")
+    finished: bool = Field(default=False, description="Whether every stale record was visited")
+
+
+class RetentionReport(BaseModel):
+    """Outcome of a data-retention run (or what it would delete, in a dry run)."""
+
+    dry_run: bool = Field(description="Whether nothing was deleted")
+    tenants: int = Field(default=0, description="Tenants whose retention was applied")
+    contract_rows: int = Field(default=0, description="Expired contracts rows")
+    contract_bytes: int = Field(default=0, description="Size of the expired contracts rows")
+    usage_rows: int = Field(default=0, description="Expired usage_tracking rows")
+    usage_bytes: int = Field(default=0, description="Size of the expired usage_tracking rows")
+    text_blobs: int = Field(default=0, description="Stored texts deleted (dry run: distinct keys of expired rows)")
+    text_bytes: int = Field(default=0, description="Compressed bytes of the stored texts deleted")
+    partitions_dropped: list[str] = Field(default_factory=list, description="Expired monthly partitions")
+    partition_bytes: int = Field(default=0, description="Size of the expired partitions")
+    elapsed_s: float = Field(default=0.0, description="Run time in seconds")
+
+
+class Priority(str, Enum):
+    """Scheduling priority of analysis work."""
+    INTERACTIVE = "interactive"  # a user is waiting on the response
+    BULK = "bulk"  # batches and background jobs; runs on idle capacity
+
+
+class Tenant(BaseModel):
+    """Who an analysis is scheduled for, with its plan's fair-share weight."""
+
+    id: str = Field(description="User id, or client address for anonymous callers")
+    plan: str = Field(description="Subscription plan name (PlanName value)")
+    weight: float = Field(default=1.0, gt=0, description="Fair-share weight of the plan")
+    max_concurrency: int = Field(default=1, ge=1, description="Max concurrent slots per scheduling lane")
+
+
+class DocumentMetadata(BaseModel):
+    """Document metadata schema."""
+    
+    filename: str = Field(description="Original filename")
+    pages: int = Field(default=1, description="Number of pages")
+    file_size: Optional[int] = Field(default=None, description="File size in bytes")
+    content_type: Optional[str] = Field(default=None, description="MIME type")
+    pipeline: Optional[ConversionPipeline] = Field(default=None, description="Conversion pipeline used")
+
+
+class AnalyzeResponse(BaseModel):
+    """Response model for contract analysis endpoint."""
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "request_id": "550e8400-e29b-41d4-a716-446655440000",
+            "filename": "contract.pdf",
+            "analysis": {
+                "contract_type": "NDA",
+                "parties": ["Company A", "Company B"],
+                "key_dates": ["2024-01-01"],
+                "key_terms": ["Confidentiality", "Non-disclosure"],
+                "risk_level": "Low",
+                "summary": "Standard NDA between two parties"
+            },
+            "metadata": {
+                "filename": "contract.pdf",
+                "pages": 5,
+                "file_size": 102400,
+                "content_type": "application/pdf"
+            },
+            "record_id": "123e4567-e89b-12d3-a456-426614174000",
+            "processing_time_ms": 1234
+        }
+    })
+    
+    request_id: str = Field(description="Unique request identifier")
+    filename: str = Field(description="Processed filename")
+    analysis: ContractAnalysis = Field(description="Contract analysis results")
+    metadata: DocumentMetadata = Field(description="Document metadata")
+    record_id: Optional[str] = Field(default=None, description="Database record ID if persisted")
+    near_duplicate: Optional[NearDuplicateMatch] = Field(default=None, description="Near-duplicate match and changed sections, if any")
+    processing_time_ms: int = Field(description="Processing time in milliseconds")
+
+
+class ContractSummary(BaseModel):
+    """One row of the contract history; fields not projected are omitted."""
+
+    id: str = Field(description="Record ID")
+    created_at: datetime = Field(description="When the analysis was stored")
+    filename: Optional[str] = None
+    pages: Optional[int] = None
+    file_size: Optional[int] = None
+    content_type: Optional[str] = None
+    contract_type: Optional[str] = None
+    risk_level: Optional[str] = None
+    summary: Optional[str] = None
+    parties: Optional[list[str]] = None
+    key_dates: Optional[list[str]] = None
+    key_terms: Optional[list[str]] = None
+    analysis: Optional[dict[str, Any]] = None
+    text_key: Optional[str] = Field(default=None, description="Text store key of the extracted text")
+    analyzer_fingerprint: Optional[str] = Field(default=None, description="Analyzer version that produced the analysis")
+
+
+class ReanalyzeResponse(BaseModel):
+    """Result of re-analyzing a stored contract from its extracted text."""
+
+    record_id: str
+    analysis: ContractAnalysis
+    text_key: str = Field(description="Text store key the analysis was run on")
+    analyzer_fingerprint: str = Field(description="Analyzer version that produced the analysis")
+    processing_time_ms: int
+
+
+class ContractListResponse(BaseModel):
+    """A page of contract history."""
+
+    items: list[ContractSummary] = Field(description="Contracts, newest first")
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to fetch the next page")
+
+
+class SearchHit(BaseModel):
+    """One full-text search match."""
+
+    id: str = Field(description="Record ID")
+    filename: Optional[str] = None
+    contract_type: Optional[str] = None
+    risk_level: Optional[str] = None
+    summary: Optional[str] = None
+    created_at: Optional[datetime] = None
+    rank: float = Field(description="Relevance score, higher is better")
+    highlights: list[str] = Field(default_factory=list, description="Matching fragments with <mark> tags")
+
+
+class SearchResponse(BaseModel):
+    """Full-text search results."""
+
+    query: str
+    hits: list[SearchHit]
+    took_ms: float = Field(description="Query time in milliseconds")
+
+
+class MonthlyRollup(BaseModel):
+    """Contracts analyzed in one calendar month."""
+
+    month: date = Field(description="First day of the month")
+    contracts: int = 0
+    by_risk: dict[str, int] = Field(default_factory=dict, description="Contracts per risk level")
+
+
+class CounterpartyCount(BaseModel):
+    """How many contracts name a party."""
+
+    party: str
+    contracts: int
+
+
+class PortfolioReport(BaseModel):
+    """Portfolio dashboard figures for one tenant."""
+
+    tenant: str = Field(description="Owner key the report covers")
+    total_contracts: int
+    by_type: dict[str, int] = Field(description="Contracts per contract type, largest first")
+    by_risk: dict[str, int] = Field(description="Contracts per risk level")
+    monthly: list[MonthlyRollup] = Field(description="Monthly series, oldest first")
+    top_counterparties: list[CounterpartyCount]
+
+
+class ErrorDetail(BaseModel):
+    """Error detail schema."""
+    
+    field: Optional[str] = Field(default=None, description="Field that caused the error")
+    message: str = Field(description="Error message")
+    type: Optional[str] = Field(default=None, description="Error type")
+
+
+class ErrorResponse(BaseModel):
+    """Standard error response schema."""
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "request_id": "550e8400-e29b-41d4-a716-446655440000",
+            "error": "Validation Error",
+            "message": "Invalid file format",
+            "details": [
+                {
+                    "field": "file",
+                    "message": "Only PDF and DOCX files are supported",
+                    "type": "value_error"
+                }
+            ],
+            "timestamp": "2024-01-08T12:00:00Z"
+        }
+    })
+    
+    request_id: str = Field(description="Unique request identifier")
+    error: str = Field(description="Error type")
+    message: str = Field(description="Human-readable error message")
+    details: Optional[list[ErrorDetail]] = Field(default=None, description="Detailed error information")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Error timestamp")
+
+
+class HealthResponse(BaseModel):
+    """Health check response schema."""
+    
+    status: str = Field(description="Service status: healthy, degraded, unhealthy")
+    version: str = Field(description="Application version")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Check timestamp")
+    checks: dict[str, Any] = Field(description="Individual component health checks")
+
+
+class MetricsResponse(BaseModel):
+    """Metrics response schema."""
+    
+    total_requests: int = Field(description="Total number of requests processed")
+    successful_requests: int = Field(description="Number of successful requests")
+    failed_requests: int = Field(description="Number of failed requests")
+    average_processing_time_ms: float = Field(description="Average processing time in milliseconds")
+    uptime_seconds: float = Field(description="Service uptime in seconds")
+
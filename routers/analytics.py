@@ -0,0 +1,38 @@
+"""
+Portfolio analytics API endpoints.
+"""
+from fastapi import APIRouter, Depends, Query
+
+from logger import get_logger
+from models import PortfolioReport
+from models.subscription_models import User
+from routers.contracts import require_db, require_user
+from services.analytics import PortfolioAnalytics, tenant_key
+from services.database import SupabaseService
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get(
+    "/portfolio",
+    response_model=PortfolioReport,
+    summary="Portfolio analytics",
+    description="Contract counts by type, risk distribution per month and top counterparties"
+)
+async def portfolio(
+    months: int = Query(12, ge=1, le=60, description="Length of the monthly series"),
+    top_parties: int = Query(10, ge=1, le=100, description="Number of counterparties to return"),
+    user: User = Depends(require_user),
+    db: SupabaseService = Depends(require_db)
+):
+    """
+    Portfolio dashboard for the caller's contracts (identify with `X-API-Key`
+    or a Bearer token; anonymous requests get 401).
+
+    Served from rollup tables maintained as contracts are stored, so the
+    response time does not grow with the number of contracts.
+    """
+    analytics = PortfolioAnalytics(db.client)
+    return await analytics.portfolio(
+        tenant_key(user.id), months=months, top_parties=top_parties)
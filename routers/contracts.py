@@ -0,0 +1,266 @@
+"""
+Contract history API endpoints.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from config import Settings, get_settings
+from dependencies import (
+    get_analyzer, get_db, get_optional_user, get_owner_id, get_search, get_tenant, get_text_store
+)
+from exceptions import ValidationError as AppValidationError
+from logger import get_logger
+from models import (
+    AnalysisMode,
+    ContractListResponse,
+    ContractSummary,
+    Priority,
+    ReanalyzeResponse,
+    SearchResponse,
+    Tenant,
+)
+from models.subscription_models import User
+from services import export
+from services.contract_analyzer import ContractAnalyzer
+from services.database import CONTRACT_LIST_COLUMNS, DEFAULT_LIST_COLUMNS, SupabaseService
+from services.scheduler import current_priority, current_tenant
+from services.search import SearchIndex
+from services.text_store import TextStore
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/contracts", tags=["Contracts"])
+
+
+def require_db(db: Optional[SupabaseService] = Depends(get_db)) -> SupabaseService:
+    """Dependency for endpoints that need the database."""
+    if db is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Contract history requires a configured database"
+        )
+    return db
+
+
+def require_user(user: Optional[User] = Depends(get_optional_user)) -> User:
+    """Dependency for endpoints that only serve the caller's own contracts."""
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required (X-API-Key header or Bearer token)",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
+
+
+def require_owner(owner_id: Optional[str] = Depends(get_owner_id)) -> str:
+    """Dependency for endpoints that also serve the local tenant when auth is off."""
+    if owner_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required (X-API-Key header or Bearer token)",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return owner_id
+
+
+def parse_fields(
+    fields: Optional[str],
+    default: tuple[str, ...] = DEFAULT_LIST_COLUMNS
+) -> tuple[str, ...]:
+    """Validate a comma-separated column projection."""
+    if not fields:
+        return default
+    columns = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [c for c in columns if c not in CONTRACT_LIST_COLUMNS]
+    if unknown:
+        raise AppValidationError(
+            message=f"Unknown fields: {', '.join(unknown)}",
+            details={"field": "fields", "allowed": list(CONTRACT_LIST_COLUMNS)}
+        )
+    return columns
+
+
+@router.get(
+    "",
+    response_model=ContractListResponse,
+    response_model_exclude_none=True,
+    summary="List analyzed contracts",
+    description="The caller's contract history, newest first, with cursor (keyset) pagination"
+)
+async def list_contracts(
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    contract_type: Optional[str] = Query(None, description="Only contracts of this type"),
+    risk_level: Optional[str] = Query(None, description="Only contracts with this risk level"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to return; defaults to a summary "
+                    "projection without the `analysis` JSON"),
+    user: User = Depends(require_user),
+    db: SupabaseService = Depends(require_db)
+):
+    """
+    List the caller's past analyses.
+
+    Pages continue from `cursor` on `(created_at, id)` instead of an offset,
+    so page 10,000 costs the same as page 1.
+    """
+    rows, next_cursor = await db.list_contracts(
+        str(user.id),
+        limit=limit,
+        cursor=cursor,
+        contract_type=contract_type,
+        risk_level=risk_level,
+        columns=parse_fields(fields),
+    )
+    return ContractListResponse(
+        items=[ContractSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export analyzed contracts",
+    description="Stream the caller's contract history as NDJSON, CSV or Parquet"
+)
+async def export_contracts(
+    format: Literal["ndjson", "csv", "parquet"] = Query("ndjson", description="Output format"),
+    contract_type: Optional[str] = Query(None, description="Only contracts of this type"),
+    risk_level: Optional[str] = Query(None, description="Only contracts with this risk level"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to export; defaults to every column "
+                    "except the raw `analysis` JSON"),
+    user: User = Depends(require_user),
+    db: SupabaseService = Depends(require_db),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Download every matching contract of the caller, newest first.
+
+    Rows are read in keyset pages and encoded as they arrive, so exports of
+    any size stream with constant memory.
+    """
+    columns = parse_fields(fields, default=export.EXPORT_DEFAULT_COLUMNS)
+    export.require_format(format)
+    batches = db.iter_contracts(
+        str(user.id),
+        batch_size=settings.export_batch_size,
+        contract_type=contract_type,
+        risk_level=risk_level,
+        columns=columns,
+    )
+    if format == "ndjson":
+        chunks = export.ndjson_chunks(batches)
+    elif format == "csv":
+        chunks = export.csv_chunks(batches, columns)
+    else:
+        chunks = export.parquet_chunks(batches, columns, settings.export_parquet_row_group_rows)
+
+    media_type, extension = export.EXPORT_FORMATS[format]
+    filename = f"contracts-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{extension}"
+    logger.info("Contract export started", extra={"format": format, "columns": len(columns)})
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    summary="Search analyzed contracts",
+    description="Full-text search over the caller's contracts: summaries, key terms, "
+                "parties and extracted text"
+)
+async def search_contracts(
+    q: str = Query(..., min_length=1, max_length=500,
+                   description='Words are ANDed; use `or`, "quoted phrases" and `-excluded`'),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of hits"),
+    contract_type: Optional[str] = Query(None, description="Only contracts of this type"),
+    risk_level: Optional[str] = Query(None, description="Only contracts with this risk level"),
+    owner_id: str = Depends(require_owner),
+    search: Optional[SearchIndex] = Depends(get_search)
+):
+    """
+    Find the caller's contracts matching a query, best match first, with
+    highlighted fragments.
+    """
+    if search is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search is disabled"
+        )
+    start = time.perf_counter()
+    hits = await search.search(
+        q, owner_id, limit=limit, contract_type=contract_type, risk_level=risk_level)
+    return SearchResponse(query=q, hits=hits, took_ms=round((time.perf_counter() - start) * 1000, 2))
+
+
+@router.post(
+    "/{record_id}/reanalyze",
+    response_model=ReanalyzeResponse,
+    summary="Re-analyze a stored contract",
+    description="Run the current prompt and model on a contract's stored extracted text"
+)
+async def reanalyze_contract(
+    record_id: UUID,
+    db: SupabaseService = Depends(require_db),
+    text_store: Optional[TextStore] = Depends(get_text_store),
+    analyzer: ContractAnalyzer = Depends(get_analyzer),
+    search: Optional[SearchIndex] = Depends(get_search),
+    tenant: Tenant = Depends(get_tenant),
+    user: User = Depends(require_user)
+):
+    """
+    Re-analyze one of the caller's contracts without re-uploading or
+    re-converting it.
+
+    The text extracted when the contract was first analyzed is read from the
+    text store, so docling is skipped entirely. The stored analysis is
+    replaced with the new one.
+    """
+    if text_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Re-analysis requires the text store"
+        )
+    start = time.perf_counter()
+    current_tenant.set(tenant)
+    current_priority.set(Priority.INTERACTIVE)
+
+    # Path ids are validated as UUIDs (422 otherwise) before reaching PostgREST
+    record_id = str(record_id)
+    row = await db.get_contract(record_id, columns=("filename", "text_key", "user_id"))
+    # Other users' contracts are indistinguishable from missing ones
+    if row is None or row.get("user_id") != str(user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contract not found")
+    text = await text_store.get(row["text_key"]) if row.get("text_key") else None
+    if text is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No stored text for this contract; upload the file again to analyze it"
+        )
+
+    analysis = await analyzer.analyze(text, mode=AnalysisMode.FULL)
+    fingerprint = analyzer.fingerprint_for(AnalysisMode.FULL)
+    await db.update_analysis(record_id, analysis.model_dump(), fingerprint)
+    if search:
+        await search.index_contract(
+            record_id, row["user_id"], {"filename": row.get("filename")}, analysis.model_dump(), text)
+
+    return ReanalyzeResponse(
+        record_id=record_id,
+        analysis=analysis,
+        text_key=row["text_key"],
+        analyzer_fingerprint=fingerprint,
+        processing_time_ms=int((time.perf_counter() - start) * 1000),
+    )
@@ -0,0 +1,269 @@
+"""
+Preload-and-fork server for multi-worker deployments.
+
+``uvicorn --workers N`` starts N independent interpreters that each import
+docling and load its models. This entry point loads them once in a master
+process, freezes the heap with ``gc.freeze()`` so the collector does not
+write to (and un-share) those pages, then forks N workers that serve from a
+shared listening socket. Model weights stay shared copy-on-write.
+
+The master restarts workers that exit and can report per-worker memory from
+``/proc/<pid>/smaps_rollup`` (Linux): PSS counts shared pages divided among
+the processes that map them, so RSS - PSS is the memory a worker saves by
+sharing.
+
+Page-range PDF conversion (``PARALLEL_PDF_ENABLED``) is turned off for
+preloaded workers: its spawned pool processes would each re-import docling
+and load private model copies in every worker, undoing the sharing.
+
+Forking is only safe while the master runs no threads: a child inherits
+locks held by threads that do not exist in it. The master therefore loads
+models with torch limited to one intra-op thread, so no OpenMP/MKL pool is
+started before the fork, and only builds pipelines (weights) without
+running a conversion. Each worker restores torch's thread count after the
+fork and starts its own pools on first use.
+
+Usage:
+    python serve.py --workers 4 --port 8000 --report-after 30
+    kill -USR1 <master pid>   # log a memory report on demand
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import get_settings
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def parse_smaps_rollup(text: str) -> dict[str, int]:
+    """Parse ``/proc/<pid>/smaps_rollup`` into kB per field."""
+    values = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in _SMAPS_FIELDS:
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def memory_report(pids: list[int]) -> dict:
+    """
+    Summarize RSS/PSS for worker processes.
+
+    Args:
+        pids: Worker process ids
+
+    Returns:
+        Per-worker MiB figures plus totals; ``saved_mb`` is RSS - PSS
+    """
+    workers = []
+    for pid in pids:
+        try:
+            fields = parse_smaps_rollup(Path(f"/proc/{pid}/smaps_rollup").read_text())
+        except OSError:
+            continue
+        rss, pss = fields.get("Rss", 0) / 1024, fields.get("Pss", 0) / 1024
+        workers.append({
+            "pid": pid,
+            "rss_mb": round(rss, 1),
+            "pss_mb": round(pss, 1),
+            "shared_mb": round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 1),
+            "private_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+            "saved_mb": round(rss - pss, 1),
+        })
+
+    count = len(workers) or 1
+    return {
+        "workers": workers,
+        "total_rss_mb": round(sum(w["rss_mb"] for w in workers), 1),
+        "total_pss_mb": round(sum(w["pss_mb"] for w in workers), 1),
+        "saved_mb_per_worker": round(sum(w["saved_mb"] for w in workers) / count, 1),
+    }
+
+
+# torch intra-op threads to restore in forked workers (None: torch not loaded)
+_worker_torch_threads: Optional[int] = None
+
+
+def _set_torch_threads(count: int) -> Optional[int]:
+    """Set torch's intra-op thread count; return the previous one, or None without torch."""
+    try:
+        import torch
+    except ImportError:
+        return None
+    previous = torch.get_num_threads()
+    torch.set_num_threads(count)
+    return previous
+
+
+def preload(settings) -> None:
+    """
+    Load read-only assets in the master before forking.
+
+    Imports the application and docling, warms the document processor
+    (models included) and registers it for ``initialize_services`` in every
+    worker, then freezes all objects allocated so far into the permanent
+    generation. The processor converts every PDF in-process, without the
+    page-range worker pool.
+
+    torch runs single-threaded in the master so no thread pool exists at
+    fork time; ``_prepare_worker`` restores its thread count in each worker.
+    """
+    global _worker_torch_threads
+    import main  # noqa: F401  (application code shared by all workers)
+    from dependencies import set_preloaded_processor
+    from services.document_processor import ContractProcessor
+
+    start = time.perf_counter()
+    if settings.parallel_pdf_enabled:
+        logger.info("Page-range PDF conversion disabled for preloaded workers")
+        settings = settings.model_copy(update={"parallel_pdf_enabled": False})
+    processor = ContractProcessor(settings)
+    _worker_torch_threads = _set_torch_threads(1)
+    processor.warm_up()
+    if not processor.ready:
+        logger.warning("Preload warm-up failed; workers will load docling on demand",
+                       extra={"error": processor.warmup_error})
+    set_preloaded_processor(processor)
+
+    if threading.active_count() > 1:
+        logger.warning("Threads running in the master before fork", extra={
+            "threads": [t.name for t in threading.enumerate() if t is not threading.main_thread()]
+        })
+
+    gc.collect()
+    gc.freeze()
+    logger.info("Preloaded shared assets", extra={
+        "seconds": round(time.perf_counter() - start, 2),
+        "frozen_objects": gc.get_freeze_count()
+    })
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _prepare_worker() -> None:
+    """Undo master-only settings in a forked child before it serves."""
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    if _worker_torch_threads is not None:
+        _set_torch_threads(_worker_torch_threads)
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    """Serve the application on the inherited socket (in a forked child)."""
+    import uvicorn
+    from main import app
+
+    _prepare_worker()
+    config = uvicorn.Config(app, log_level=log_level.lower(), lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, log_level)
+        except Exception:
+            logger.error("Worker crashed", exc_info=True)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(
+    host: str,
+    port: int,
+    workers: int,
+    report_after: Optional[float] = None,
+    report_path: Optional[str] = None
+) -> None:
+    """Preload, fork ``workers`` children and supervise them until SIGTERM/SIGINT."""
+    settings = get_settings()
+    setup_logging()
+    preload(settings)
+
+    sock = _bind(host, port)
+    children = {_spawn(sock, settings.log_level) for _ in range(workers)}
+    logger.info(f"Serving on http://{host}:{port}", extra={"workers": workers, "pids": sorted(children)})
+
+    stopping = False
+    report_due = time.monotonic() + report_after if report_after else None
+
+    def log_report(*_args) -> None:
+        report = memory_report(sorted(children))
+        logger.info("Worker memory report", extra=report)
+        if report_path:
+            Path(report_path).write_text(json.dumps(report, indent=2))
+
+    def stop(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, log_report)
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.discard(pid)
+            if not stopping:
+                logger.warning("Worker exited, restarting", extra={
+                    "pid": pid, "exit_code": os.waitstatus_to_exitcode(status)
+                })
+                children.add(_spawn(sock, settings.log_level))
+            continue
+        if report_due and time.monotonic() >= report_due:
+            log_report()
+            report_due = None
+        time.sleep(0.5)
+
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 2)))
+    parser.add_argument("--report-after", type=float,
+                        help="Log a worker memory report this many seconds after startup")
+    parser.add_argument("--report-path", help="Also write memory reports as JSON to this path")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork(); use uvicorn directly on this platform")
+    serve(args.host, args.port, args.workers, args.report_after, args.report_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Resource-aware admission control for contract analysis.
+
+Tracks in-flight upload bytes, in-flight document pages and outstanding
+OpenAI calls against configured budgets. Requests that do not fit wait in a
+short FIFO queue until a deadline; when the queue is full or the deadline
+passes they are rejected with ``ServiceOverloadedError`` (HTTP 503 with
+``Retry-After``) instead of piling more work onto an overloaded worker.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from exceptions import ServiceOverloadedError
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResourceBudget:
+    """
+    Capacity-limited resource with a bounded FIFO wait queue.
+
+    Requests larger than the whole capacity are clamped to it, so they are
+    admitted once the resource is otherwise idle rather than never.
+    """
+
+    def __init__(self, name: str, capacity: int, max_queue: int, retry_after_s: int):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.retry_after_s = retry_after_s
+        self.in_use = 0
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def _fits(self, amount: int) -> bool:
+        return self.in_use + amount <= self.capacity
+
+    def _reject(self, reason: str, amount: int) -> ServiceOverloadedError:
+        self._stats[f"rejected_{reason}"] += 1
+        logger.warning("Admission rejected", extra={
+            "resource": self.name,
+            "reason": reason,
+            "requested": amount,
+            "in_use": self.in_use,
+            "capacity": self.capacity,
+            "queue_depth": len(self._waiters)
+        })
+        return ServiceOverloadedError(
+            message=f"Server is at capacity for {self.name}, retry later",
+            retry_after=self.retry_after_s,
+            details={"resource": self.name, "reason": reason}
+        )
+
+    async def acquire(self, amount: int, timeout: float) -> int:
+        """
+        Reserve ``amount`` units, waiting up to ``timeout`` seconds.
+
+        Returns:
+            Units actually reserved (to pass to ``release``)
+
+        Raises:
+            ServiceOverloadedError: If the queue is full or the wait times out
+        """
+        amount = max(0, min(amount, self.capacity))
+        if not self._waiters and self._fits(amount):
+            self.in_use += amount
+            self._stats["admitted"] += 1
+            return amount
+
+        if len(self._waiters) >= self.max_queue or timeout <= 0:
+            raise self._reject("queue_full" if timeout > 0 else "timeout", amount)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (amount, future)
+        self._waiters.append(entry)
+        self._stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Granted just as the deadline passed
+                return amount
+            self._waiters.remove(entry)
+            self._wake()
+            raise self._reject("timeout", amount)
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(amount)
+            else:
+                self._waiters.remove(entry)
+                self._wake()
+            raise
+        return amount
+
+    def try_acquire(self, amount: int) -> bool:
+        """Reserve ``amount`` units only if they are free now, without queueing."""
+        if self._waiters or not self._fits(amount):
+            return False
+        self.in_use += amount
+        self._stats["admitted"] += 1
+        return True
+
+    def release(self, amount: int) -> None:
+        """Return units reserved by ``acquire`` or ``try_acquire``."""
+        self.in_use = max(0, self.in_use - amount)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._fits(self._waiters[0][0]):
+            amount, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_use += amount
+            self._stats["admitted"] += 1
+            future.set_result(None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "in_use": self.in_use,
+            "capacity": self.capacity,
+            "queue_depth": len(self._waiters),
+            **self._stats,
+        }
+
+
+class AdmissionTicket:
+    """Resources held by one analyze request; release them when done."""
+
+    def __init__(self, controller: "AdmissionController", size_bytes: int, deadline: float):
+        self._controller = controller
+        self._deadline = deadline
+        self.bytes = size_bytes
+        self.pages = 0
+
+    async def acquire_pages(self, pages: int) -> None:
+        """Reserve page budget before conversion, within the admission deadline."""
+        remaining = self._deadline - time.monotonic()
+        self.pages = await self._controller.pages.acquire(pages, remaining)
+
+    def release(self) -> None:
+        """Release everything held by this ticket (idempotent)."""
+        self._controller.bytes.release(self.bytes)
+        self._controller.pages.release(self.pages)
+        self.bytes = self.pages = 0
+
+
+class AdmissionController:
+    """
+    Budgets for in-flight bytes, pages and OpenAI calls.
+    """
+
+    def __init__(self, settings: Any):
+        self.queue_timeout_s = settings.admission_queue_timeout_ms / 1000
+        queue, retry_after = settings.admission_max_queue, settings.admission_retry_after_s
+        self.bytes = ResourceBudget(
+            "bytes", settings.admission_max_inflight_mb * 1024 * 1024, queue, retry_after)
+        self.pages = ResourceBudget(
+            "pages", settings.admission_max_inflight_pages, queue, retry_after)
+        self.openai_calls = ResourceBudget(
+            "openai_calls", settings.admission_max_openai_calls, queue, retry_after)
+
+    async def admit(self, size_bytes: int) -> AdmissionTicket:
+        """
+        Admit a request carrying ``size_bytes`` of upload.
+
+        Raises:
+            ServiceOverloadedError: If the byte budget stays exhausted
+        """
+        deadline = time.monotonic() + self.queue_timeout_s
+        granted = await self.bytes.acquire(size_bytes, self.queue_timeout_s)
+        return AdmissionTicket(self, granted, deadline)
+
+    @asynccontextmanager
+    async def openai_call(self) -> AsyncIterator[None]:
+        """Hold one outstanding-OpenAI-call slot for the duration of the block."""
+        granted = await self.openai_calls.acquire(1, self.queue_timeout_s)
+        try:
+            yield
+        finally:
+            self.openai_calls.release(granted)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Budget usage, queue depth and admission counters for ``/metrics``."""
+        return {
+            "bytes": self.bytes.snapshot(),
+            "pages": self.pages.snapshot(),
+            "openai_calls": self.openai_calls.snapshot(),
+        }
@@ -0,0 +1,139 @@
+"""
+Portfolio analytics from incrementally maintained rollup tables.
+
+Dashboards (contracts by type, risk distribution per month, top
+counterparties) read ``contract_rollups_monthly`` and
+``contract_party_rollups`` instead of scanning ``contracts``. Both are kept
+up to date by an insert trigger on ``contracts`` (see
+``migrations/003_portfolio_rollups.sql``), so a report reads at most one row
+per (month, type, risk) plus the top-N parties, however many contracts a
+tenant has.
+
+The trigger only sees inserts. ``compact_contract_rollups`` rebuilds the
+rollups from ``contracts`` for a recent window to fold in updates,
+deletions and late-arriving rows; run it periodically:
+
+    python -m services.analytics --days 35
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+
+from exceptions import DatabaseError
+from logger import get_logger, setup_logging
+from models import CounterpartyCount, MonthlyRollup, PortfolioReport
+
+logger = get_logger(__name__)
+
+ANONYMOUS_TENANT_KEY = "anonymous"
+
+
+def tenant_key(user_id: Optional[Any]) -> str:
+    """Rollup key for a contract owner (``anonymous`` when unowned)."""
+    return str(user_id) if user_id else ANONYMOUS_TENANT_KEY
+
+
+def _month_start(day: date, months_back: int) -> date:
+    index = day.year * 12 + day.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PortfolioAnalytics:
+    """
+    Reads portfolio reports from the rollup tables and triggers compaction.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def portfolio(
+        self,
+        key: str,
+        months: int = 12,
+        top_parties: int = 10
+    ) -> PortfolioReport:
+        """
+        Build the portfolio report for one tenant.
+
+        Args:
+            key: Tenant key from ``tenant_key``
+            months: Length of the monthly series, ending with the current month
+            top_parties: Number of counterparties to return
+
+        Raises:
+            DatabaseError: If the rollups cannot be read
+        """
+        try:
+            rollups = self.client.table("contract_rollups_monthly").select(
+                "month,contract_type,risk_level,contracts"
+            ).eq("tenant_key", key).execute().data or []
+            parties = self.client.table("contract_party_rollups").select(
+                "party,contracts"
+            ).eq("tenant_key", key).order("contracts", desc=True).limit(top_parties).execute().data or []
+        except Exception as e:
+            logger.error(f"Reading portfolio rollups failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Failed to read portfolio analytics: {str(e)}",
+                details={"error": str(e)}
+            ) from e
+
+        first_month = _month_start(datetime.now(timezone.utc).date(), months - 1)
+        by_type: dict[str, int] = defaultdict(int)
+        by_risk: dict[str, int] = defaultdict(int)
+        monthly: dict[date, MonthlyRollup] = {
+            _month_start(first_month, -offset): MonthlyRollup(month=_month_start(first_month, -offset))
+            for offset in range(months)
+        }
+        for row in rollups:
+            count = int(row["contracts"])
+            by_type[row["contract_type"]] += count
+            by_risk[row["risk_level"]] += count
+            month = date.fromisoformat(str(row["month"])[:10])
+            if month in monthly:
+                bucket = monthly[month]
+                bucket.contracts += count
+                bucket.by_risk[row["risk_level"]] = bucket.by_risk.get(row["risk_level"], 0) + count
+
+        return PortfolioReport(
+            tenant=key,
+            total_contracts=sum(by_type.values()),
+            by_type=dict(sorted(by_type.items(), key=lambda kv: -kv[1])),
+            by_risk=dict(by_risk),
+            monthly=list(monthly.values()),
+            top_counterparties=[
+                CounterpartyCount(party=row["party"], contracts=int(row["contracts"])) for row in parties
+            ],
+        )
+
+    async def compact(self, since: datetime) -> int:
+        """
+        Rebuild rollups for contracts created or updated since ``since``.
+
+        Returns:
+            Number of monthly rollup rows rewritten
+        """
+        res = self.client.rpc("compact_contract_rollups", {"p_since": since.isoformat()}).execute()
+        rows = res.data if isinstance(res.data, int) else 0
+        logger.info("Compacted portfolio rollups", extra={"since": since.isoformat(), "rows": rows})
+        return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, help="Rebuild rollups for this many days back "
+                                                 "(default: ANALYTICS_COMPACTION_LOOKBACK_DAYS)")
+    args = parser.parse_args()
+
+    from config import get_settings
+    from services.database import SupabaseService
+
+    setup_logging()
+    days = args.days if args.days is not None else get_settings().analytics_compaction_lookback_days
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    asyncio.run(PortfolioAnalytics(SupabaseService().client).compact(since))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Batch backend for non-interactive bulk analysis.
+
+Instead of one synchronous chat completion per contract, bulk work (re-analysis,
+discovery loads) is written to a JSONL file of chat completion requests keyed
+by job id, submitted through a provider batch interface, polled until it
+finishes, and mapped back to per-job ``ContractAnalysis`` results. Batch
+requests are billed at a discount and run against a separate rate limit, so
+large corpora do not compete with interactive traffic.
+
+The transport is pluggable: ``OpenAIBatchTransport`` uses the OpenAI Files and
+Batches endpoints; ``LocalBatchTransport`` completes batches from a local
+directory with a responder function, for tests and offline runs.
+"""
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from openai import AsyncOpenAI
+
+from exceptions import ContractAnalysisError, OpenAIError
+from logger import get_logger
+from models import BatchItemResult, RouteDecision, RuleExtraction
+from services.contract_analyzer import ContractAnalyzer
+
+logger = get_logger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Provider statuses after which a batch will not change any more
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchStatus:
+    """Provider-side state of one submitted batch."""
+    batch_id: str
+    status: str
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+class BatchTransport(ABC):
+    """Submits request files to a batch interface and fetches their output."""
+
+    @abstractmethod
+    async def submit(self, input_path: Path, completion_window: str) -> str:
+        """Submit a JSONL request file; returns the provider batch id."""
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> BatchStatus:
+        """Current state of a submitted batch."""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> list[dict]:
+        """Output and error records of a finished batch (OpenAI batch output format)."""
+
+
+class OpenAIBatchTransport(BatchTransport):
+    """Batch transport backed by the OpenAI Files and Batches API."""
+
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+
+    async def submit(self, input_path: Path, completion_window: str) -> str:
+        uploaded = await self.client.files.create(file=input_path, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window=completion_window,
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> BatchStatus:
+        batch = await self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchStatus(
+            batch_id=batch_id,
+            status=batch.status,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            total=counts.total if counts else 0,
+        )
+
+    async def results(self, batch_id: str) -> list[dict]:
+        batch = await self.client.batches.retrieve(batch_id)
+        records = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                records.extend(_read_jsonl(content.text))
+        return records
+
+
+class LocalBatchTransport(BatchTransport):
+    """
+    File-based stand-in for a provider batch interface.
+
+    Batches complete on submit: each request body is passed to ``responder``,
+    which returns the assistant message content (or raises to fail the item).
+    """
+
+    def __init__(self, directory: Path, responder: Callable[[dict], str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+
+    def _output_path(self, batch_id: str) -> Path:
+        return self.directory / f"{batch_id}.output.jsonl"
+
+    async def submit(self, input_path: Path, completion_window: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        lines = []
+        for request in _read_jsonl(Path(input_path).read_text(encoding="utf-8")):
+            record: dict[str, Any] = {"id": f"req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"]}
+            try:
+                content = self.responder(request["body"])
+                record["response"] = {"status_code": 200, "body": {
+                    "model": request["body"].get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                    "usage": None,
+                }}
+                record["error"] = None
+            except Exception as e:
+                record["response"] = None
+                record["error"] = {"code": "responder_error", "message": str(e)}
+            lines.append(json.dumps(record))
+        self._output_path(batch_id).write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return batch_id
+
+    async def status(self, batch_id: str) -> BatchStatus:
+        path = self._output_path(batch_id)
+        if not path.exists():
+            return BatchStatus(batch_id=batch_id, status="failed")
+        records = _read_jsonl(path.read_text(encoding="utf-8"))
+        failed = sum(1 for record in records if record["error"])
+        return BatchStatus(batch_id=batch_id, status="completed",
+                           completed=len(records) - failed, failed=failed, total=len(records))
+
+    async def results(self, batch_id: str) -> list[dict]:
+        return _read_jsonl(self._output_path(batch_id).read_text(encoding="utf-8"))
+
+
+def _read_jsonl(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class BatchAnalyzer:
+    """
+    Bulk contract analysis through a batch transport.
+
+    Prompts, model routing and output validation are the ones
+    ``ContractAnalyzer`` uses for synchronous requests. For every submitted
+    batch a manifest with each job's route and rule candidates is kept next
+    to the request file, so results can be collected by a later process.
+    """
+
+    def __init__(
+        self,
+        analyzer: ContractAnalyzer,
+        transport: Optional[BatchTransport] = None,
+        settings: Optional[object] = None
+    ):
+        self.analyzer = analyzer
+        self.settings = settings or analyzer.settings
+        self.transport = transport or OpenAIBatchTransport(analyzer.client)
+        self.work_dir = Path(self.settings.openai_batch_work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+
+    def _manifest_path(self, batch_id: str) -> Path:
+        return self.work_dir / f"{batch_id}.manifest.json"
+
+    def _write_requests(self, items: list[tuple[str, str]]) -> tuple[Path, dict[str, dict]]:
+        path = self.work_dir / f"requests_{uuid.uuid4().hex[:12]}.jsonl"
+        manifest = {}
+        with path.open("w", encoding="utf-8") as fh:
+            for job_id, contract_text in items:
+                body, route, rules = self.analyzer.build_request(contract_text)
+                fh.write(json.dumps({
+                    "custom_id": job_id,
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_URL,
+                    "body": body,
+                }) + "\n")
+                manifest[job_id] = {
+                    "route": route.model_dump(mode="json"),
+                    "rules": rules.model_dump(mode="json"),
+                }
+        return path, manifest
+
+    async def submit(self, items: Iterable[tuple[str, str]]) -> list[str]:
+        """
+        Write and submit request files for ``(job_id, contract_text)`` pairs.
+
+        Items are split into batches of at most ``openai_batch_max_requests``.
+
+        Returns:
+            Provider batch ids, in submission order
+        """
+        items = list(items)
+        if len({job_id for job_id, _ in items}) != len(items):
+            raise ContractAnalysisError(message="Batch job ids must be unique")
+
+        size = self.settings.openai_batch_max_requests
+        batch_ids = []
+        for offset in range(0, len(items), size):
+            chunk = items[offset:offset + size]
+            path, manifest = await asyncio.to_thread(self._write_requests, chunk)
+            try:
+                batch_id = await self.transport.submit(path, self.settings.openai_batch_completion_window)
+            except Exception as e:
+                logger.error(f"Batch submission failed: {str(e)}", exc_info=True)
+                raise OpenAIError(
+                    message=f"Failed to submit batch: {str(e)}",
+                    details={"error": str(e), "requests": len(chunk)}
+                ) from e
+            self._manifest_path(batch_id).write_text(json.dumps(manifest), encoding="utf-8")
+            batch_ids.append(batch_id)
+            logger.info("Submitted analysis batch", extra={
+                "batch_id": batch_id, "requests": len(chunk), "input_file": str(path)
+            })
+        return batch_ids
+
+    async def wait(self, batch_id: str, timeout: Optional[float] = None) -> BatchStatus:
+        """
+        Poll until the batch reaches a terminal status.
+
+        Raises:
+            OpenAIError: If ``timeout`` seconds pass first
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            status = await self.transport.status(batch_id)
+            if status.done:
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                raise OpenAIError(
+                    message=f"Batch {batch_id} did not finish in time",
+                    details={"batch_id": batch_id, "status": status.status}
+                )
+            logger.debug("Batch in progress", extra={
+                "batch_id": batch_id, "status": status.status,
+                "completed": status.completed, "total": status.total
+            })
+            await asyncio.sleep(self.settings.openai_batch_poll_interval_s)
+
+    async def collect(self, batch_id: str) -> dict[str, BatchItemResult]:
+        """
+        Map a finished batch's output back to per-job results.
+
+        Jobs without an output record (e.g. an expired batch) are returned
+        with an error so callers can resubmit them.
+        """
+        manifest = json.loads(self._manifest_path(batch_id).read_text(encoding="utf-8"))
+        results: dict[str, BatchItemResult] = {}
+        for record in await self.transport.results(batch_id):
+            job_id = record.get("custom_id")
+            if job_id not in manifest:
+                continue
+            results[job_id] = self._to_result(job_id, record, manifest[job_id])
+
+        for job_id in manifest.keys() - results.keys():
+            results[job_id] = BatchItemResult(job_id=job_id, error="No result returned for request")
+
+        failed = sum(1 for result in results.values() if result.error)
+        logger.info("Collected analysis batch", extra={
+            "batch_id": batch_id, "succeeded": len(results) - failed, "failed": failed
+        })
+        return results
+
+    def _to_result(self, job_id: str, record: dict, entry: dict) -> BatchItemResult:
+        route = RouteDecision.model_validate(entry["route"])
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or (response.get("body") or {}).get("error") or {}
+            return BatchItemResult(job_id=job_id, model=route.model,
+                                   error=error.get("message") or f"status {response.get('status_code')}")
+
+        body = response["body"]
+        usage = body.get("usage") or {}
+        try:
+            analysis = self.analyzer.parse_completion(
+                body["choices"][0]["message"]["content"],
+                route,
+                RuleExtraction.model_validate(entry["rules"]),
+            )
+        except (ContractAnalysisError, KeyError, IndexError, TypeError) as e:
+            message = e.message if isinstance(e, ContractAnalysisError) else f"Malformed response: {e}"
+            return BatchItemResult(job_id=job_id, model=route.model, error=message)
+        return BatchItemResult(job_id=job_id, analysis=analysis, model=route.model,
+                               tokens_used=usage.get("total_tokens"))
+
+    async def run(
+        self,
+        items: Iterable[tuple[str, str]],
+        timeout: Optional[float] = None
+    ) -> dict[str, BatchItemResult]:
+        """Submit, wait for and collect ``(job_id, contract_text)`` pairs."""
+        results: dict[str, BatchItemResult] = {}
+        for batch_id in await self.submit(items):
+            await self.wait(batch_id, timeout)
+            results.update(await self.collect(batch_id))
+        return results
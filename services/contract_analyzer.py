@@ -1,7 +1,12 @@
 """
 Contract analysis service using OpenAI API with async support and retry logic.
 """
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
+import time
 from openai import AsyncOpenAI
 from pydantic import ValidationError
 from tenacity import (
@@ -10,46 +15,148 @@ from tenacity import (
     wait_exponential,
     retry_if_exception_type
 )
-from typing import Optional
+from typing import AsyncIterable, Optional
 
 from config import get_settings
-from models import ContractAnalysis
-from exceptions import ContractAnalysisError, OpenAIError
+from models import (
+    AnalysisMode,
+    ContractAnalysis,
+    ConversionPipeline,
+    DocumentSection,
+    NearDuplicateMatch,
+    RouteDecision,
+    RuleExtraction,
+    StreamedAnalysis,
+)
+from exceptions import ContractAnalysisError, OpenAIError, ServiceOverloadedError
 from logger import get_logger
+from services.admission import AdmissionController
+from services.scheduler import TenantScheduler
+from services.hedging import HedgingPolicy
+from services.model_router import ModelRouter
+from services.near_duplicate import NearDuplicateIndex
+from services.rule_extractor import RuleExtractor
 
 logger = get_logger(__name__)
 
+# Bump when parsing or post-processing changes in a way the prompt and
+# settings captured by ``ContractAnalyzer.fingerprint`` do not reflect
+ANALYZER_REVISION = 1
+
+# Fingerprint stored for rule-tier-only analyses, which no model produced
+RULES_ONLY_FINGERPRINT = "rules_only"
+
+_PROBE_RULES = RuleExtraction(parties=["<party>"], key_dates=["<date>"])
+
+
+async def _chat_create(client: AsyncOpenAI, **kwargs):
+    """Create a chat completion (module-level seam for tests and stand-ins)."""
+    return await client.chat.completions.create(**kwargs)
+
 
 class ContractAnalyzer:
     """
     Async contract analyzer using OpenAI API with retry logic.
     """
 
-    def __init__(self, settings: Optional[object] = None):
-        """Initialize the analyzer with settings."""
+    def __init__(
+        self,
+        settings: Optional[object] = None,
+        admission: Optional[AdmissionController] = None,
+        scheduler: Optional[TenantScheduler] = None
+    ):
+        """Initialize the analyzer with settings, optional admission control and fair scheduling."""
         self.settings = settings or get_settings()
+        self.admission = admission
+        self.scheduler = scheduler
         self.client = AsyncOpenAI(
             api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
             timeout=self.settings.openai_timeout,
             max_retries=0  # We handle retries with tenacity
         )
+        self.rule_extractor = RuleExtractor()
+        self.router = ModelRouter(self.settings)
+        self.hedging: Optional[HedgingPolicy] = None
+        if self.settings.openai_hedge_enabled:
+            self.hedging = HedgingPolicy(
+                percentile=self.settings.openai_hedge_percentile,
+                budget_ratio=self.settings.openai_hedge_budget_ratio,
+                min_delay_s=self.settings.openai_hedge_min_delay_ms / 1000,
+                min_samples=self.settings.openai_hedge_min_samples,
+                capacity=admission.openai_calls if admission else None,
+            )
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        if self.settings.near_duplicate_enabled:
+            self.near_duplicates = NearDuplicateIndex(self.settings.near_duplicate_index_path)
         logger.info("ContractAnalyzer initialized", extra={
             "model": self.settings.openai_model,
-            "max_tokens": self.settings.openai_max_tokens
+            "max_tokens": self.settings.openai_max_tokens,
+            "fingerprint": self.fingerprint
         })
 
+    def fingerprint_inputs(self) -> dict:
+        """Everything that determines what an analysis of a given text looks like."""
+        settings = self.settings
+        inputs = {
+            "revision": ANALYZER_REVISION,
+            "prompt": self._build_messages("<contract>"),
+            "prompt_with_candidates": self._build_messages("<contract>", _PROBE_RULES),
+            "delta_prompt": self._build_delta_messages(
+                "<contract>", NearDuplicateMatch(doc_id="<doc>", similarity=0.9, changed_sections=["<section>"])),
+            "schema": ContractAnalysis.model_json_schema(),
+            "model": settings.openai_model,
+            "max_tokens": settings.openai_max_tokens,
+            "temperature": settings.openai_temperature,
+            "max_contract_chars": settings.max_contract_chars,
+        }
+        if settings.model_routing_enabled:
+            inputs["routing"] = {
+                "small_model": settings.openai_small_model,
+                "large_model": settings.openai_large_model,
+                "high_risk_signals": settings.routing_high_risk_signals,
+                "small_max_tokens": settings.routing_small_max_tokens,
+                "small_max_sections": settings.routing_small_max_sections,
+                "small_contract_types": sorted(settings.routing_small_contract_types),
+            }
+        return inputs
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """
+        Version of this analyzer's prompt, models and settings.
+
+        Stored with every analysis; records whose fingerprint differs were
+        produced by an older prompt or model and are stale.
+        """
+        raw = json.dumps(self.fingerprint_inputs(), sort_keys=True, separators=(",", ":"))
+        return f"v{ANALYZER_REVISION}-{hashlib.sha256(raw.encode()).hexdigest()[:16]}"
+
+    def fingerprint_for(self, mode: AnalysisMode) -> str:
+        """Fingerprint to store for an analysis run in ``mode``."""
+        return RULES_ONLY_FINGERPRINT if mode == AnalysisMode.RULES_ONLY else self.fingerprint
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((OpenAIError, Exception)),
         reraise=True
     )
-    async def _call_openai(self, messages: list[dict]) -> str:
+    async def _call_openai(
+        self,
+        messages: list[dict],
+        route: Optional[RouteDecision] = None
+    ) -> str:
         """
         Call OpenAI API with retry logic.
 
         Args:
             messages: List of message dictionaries
+            route: Routing decision selecting the model; defaults to
+                ``settings.openai_model``
+
+        When hedging is enabled, a duplicate request is sent if no response
+        has arrived by the configured latency percentile for the model.
 
         Returns:
             Assistant's response text
@@ -57,25 +164,38 @@ class ContractAnalyzer:
         Raises:
             OpenAIError: If API call fails after retries
         """
+        model = route.model if route else self.settings.openai_model
+        start = time.perf_counter()
         try:
-            logger.debug("Calling OpenAI API", extra={
-                         "model": self.settings.openai_model})
-
-            response = await self.client.chat.completions.create(
-                model=self.settings.openai_model,
-                messages=messages,
-                max_tokens=self.settings.openai_max_tokens,
-                temperature=self.settings.openai_temperature
-            )
+            logger.debug("Calling OpenAI API", extra={"model": model})
+
+            def create():
+                return _chat_create(
+                    self.client,
+                    model=model,
+                    messages=messages,
+                    max_tokens=self.settings.openai_max_tokens,
+                    temperature=self.settings.openai_temperature
+                )
+
+            if self.hedging is not None:
+                response = await self.hedging.run(create, key=model)
+            else:
+                response = await create()
 
             content = response.choices[0].message.content
+            total_tokens = response.usage.total_tokens if response.usage else None
             logger.debug("OpenAI API call successful", extra={
-                "tokens_used": response.usage.total_tokens if response.usage else None
+                "tokens_used": total_tokens
             })
+            if route:
+                self.router.record(route, time.perf_counter() - start, total_tokens)
 
             return content
 
         except Exception as e:
+            if route:
+                self.router.record(route, time.perf_counter() - start, None, success=False)
             logger.error(f"OpenAI API call failed: {str(e)}", exc_info=True)
             raise OpenAIError(
                 message=f"Failed to call OpenAI API: {str(e)}",
@@ -122,12 +242,270 @@ class ContractAnalyzer:
                     details={"response_preview": text[:200]}
                 )
 
-    async def analyze(self, contract_text: str) -> ContractAnalysis:
+    def _build_messages(
+        self,
+        contract_text: str,
+        rules: Optional[RuleExtraction] = None
+    ) -> list[dict]:
+        """
+        Build the chat messages for a contract analysis request.
+
+        When rule candidates are available they are included in the prompt
+        and the model may return null for parties/key_dates to accept them,
+        which keeps the completion short.
+        """
+        prompt = (
+            "You are a legal contract analyzer. Extract the following fields and "
+            "return a JSON object with keys: contract_type, parties (list), "
+            "key_dates (list), key_terms (list), risk_level, summary. Be concise.\n\n"
+        )
+
+        if rules and (rules.parties or rules.key_dates):
+            candidates = {
+                "parties": rules.parties,
+                "key_dates": rules.key_dates,
+                "contract_type": rules.contract_type,
+                "governing_law": rules.governing_law,
+                "amounts": rules.amounts,
+            }
+            prompt += (
+                "Candidates were pre-extracted deterministically:\n"
+                f"{json.dumps(candidates)}\n"
+                "If the candidate parties or key_dates are complete and correct, "
+                "set that key to null instead of repeating them.\n\n"
+            )
+
+        prompt += f"CONTRACT:\n{contract_text}"
+
+        return [
+            {"role": "system", "content": "You are a helpful legal contract analyzer."},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _build_delta_messages(
+        self,
+        contract_text: str,
+        match: NearDuplicateMatch
+    ) -> list[dict]:
+        """
+        Build messages for a near-duplicate: the neighbour's analysis plus
+        only the sections of the new contract that differ from it.
+        """
+        changed = "\n\n".join(match.changed_sections) or contract_text
+        if len(changed) > self.settings.max_contract_chars:
+            changed = changed[:self.settings.max_contract_chars] + "..."
+
+        prompt = (
+            "You are a legal contract analyzer. A near-identical contract "
+            f"(similarity {match.similarity:.2f}) was previously analyzed as:\n"
+            f"{match.analysis.model_dump_json() if match.analysis else '{}'}\n\n"
+            "Only the sections below differ from that contract. Return the full, "
+            "updated JSON object with keys: contract_type, parties (list), "
+            "key_dates (list), key_terms (list), risk_level, summary. Be concise.\n\n"
+            f"CHANGED SECTIONS:\n{changed}"
+        )
+
+        return [
+            {"role": "system", "content": "You are a helpful legal contract analyzer."},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _truncate(self, contract_text: str) -> str:
+        """Truncate contract text to the configured model budget."""
+        if len(contract_text) > self.settings.max_contract_chars:
+            logger.warning(
+                f"Contract text truncated from {len(contract_text)} to {self.settings.max_contract_chars} chars"
+            )
+            return contract_text[:self.settings.max_contract_chars] + "..."
+        return contract_text
+
+    async def find_near_duplicate(
+        self,
+        contract_text: str,
+        user_id: Optional[str] = None
+    ) -> Optional[NearDuplicateMatch]:
+        """
+        Look up the nearest contract previously analyzed for the same user
+        by this analyzer's ``fingerprint``.
+
+        The signature covers the text the model would see, so matches above
+        ``near_duplicate_reuse_threshold`` are marked for direct reuse.
+
+        Args:
+            contract_text: The contract text to match
+            user_id: Owner of the contract; anonymous uploads are not matched
+
+        Returns:
+            NearDuplicateMatch or None if disabled or nothing is similar enough
+        """
+        if self.near_duplicates is None or user_id is None:
+            return None
+
+        text = contract_text[:self.settings.max_contract_chars]
+        loop = asyncio.get_running_loop()
+        try:
+            match = await loop.run_in_executor(
+                None,
+                self.near_duplicates.find,
+                text,
+                self.settings.near_duplicate_threshold,
+                user_id,
+                self.fingerprint
+            )
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {str(e)}")
+            return None
+
+        if match:
+            match.reused = match.similarity >= self.settings.near_duplicate_reuse_threshold
+            logger.info("Near-duplicate contract found", extra={
+                "doc_id": match.doc_id,
+                "similarity": match.similarity,
+                "changed_sections": len(match.changed_sections),
+                "reused": match.reused
+            })
+        return match
+
+    async def _remember(self, contract_text: str, analysis: ContractAnalysis, user_id: Optional[str]) -> None:
+        """Add an analyzed contract to the user's near-duplicate index."""
+        if self.near_duplicates is None or user_id is None:
+            return
+
+        text = contract_text[:self.settings.max_contract_chars]
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                None, self.near_duplicates.add, text, analysis, user_id, self.fingerprint)
+        except Exception as e:
+            logger.warning(f"Failed to index contract for near-duplicate detection: {str(e)}")
+
+    def _apply_rule_candidates(self, parsed: dict, rules: RuleExtraction) -> dict:
+        """Fill fields the model accepted (null/missing/empty) from rule candidates."""
+        for key in ("parties", "key_dates"):
+            if not parsed.get(key):
+                parsed[key] = getattr(rules, key)
+        if not parsed.get("contract_type") and rules.contract_type:
+            parsed["contract_type"] = rules.contract_type
+        return parsed
+
+    async def _complete(
+        self,
+        messages: list[dict],
+        route: RouteDecision,
+        rules: RuleExtraction
+    ) -> ContractAnalysis:
+        """
+        Run one model completion and validate it into a ContractAnalysis.
+
+        Raises:
+            ContractAnalysisError: If the output is not valid JSON or does
+                not match the schema
+        """
+        # Call OpenAI with retry logic once it is this tenant's turn,
+        # holding an outstanding-call slot
+        turn = self.scheduler.llm.slot() if self.scheduler else contextlib.nullcontext()
+        slot = self.admission.openai_call() if self.admission else contextlib.nullcontext()
+        async with turn, slot:
+            assistant_text = await self._call_openai(messages, route)
+
+        return self.parse_completion(assistant_text, route, rules)
+
+    def parse_completion(
+        self,
+        assistant_text: str,
+        route: RouteDecision,
+        rules: RuleExtraction
+    ) -> ContractAnalysis:
+        """
+        Validate model output into a ContractAnalysis.
+
+        Used for synchronous completions and for results of batch requests
+        built by ``build_request``.
+
+        Raises:
+            ContractAnalysisError: If the output is not valid JSON or does
+                not match the schema
+        """
+        # Parse JSON response
+        parsed = self._apply_rule_candidates(
+            self._parse_json_response(assistant_text), rules
+        )
+
+        # Validate with Pydantic
+        try:
+            analysis = ContractAnalysis.model_validate(parsed)
+        except ValidationError as e:
+            logger.error("Contract analysis validation failed",
+                         extra={"errors": e.errors(), "model": route.model})
+            raise ContractAnalysisError(
+                message="Contract analysis did not match expected schema",
+                details={"validation_errors": e.errors()}
+            ) from e
+
+        logger.info("Contract analysis completed successfully", extra={
+            "contract_type": analysis.contract_type,
+            "risk_level": analysis.risk_level,
+            "model": route.model,
+            "tier": route.tier.value
+        })
+        return analysis
+
+    def _prepare(
+        self,
+        contract_text: str,
+        rules: RuleExtraction,
+        near_duplicate: Optional[NearDuplicateMatch] = None
+    ) -> tuple[list[dict], RouteDecision]:
+        """Build the prompt messages and pick the model for one analysis."""
+        if near_duplicate and near_duplicate.analysis:
+            messages = self._build_delta_messages(contract_text, near_duplicate)
+        else:
+            messages = self._build_messages(self._truncate(contract_text), rules)
+
+        route = self.router.route(
+            self.router.features(messages[-1]["content"], contract_text, rules)
+        )
+        return messages, route
+
+    def build_request(self, contract_text: str) -> tuple[dict, RouteDecision, RuleExtraction]:
+        """
+        Build a chat completion request body without sending it.
+
+        Used by the batch backend, which submits many bodies at once and
+        validates the results later with ``parse_completion``.
+
+        Returns:
+            Tuple of (request body, routing decision, rule candidates)
+        """
+        rules = self.rule_extractor.extract(contract_text)
+        messages, route = self._prepare(contract_text, rules)
+        body = {
+            "model": route.model,
+            "messages": messages,
+            "max_tokens": self.settings.openai_max_tokens,
+            "temperature": self.settings.openai_temperature,
+        }
+        return body, route, rules
+
+    async def analyze(
+        self,
+        contract_text: str,
+        mode: AnalysisMode = AnalysisMode.FULL,
+        near_duplicate: Optional[NearDuplicateMatch] = None,
+        user_id: Optional[str] = None
+    ) -> ContractAnalysis:
         """
         Analyze contract text and return a validated ContractAnalysis object.
 
         Args:
             contract_text: The contract text to analyze
+            mode: ``full`` runs the rule tier then the model; ``rules_only``
+                returns the rule tier result without calling OpenAI
+            near_duplicate: Match from ``find_near_duplicate``; reused matches
+                are returned with this text's rule-tier parties and dates,
+                others send only the changed sections
+            user_id: Owner of the contract, whose near-duplicate index the
+                result is added to
 
         Returns:
             ContractAnalysis object with extracted information
@@ -136,50 +514,43 @@ class ContractAnalyzer:
             ContractAnalysisError: If analysis fails
         """
         try:
-            # Truncate text if too long
-            if len(contract_text) > self.settings.max_contract_chars:
-                logger.warning(
-                    f"Contract text truncated from {len(contract_text)} to {self.settings.max_contract_chars} chars"
-                )
-                contract_text = contract_text[:self.settings.max_contract_chars] + "..."
-
-            # Build prompt
-            prompt = (
-                "You are a legal contract analyzer. Extract the following fields and "
-                "return a JSON object with keys: contract_type, parties (list), "
-                "key_dates (list), key_terms (list), risk_level, summary. Be concise.\n\n"
-                f"CONTRACT:\n{contract_text}"
-            )
+            # Deterministic tier runs over the full text before truncation
+            rules = self.rule_extractor.extract(contract_text)
 
-            messages = [
-                {"role": "system", "content": "You are a helpful legal contract analyzer."},
-                {"role": "user", "content": prompt},
-            ]
+            if mode == AnalysisMode.RULES_ONLY:
+                analysis = self.rule_extractor.to_analysis(rules)
+                logger.info("Rule-only contract analysis completed", extra={
+                    "contract_type": analysis.contract_type,
+                    "rules_fired": rules.rules_fired
+                })
+                return analysis
 
-            # Call OpenAI with retry logic
-            assistant_text = await self._call_openai(messages)
+            if near_duplicate and near_duplicate.reused and near_duplicate.analysis:
+                logger.info("Reusing analysis of near-duplicate contract", extra={
+                    "doc_id": near_duplicate.doc_id,
+                    "similarity": near_duplicate.similarity
+                })
+                # Parties and dates are what template variants differ in
+                return near_duplicate.analysis.model_copy(
+                    update={"parties": rules.parties, "key_dates": rules.key_dates})
 
-            # Parse JSON response
-            parsed = self._parse_json_response(assistant_text)
+            full_text = contract_text
+            messages, route = self._prepare(contract_text, rules, near_duplicate)
 
-            # Validate with Pydantic
             try:
-                analysis = ContractAnalysis.model_validate(parsed)
-                logger.info("Contract analysis completed successfully", extra={
-                    "contract_type": analysis.contract_type,
-                    "risk_level": analysis.risk_level
-                })
-                return analysis
+                analysis = await self._complete(messages, route, rules)
+            except ContractAnalysisError:
+                fallback = self.router.fallback(route)
+                if fallback is None:
+                    raise
+                logger.warning("Small model output failed validation, retrying with large model",
+                               extra={"model": fallback.model})
+                analysis = await self._complete(messages, fallback, rules)
 
-            except ValidationError as e:
-                logger.error("Contract analysis validation failed",
-                             extra={"errors": e.errors()})
-                raise ContractAnalysisError(
-                    message="Contract analysis did not match expected schema",
-                    details={"validation_errors": e.errors()}
-                ) from e
+            await self._remember(full_text, analysis, user_id)
+            return analysis
 
-        except (OpenAIError, ContractAnalysisError):
+        except (OpenAIError, ContractAnalysisError, ServiceOverloadedError):
             raise
         except Exception as e:
             logger.error(
@@ -188,3 +559,93 @@ class ContractAnalyzer:
                 message=f"Unexpected error during analysis: {str(e)}",
                 details={"error": str(e)}
             ) from e
+
+    async def _analyze_head(
+        self,
+        head_text: str,
+        user_id: Optional[str]
+    ) -> tuple[ContractAnalysis, Optional[NearDuplicateMatch]]:
+        """Analyze the leading sections that fill the model's context budget."""
+        near_duplicate = await self.find_near_duplicate(head_text, user_id)
+        analysis = await self.analyze(head_text, near_duplicate=near_duplicate, user_id=user_id)
+        return analysis, near_duplicate
+
+    def _merge_tail(self, analysis: ContractAnalysis, head_text: str, tail_text: str) -> ContractAnalysis:
+        """Merge rule-tier results from text the model did not see into its analysis."""
+        head_rules = self.rule_extractor.extract(head_text)
+        tail_rules = self.rule_extractor.extract(tail_text)
+        seen = {date.casefold() for date in analysis.key_dates + head_rules.key_dates}
+        extra_dates = [date for date in tail_rules.key_dates if date.casefold() not in seen]
+        update = {}
+        if extra_dates:
+            update["key_dates"] = analysis.key_dates + extra_dates
+        if not analysis.parties and tail_rules.parties:
+            update["parties"] = tail_rules.parties
+        return analysis.model_copy(update=update) if update else analysis
+
+    async def analyze_stream(
+        self,
+        sections: AsyncIterable[DocumentSection],
+        user_id: Optional[str] = None
+    ) -> StreamedAnalysis:
+        """
+        Analyze a document while its later sections are still being extracted.
+
+        The model only sees the first ``max_contract_chars`` of a contract, so
+        as soon as the streamed sections cover that budget the model call is
+        started; the remaining sections are consumed concurrently and folded
+        in with the rule tier once extraction finishes. Short documents fall
+        back to ``analyze`` on the full text.
+
+        Args:
+            sections: Document sections in page order, e.g. from
+                ``ContractProcessor.stream_sections``
+            user_id: Owner of the contract, scoping near-duplicate matches
+
+        Returns:
+            StreamedAnalysis with the analysis, full text and page count
+
+        Raises:
+            ContractAnalysisError: If analysis fails
+            DocumentProcessingError: If extraction of a section fails
+        """
+        start = time.perf_counter()
+        parts: list[str] = []
+        collected = 0
+        pages = 0
+        pipeline = ConversionPipeline.DEFAULT
+        head_task: Optional[asyncio.Task] = None
+
+        try:
+            async for section in sections:
+                parts.append(section.text)
+                collected += len(section.text)
+                pages = section.total_pages
+                pipeline = section.pipeline
+                if head_task is None and collected >= self.settings.max_contract_chars:
+                    logger.info("Starting analysis before extraction finished", extra={
+                        "through_page": section.end_page,
+                        "total_pages": section.total_pages
+                    })
+                    head_task = asyncio.create_task(self._analyze_head("\n\n".join(parts), user_id))
+            extract_s = time.perf_counter() - start
+            full_text = "\n\n".join(parts)
+
+            if head_task is None:
+                analysis, near_duplicate = await self._analyze_head(full_text, user_id)
+            else:
+                analysis, near_duplicate = await head_task
+                budget = self.settings.max_contract_chars
+                analysis = self._merge_tail(analysis, full_text[:budget], full_text[budget:])
+        finally:
+            if head_task is not None and not head_task.done():
+                head_task.cancel()
+
+        return StreamedAnalysis(
+            analysis=analysis,
+            text=full_text,
+            pages=pages,
+            pipeline=pipeline,
+            near_duplicate=near_duplicate,
+            extract_s=extract_s,
+        )
@@ -0,0 +1,152 @@
+"""
+Row layout of the ``contracts`` table.
+
+The analysis is stored once: filterable fields as typed columns
+(``ANALYSIS_COLUMNS``) and any remaining keys in the small ``analysis_extra``
+JSONB (null when there are none). ``contract_row`` builds an insert payload
+and ``compose_analysis`` rebuilds the analysis dict from a row.
+
+Rows written before ``migrations/004_slim_contract_rows.sql`` also carry the
+full ``analysis`` JSONB. ``SlimBackfill`` moves them to the slim layout in
+keyset batches and reports bytes per row before and after:
+
+    python -m services.contract_storage --batch-size 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from exceptions import DatabaseError
+from logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# Analysis fields stored as their own columns
+ANALYSIS_COLUMNS = ("contract_type", "parties", "key_dates", "key_terms", "risk_level", "summary")
+
+
+def analysis_columns(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Typed columns plus ``analysis_extra`` for one analysis."""
+    row = {column: analysis.get(column) for column in ANALYSIS_COLUMNS}
+    row["analysis_extra"] = {k: v for k, v in analysis.items() if k not in ANALYSIS_COLUMNS} or None
+    return row
+
+
+def contract_row(
+    metadata: dict[str, Any],
+    analysis: dict[str, Any],
+    user_id: Optional[str] = None,
+    text_key: Optional[str] = None,
+    analyzer_fingerprint: Optional[str] = None
+) -> dict[str, Any]:
+    """Insert payload for one analyzed contract in the slim layout."""
+    row = {
+        "filename": metadata.get("filename"),
+        "pages": metadata.get("pages", 1),
+        "file_size": metadata.get("file_size"),
+        "content_type": metadata.get("content_type"),
+    }
+    row.update(analysis_columns(analysis))
+    if user_id:
+        row["user_id"] = user_id
+    if text_key:
+        row["text_key"] = text_key
+    if analyzer_fingerprint:
+        row["analyzer_fingerprint"] = analyzer_fingerprint
+    return row
+
+
+def compose_analysis(row: dict[str, Any]) -> dict[str, Any]:
+    """Rebuild the analysis dict from the typed columns and ``analysis_extra``."""
+    analysis = {column: row.get(column) for column in ANALYSIS_COLUMNS}
+    analysis.update(row.get("analysis_extra") or {})
+    return analysis
+
+
+def payload_bytes(row: dict[str, Any]) -> int:
+    """Size of a row as sent to PostgREST (compact JSON)."""
+    return len(json.dumps(row, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+class SlimBackfill:
+    """
+    Moves legacy rows to the slim layout through the ``slim_contracts_batch``
+    RPC, one keyset batch (ordered by ``id``) per call.
+    """
+
+    def __init__(self, client: Any, batch_size: int = 1000):
+        self.client = client
+        self.batch_size = batch_size
+
+    def _rpc(self, name: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+        try:
+            res = self.client.rpc(name, params).execute()
+        except Exception as e:
+            logger.error(f"{name} failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Contract storage backfill failed: {str(e)}",
+                details={"error": str(e), "function": name}
+            ) from e
+        return res.data or []
+
+    async def stats(self) -> dict[str, Any]:
+        """Row count, rows still in the legacy layout, average row and table bytes."""
+        rows = await asyncio.to_thread(self._rpc, "contract_storage_stats", {})
+        return rows[0] if rows else {}
+
+    async def run(self, max_batches: Optional[int] = None) -> dict[str, Any]:
+        """
+        Slim every legacy row (or the first ``max_batches`` batches).
+
+        Each batch commits on its own, so the job can be interrupted and
+        rerun; already slim rows are skipped.
+
+        Returns:
+            Report with storage stats before and after and the rows scanned
+        """
+        before = await self.stats()
+        after_id: Optional[str] = None
+        scanned = batches = 0
+        start = time.perf_counter()
+
+        while before.get("legacy_rows") != 0 and (max_batches is None or batches < max_batches):
+            rows = await asyncio.to_thread(
+                self._rpc, "slim_contracts_batch", {"p_after": after_id, "p_limit": self.batch_size})
+            processed = int(rows[0]["processed"]) if rows else 0
+            if not processed:
+                break
+            scanned += processed
+            batches += 1
+            after_id = rows[0]["last_id"]
+            logger.info("Slimmed contracts batch", extra={"batch": batches, "rows": scanned})
+            if processed < self.batch_size:
+                break
+
+        report = {
+            "rows_scanned": scanned,
+            "batches": batches,
+            "elapsed_s": round(time.perf_counter() - start, 2),
+            "before": before,
+            "after": await self.stats(),
+        }
+        logger.info("Contract storage backfill finished", extra=report)
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    args = parser.parse_args()
+
+    from services.database import SupabaseService
+
+    setup_logging()
+    backfill = SlimBackfill(SupabaseService().client, batch_size=args.batch_size)
+    print(json.dumps(asyncio.run(backfill.run(args.max_batches)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
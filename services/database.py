@@ -1,16 +1,89 @@
 """
 Database service for Supabase with async support and error handling.
 """
-from typing import Any, Optional
+import asyncio
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
 from supabase import create_client, Client
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from config import get_settings
-from exceptions import DatabaseError
+from exceptions import DatabaseError, ValidationError
 from logger import get_logger
+from services.contract_analyzer import RULES_ONLY_FINGERPRINT
+from services.contract_storage import (
+    ANALYSIS_COLUMNS,
+    analysis_columns,
+    compose_analysis,
+    contract_row,
+)
 
 logger = get_logger(__name__)
 
+# Columns a contract listing may project; ``analysis`` is rebuilt from the
+# typed columns and ``analysis_extra`` (see services.contract_storage)
+CONTRACT_LIST_COLUMNS = (
+    "id", "created_at", "filename", "pages", "file_size", "content_type",
+    "contract_type", "risk_level", "summary", "parties", "key_dates", "key_terms",
+    "analysis", "text_key", "analyzer_fingerprint",
+)
+DEFAULT_LIST_COLUMNS = (
+    "id", "created_at", "filename", "pages", "contract_type", "risk_level", "summary",
+)
+
+
+def encode_cursor(created_at: str, record_id: str) -> str:
+    """Opaque keyset cursor for the row a page ended on."""
+    raw = json.dumps({"c": created_at, "i": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode a cursor from ``encode_cursor``.
+
+    Both values are checked before they reach a query, so a tampered cursor
+    is rejected here instead of failing in Postgres.
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at, record_id = str(data["c"]), str(data["i"])
+        datetime.fromisoformat(created_at)
+        UUID(record_id)
+        return created_at, record_id
+    except Exception as e:
+        raise ValidationError(
+            message="Invalid pagination cursor",
+            details={"field": "cursor"}
+        ) from e
+
+
+def _select_columns(columns: tuple[str, ...]) -> list[str]:
+    """Table columns to select for a projection (``analysis`` is rebuilt)."""
+    wanted = [c for c in columns if c != "analysis"]
+    if "analysis" in columns:
+        wanted += list(ANALYSIS_COLUMNS) + ["analysis_extra"]
+    return list(dict.fromkeys(["id", "created_at"] + wanted))
+
+
+def _project(rows: list[dict[str, Any]], selected: list[str], columns: tuple[str, ...]) -> list[dict[str, Any]]:
+    """Rebuild ``analysis`` and drop the columns selected only to build it."""
+    if "analysis" not in columns:
+        return rows
+    helpers = set(selected) - set(columns) - {"id", "created_at"}
+    for row in rows:
+        row["analysis"] = compose_analysis(row)
+        for column in helpers:
+            row.pop(column, None)
+    return rows
+
 
 class SupabaseService:
     """
@@ -60,7 +133,11 @@ class SupabaseService:
     async def insert_contract(
         self,
         metadata: dict[str, Any],
-        analysis: dict[str, Any]
+        analysis: dict[str, Any],
+        user_id: Optional[str] = None,
+        text_key: Optional[str] = None,
+        analyzer_fingerprint: Optional[str] = None,
+        body_text: Optional[str] = None
     ) -> dict[str, Any]:
         """
         Insert contract analysis into database with retry logic.
@@ -68,6 +145,11 @@ class SupabaseService:
         Args:
             metadata: Document metadata
             analysis: Contract analysis results
+            user_id: Owner of the contract, if the caller was identified
+            text_key: Text store key of the extracted text, if it was stored
+            analyzer_fingerprint: ``ContractAnalyzer.fingerprint`` that produced the analysis
+            body_text: Extracted text to index for full-text search in the same
+                statement (``SearchIndex.row_body``), if any
 
         Returns:
             Inserted record data
@@ -76,26 +158,22 @@ class SupabaseService:
             DatabaseError: If insertion fails
         """
         try:
-            payload = {
-                "filename": metadata.get("filename"),
-                "pages": metadata.get("pages", 1),
-                "file_size": metadata.get("file_size"),
-                "content_type": metadata.get("content_type"),
-                "contract_type": analysis.get("contract_type"),
-                "parties": analysis.get("parties"),
-                "key_dates": analysis.get("key_dates"),
-                "key_terms": analysis.get("key_terms"),
-                "risk_level": analysis.get("risk_level"),
-                "summary": analysis.get("summary"),
-                "analysis": analysis,
-            }
+            payload = contract_row(
+                metadata, analysis, user_id, text_key, analyzer_fingerprint)
 
             logger.debug("Inserting contract into database", extra={
                 "filename": payload["filename"],
                 "contract_type": payload["contract_type"]
             })
 
-            res = self.table.insert(payload).execute()
+            if body_text is None:
+                res = await asyncio.to_thread(self.table.insert(payload).execute)
+            else:
+                # body_tsv is computed by the insert (migrations/010_contract_body_tsv_on_insert.sql)
+                res = await asyncio.to_thread(self.client.rpc("insert_contract", {
+                    "p_row": payload,
+                    "p_body": body_text,
+                }).execute)
 
             # Check for errors
             if hasattr(res, 'error') and res.error:
@@ -105,6 +183,9 @@ class SupabaseService:
                 )
 
             record = res.data[0] if res.data else None
+            if record and body_text is not None:
+                # The RPC returns only id and created_at
+                record = {**payload, **record}
 
             if record:
                 logger.info("Contract inserted successfully", extra={
@@ -123,6 +204,219 @@ class SupabaseService:
                 details={"error": str(e), "payload": payload}
             ) from e
 
+    def _fetch_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str],
+        contract_type: Optional[str],
+        risk_level: Optional[str],
+        columns: tuple[str, ...]
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """Run one keyset page query (blocking); see ``list_contracts``."""
+        selected = _select_columns(columns)
+        # Served by idx_contracts_user_created_at_id
+        query = self.table.select(",".join(selected)).eq("user_id", user_id)
+        if contract_type:
+            query = query.eq("contract_type", contract_type)
+        if risk_level:
+            query = query.eq("risk_level", risk_level)
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            # Values are quoted: timestamps contain ':' and '+'
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{record_id}")'
+            )
+
+        try:
+            res = (
+                query.order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit + 1)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Listing contracts failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Failed to list contracts: {str(e)}",
+                details={"error": str(e)}
+            ) from e
+
+        rows = _project(res.data or [], selected, columns)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def list_contracts(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        contract_type: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        columns: tuple[str, ...] = DEFAULT_LIST_COLUMNS
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """
+        List a user's contracts newest first with keyset pagination.
+
+        Pages are ordered by ``(created_at desc, id desc)`` and continue
+        strictly after the cursor row, so every page is an index range scan
+        of ``limit + 1`` rows regardless of how deep it is (no OFFSET).
+
+        Args:
+            user_id: Owner of the contracts
+            limit: Page size
+            cursor: ``next_cursor`` from the previous page
+            contract_type: Only contracts of this type
+            risk_level: Only contracts with this risk level
+            columns: Columns to return (``id`` and ``created_at`` are always included)
+
+        Returns:
+            Tuple of (rows, next cursor or None on the last page)
+
+        Raises:
+            ValidationError: If the cursor is malformed
+            DatabaseError: If the query fails
+        """
+        return await asyncio.to_thread(
+            self._fetch_page, user_id, limit, cursor, contract_type, risk_level, columns)
+
+    async def iter_contracts(
+        self,
+        user_id: str,
+        batch_size: int = 1000,
+        contract_type: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        columns: tuple[str, ...] = DEFAULT_LIST_COLUMNS
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Yield every matching contract of ``user_id`` in keyset pages of
+        ``batch_size`` rows.
+
+        Queries run in a worker thread and the next page is fetched while the
+        caller processes the current one, so only two pages are ever held.
+        """
+        page = await asyncio.to_thread(
+            self._fetch_page, user_id, batch_size, None, contract_type, risk_level, columns)
+        while True:
+            rows, cursor = page
+            next_page = None
+            if cursor:
+                next_page = asyncio.ensure_future(asyncio.to_thread(
+                    self._fetch_page, user_id, batch_size, cursor, contract_type, risk_level, columns))
+            try:
+                if rows:
+                    yield rows
+            except BaseException:
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            if next_page is None:
+                return
+            page = await next_page
+
+    def _get_contract(self, record_id: str, columns: tuple[str, ...]) -> Optional[dict[str, Any]]:
+        selected = _select_columns(columns)
+        try:
+            res = self.table.select(",".join(selected)).eq("id", record_id).limit(1).execute()
+        except Exception as e:
+            logger.error(f"Fetching contract failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Failed to fetch contract: {str(e)}",
+                details={"error": str(e), "record_id": record_id}
+            ) from e
+        rows = _project(res.data or [], selected, columns)
+        return rows[0] if rows else None
+
+    async def get_contract(
+        self,
+        record_id: str,
+        columns: tuple[str, ...] = DEFAULT_LIST_COLUMNS
+    ) -> Optional[dict[str, Any]]:
+        """
+        Fetch one contract by id.
+
+        Returns:
+            The row projected to ``columns``, or None if it does not exist
+
+        Raises:
+            DatabaseError: If the query fails
+        """
+        return await asyncio.to_thread(self._get_contract, record_id, columns)
+
+    def _update_analysis(
+        self,
+        record_id: str,
+        analysis: dict[str, Any],
+        analyzer_fingerprint: Optional[str]
+    ) -> None:
+        values = analysis_columns(analysis)
+        values["analyzer_fingerprint"] = analyzer_fingerprint
+        try:
+            self.table.update(values).eq("id", record_id).execute()
+        except Exception as e:
+            logger.error(f"Updating contract analysis failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Failed to update contract analysis: {str(e)}",
+                details={"error": str(e), "record_id": record_id}
+            ) from e
+
+    async def update_analysis(
+        self,
+        record_id: str,
+        analysis: dict[str, Any],
+        analyzer_fingerprint: Optional[str] = None
+    ) -> None:
+        """
+        Replace the stored analysis of one contract.
+
+        Raises:
+            DatabaseError: If the update fails
+        """
+        await asyncio.to_thread(self._update_analysis, record_id, analysis, analyzer_fingerprint)
+        logger.info("Contract analysis updated", extra={"record_id": record_id})
+
+    def _stale_page(self, fingerprint: str, after_id: Optional[str], limit: int) -> list[dict[str, Any]]:
+        query = (
+            self.table.select("id,filename,text_key,analyzer_fingerprint,user_id")
+            .not_.is_("text_key", "null")
+            .or_(
+                "analyzer_fingerprint.is.null,"
+                f'and(analyzer_fingerprint.neq."{fingerprint}",'
+                f'analyzer_fingerprint.neq."{RULES_ONLY_FINGERPRINT}")'
+            )
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+        try:
+            return query.order("id").limit(limit).execute().data or []
+        except Exception as e:
+            logger.error(f"Listing stale contracts failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Failed to list stale contracts: {str(e)}",
+                details={"error": str(e)}
+            ) from e
+
+    async def list_stale_contracts(
+        self,
+        fingerprint: str,
+        after_id: Optional[str] = None,
+        limit: int = 100
+    ) -> list[dict[str, Any]]:
+        """
+        Contracts with stored text whose analysis came from another analyzer
+        fingerprint, in ``id`` order after ``after_id``.
+
+        Rule-tier-only analyses are never stale: no prompt or model made them.
+
+        Raises:
+            DatabaseError: If the query fails
+        """
+        return await asyncio.to_thread(self._stale_page, fingerprint, after_id, limit)
+
     async def health_check(self) -> bool:
         """
         Check database connectivity.
@@ -2,48 +2,170 @@
 Document processing service with async support and error handling.
 """
 import asyncio
-from pathlib import Path
-from typing import Optional
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Optional
 
+from config import get_settings
 from exceptions import DocumentProcessingError
 from logger import get_logger
+from models import ConversionPipeline, DocumentSection
 
 logger = get_logger(__name__)
 
 # Lazily import docling to avoid hard dependency during tests
 DocumentConverter = None
 
+# Rough size of one page of a non-PDF document, for admission estimates
+BYTES_PER_PAGE_ESTIMATE = 30 * 1024
+
+# Per-process converters used by page-range workers, keyed by pipeline
+_worker_converters: dict = {}
+
+
+def _pdf_page_count(file_path: str) -> Optional[int]:
+    """Count PDF pages with pypdfium2 (a docling dependency), or None if unavailable."""
+    try:
+        import pypdfium2
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.debug(f"Could not count PDF pages: {str(e)}")
+        return None
+
+
+def _pdf_text_chars_per_page(file_path: str, probe_pages: int) -> Optional[float]:
+    """
+    Average embedded text-layer characters over the first ``probe_pages`` pages.
+
+    Reads only the PDF text layer (no rendering), so it costs milliseconds.
+    Returns None if the PDF cannot be opened.
+    """
+    try:
+        import pypdfium2
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            pages = min(len(pdf), probe_pages)
+            if not pages:
+                return 0.0
+            chars = 0
+            for index in range(pages):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                chars += len(textpage.get_text_range().strip())
+                textpage.close()
+                page.close()
+            return chars / pages
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.debug(f"Could not probe PDF text layer: {str(e)}")
+        return None
+
+
+def _converter_class():
+    """Import docling's DocumentConverter on first use (the import loads torch)."""
+    global DocumentConverter
+    if DocumentConverter is None:
+        from docling.document_converter import DocumentConverter as _DC
+        DocumentConverter = _DC
+        logger.info("DocumentConverter loaded successfully")
+    return DocumentConverter
+
+
+def _build_converter(pipeline: ConversionPipeline):
+    """
+    Build a docling converter for a pipeline.
+
+    ``light`` skips OCR and the table-structure model for born-digital PDFs;
+    ``full`` enables both for scanned documents; ``default`` is docling's
+    stock configuration.
+    """
+    converter_class = _converter_class()
+
+    if pipeline == ConversionPipeline.DEFAULT:
+        return converter_class()
+
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import PdfFormatOption
+
+    options = PdfPipelineOptions()
+    options.do_ocr = pipeline == ConversionPipeline.FULL
+    options.do_table_structure = pipeline == ConversionPipeline.FULL
+    return converter_class(format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=options)})
+
+
+def page_ranges(total_pages: int, chunk_pages: int) -> list[tuple[int, int]]:
+    """Split ``total_pages`` into 1-based inclusive ranges of ``chunk_pages``."""
+    return [
+        (start, min(start + chunk_pages - 1, total_pages))
+        for start in range(1, total_pages + 1, chunk_pages)
+    ]
+
+
+def _init_worker() -> None:
+    """Import docling once per worker process; converters are built on first use."""
+    import docling.document_converter  # noqa: F401
+
+
+def _convert_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    pipeline: ConversionPipeline = ConversionPipeline.DEFAULT
+) -> tuple[int, str, int]:
+    """
+    Convert pages ``start``..``end`` (1-based, inclusive) in a worker process.
+
+    Returns:
+        Tuple of (start page, markdown, converted page count)
+    """
+    converter = _worker_converters.get(pipeline)
+    if converter is None:
+        converter = _worker_converters[pipeline] = _build_converter(pipeline)
+    result = converter.convert(file_path, page_range=(start, end))
+    document = result.document
+    return start, document.export_to_markdown(), len(document.pages)
+
 
 class ContractProcessor:
     """
     Async document processor for extracting text from contracts.
     """
 
-    def __init__(self):
-        """Initialize the document processor."""
-        global DocumentConverter
-
-        # Attempt lazy import
-        if DocumentConverter is None:
-            try:
-                from docling.document_converter import DocumentConverter as _DC
-                DocumentConverter = _DC
-                logger.info("DocumentConverter loaded successfully")
-            except Exception as e:
-                logger.warning(f"DocumentConverter not available: {str(e)}")
-                DocumentConverter = None
+    def __init__(self, settings: Optional[object] = None):
+        """
+        Initialize the document processor.
 
-        self.converter = DocumentConverter() if DocumentConverter is not None else None
+        docling is not imported here; converters are built on first use or
+        ahead of time by ``warm_up``, so application startup stays fast.
+        """
+        self.settings = settings or get_settings()
+        self._pool: Optional[Executor] = None
+        self._converters: dict[ConversionPipeline, object] = {}
+        self._converter_lock = threading.Lock()
+        self.converter = None
+        self.ready = False
+        self.warmup_error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
 
     def _ensure_converter(self):
         """Ensure converter is available, raise error if not."""
-        if self.converter is None:
-            global DocumentConverter
+        if self.converter is not None:
+            return
+        with self._converter_lock:
+            if self.converter is not None:
+                return
             try:
-                from docling.document_converter import DocumentConverter as _DC
-                DocumentConverter = _DC
-                self.converter = DocumentConverter()
+                self.converter = _converter_class()()
                 logger.info("DocumentConverter loaded on demand")
             except Exception as e:
                 logger.error("Failed to load DocumentConverter", exc_info=True)
@@ -55,6 +177,299 @@ class ContractProcessor:
                     }
                 ) from e
 
+    def warm_up(self) -> None:
+        """
+        Import docling, build the most used converter and load its models.
+
+        That is the light pipeline when PDFs are routed by text layer (most
+        are born-digital), otherwise the default one; converters for other
+        pipelines are built on first use. Blocking; run it in a thread after
+        the server has bound so the first request does not pay for model
+        loading. Sets ``ready`` on success and ``warmup_error`` on failure.
+        """
+        start = time.perf_counter()
+        try:
+            pipelines = [
+                ConversionPipeline.LIGHT if self.settings.pdf_pipeline_auto
+                else ConversionPipeline.DEFAULT
+            ]
+
+            for pipeline in pipelines:
+                converter = self._converter_for(pipeline)
+                # Loads layout models now instead of on the first conversion
+                initialize = getattr(converter, "initialize_pipeline", None)
+                if initialize is not None:
+                    from docling.datamodel.base_models import InputFormat
+                    initialize(InputFormat.PDF)
+
+            self.warmup_seconds = round(time.perf_counter() - start, 3)
+            self.ready = True
+            logger.info("Document processor warmed up", extra={
+                "pipelines": [p.value for p in pipelines],
+                "warmup_seconds": self.warmup_seconds
+            })
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.error(f"Document processor warm-up failed: {str(e)}", exc_info=True)
+
+    def choose_pipeline(self, path: Path) -> ConversionPipeline:
+        """
+        Pick the conversion pipeline for a document.
+
+        PDFs whose first pages carry an embedded text layer are born-digital
+        and use the light pipeline; PDFs without one are treated as scanned
+        and use the full pipeline with OCR. Everything else, and any PDF the
+        probe cannot open, uses docling's default configuration.
+        """
+        if not self.settings.pdf_pipeline_auto or path.suffix.lower() != ".pdf":
+            return ConversionPipeline.DEFAULT
+        chars = _pdf_text_chars_per_page(str(path), self.settings.pdf_text_probe_pages)
+        if chars is None:
+            return ConversionPipeline.DEFAULT
+        if chars >= self.settings.pdf_text_layer_min_chars:
+            return ConversionPipeline.LIGHT
+        return ConversionPipeline.FULL
+
+    def _converter_for(self, pipeline: ConversionPipeline):
+        """Converter for a pipeline, built once per processor instance."""
+        if pipeline == ConversionPipeline.DEFAULT:
+            self._ensure_converter()
+            return self.converter
+        converter = self._converters.get(pipeline)
+        if converter is None:
+            with self._converter_lock:
+                converter = self._converters.get(pipeline)
+                if converter is None:
+                    try:
+                        converter = self._converters[pipeline] = _build_converter(pipeline)
+                    except ImportError as e:
+                        logger.error("Failed to build document converter", exc_info=True)
+                        raise DocumentProcessingError(
+                            message="docling is required to process documents",
+                            details={
+                                "error": str(e),
+                                "solution": "Install with: pip install docling"
+                            }
+                        ) from e
+                    logger.info("Document converter built", extra={"pipeline": pipeline.value})
+        return converter
+
+    def _get_pool(self) -> Executor:
+        """Worker pool for page-range conversion, created on first use."""
+        if self._pool is None:
+            workers = self.settings.parallel_pdf_workers or os.cpu_count() or 1
+            # spawn: forking a process that already holds model threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info("Page-range worker pool started", extra={"workers": workers})
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the page-range worker pool, if started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _split_page_count(self, path: Path) -> Optional[int]:
+        """Return the page count if ``path`` is a PDF large enough to convert in ranges."""
+        if path.suffix.lower() != ".pdf":
+            return None
+        total_pages = _pdf_page_count(str(path))
+        if total_pages is None or total_pages < self.settings.parallel_pdf_min_pages:
+            return None
+        return total_pages
+
+    def _should_split(self, path: Path) -> Optional[int]:
+        """Return the page count if ``path`` should be converted across the worker pool."""
+        if not self.settings.parallel_pdf_enabled:
+            return None
+        return self._split_page_count(path)
+
+    def _convert_range(
+        self,
+        file_path: str,
+        start: int,
+        end: int,
+        pipeline: ConversionPipeline
+    ) -> tuple[int, str, int]:
+        """``_convert_page_range`` on this process's converter (blocking)."""
+        result = self._converter_for(pipeline).convert(file_path, page_range=(start, end))
+        document = result.document
+        return start, document.export_to_markdown(), len(document.pages)
+
+    async def _convert_parallel(
+        self,
+        file_path: str,
+        total_pages: int,
+        pipeline: ConversionPipeline
+    ) -> str:
+        """
+        Convert a PDF as page ranges across worker processes.
+
+        Args:
+            file_path: Path to the PDF
+            total_pages: Page count of the PDF
+            pipeline: Conversion pipeline for every range
+
+        Returns:
+            Markdown of all ranges stitched together in page order
+
+        Raises:
+            DocumentProcessingError: If any range fails to convert
+        """
+        ranges = page_ranges(total_pages, self.settings.parallel_pdf_chunk_pages)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        logger.info("Converting PDF in page ranges", extra={
+            "pages": total_pages,
+            "ranges": len(ranges),
+        })
+
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, _convert_page_range, file_path, start, end, pipeline)
+              for start, end in ranges),
+            return_exceptions=True
+        )
+
+        failed = [
+            (rng, err) for rng, err in zip(ranges, results) if isinstance(err, BaseException)
+        ]
+        if failed:
+            (start, end), error = failed[0]
+            raise DocumentProcessingError(
+                message=f"Failed to convert pages {start}-{end}: {str(error)}",
+                details={
+                    "file_path": file_path,
+                    "failed_ranges": [f"{s}-{e}" for (s, e), _ in failed],
+                    "error": str(error)
+                }
+            ) from error
+
+        converted = sum(pages for _, _, pages in results)
+        if converted != total_pages:
+            logger.warning("Page-range conversion page count mismatch", extra={
+                "expected_pages": total_pages,
+                "converted_pages": converted
+            })
+
+        return "\n\n".join(markdown for _, markdown, _ in sorted(results))
+
+    async def stream_sections(self, file_path: str) -> AsyncIterator[DocumentSection]:
+        """
+        Yield document markdown section by section, in page order.
+
+        Large PDFs are converted as page ranges and each range is yielded as
+        soon as it and all earlier ranges are done, so consumers can start on
+        the leading pages while later ones are converting. With
+        ``parallel_pdf_enabled`` the ranges convert concurrently across the
+        worker pool; otherwise they convert one at a time on this process's
+        converter, each while the consumer works on the previous one. Other
+        documents are yielded as a single section.
+
+        Args:
+            file_path: Path to the document file
+
+        Yields:
+            DocumentSection for each page range
+
+        Raises:
+            DocumentProcessingError: If processing fails
+        """
+        path = Path(file_path)
+        total_pages = self._split_page_count(path) if path.exists() else None
+        if total_pages is None:
+            processed = await self.process(file_path)
+            metadata = processed["metadata"]
+            yield DocumentSection(
+                start_page=1,
+                end_page=metadata["pages"],
+                total_pages=metadata["pages"],
+                pipeline=metadata["pipeline"],
+                text=processed["text"]
+            )
+            return
+
+        pipeline = self.choose_pipeline(path)
+        ranges = page_ranges(total_pages, self.settings.parallel_pdf_chunk_pages)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool() if self.settings.parallel_pdf_enabled else None
+
+        def submit(start: int, end: int) -> asyncio.Future:
+            if pool is not None:
+                return loop.run_in_executor(pool, _convert_page_range, file_path, start, end, pipeline)
+            return loop.run_in_executor(None, self._convert_range, file_path, start, end, pipeline)
+
+        # The pool takes every range at once; in process, one range is converting at a time
+        futures = [submit(start, end) for start, end in ranges[:len(ranges) if pool else 1]]
+
+        logger.info("Streaming PDF in page ranges", extra={
+            "pages": total_pages,
+            "ranges": len(ranges),
+            "pipeline": pipeline.value,
+            "parallel": pool is not None,
+        })
+
+        try:
+            for index, (start, end) in enumerate(ranges):
+                try:
+                    _, markdown, _ = await futures[index]
+                except Exception as e:
+                    raise DocumentProcessingError(
+                        message=f"Failed to convert pages {start}-{end}: {str(e)}",
+                        details={
+                            "file_path": file_path,
+                            "failed_ranges": [f"{start}-{end}"],
+                            "error": str(e)
+                        }
+                    ) from e
+                if len(futures) < len(ranges):
+                    futures.append(submit(*ranges[len(futures)]))
+                yield DocumentSection(
+                    start_page=start,
+                    end_page=end,
+                    total_pages=total_pages,
+                    pipeline=pipeline,
+                    text=markdown
+                )
+        finally:
+            # Consumer stopped early or a range failed: drop queued ranges
+            for future in futures:
+                future.cancel()
+
+    def estimate_pages(self, file_path: str) -> int:
+        """
+        Cheap page estimate before conversion (for admission control).
+
+        PDFs are counted exactly from the page tree; other formats are
+        estimated from file size.
+        """
+        path = Path(file_path)
+        if path.suffix.lower() == ".pdf":
+            pages = _pdf_page_count(file_path)
+            if pages is not None:
+                return pages
+        return max(1, path.stat().st_size // BYTES_PER_PAGE_ESTIMATE)
+
+    def build_metadata(
+        self,
+        file_path: str,
+        pages: int,
+        pipeline: ConversionPipeline = ConversionPipeline.DEFAULT
+    ) -> dict:
+        """Build the metadata dict returned alongside extracted text."""
+        path = Path(file_path)
+        return {
+            "filename": path.name,
+            "pages": pages,
+            "file_size": path.stat().st_size,
+            "content_type": self._get_content_type(path.suffix),
+            "pipeline": pipeline.value
+        }
+
     async def process(self, file_path: str) -> dict:
         """
         Process a contract document and return text + metadata.
@@ -69,8 +484,6 @@ class ContractProcessor:
             DocumentProcessingError: If processing fails
         """
         try:
-            self._ensure_converter()
-
             # Validate file exists
             path = Path(file_path)
             if not path.exists():
@@ -87,26 +500,30 @@ class ContractProcessor:
                 "size_bytes": file_size
             })
 
-            # Run conversion in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self.converter.convert,
-                file_path
-            )
+            pipeline = self.choose_pipeline(path)
+            total_pages = self._should_split(path)
+            if total_pages is not None:
+                # Large PDF: convert page ranges concurrently across cores
+                text = await self._convert_parallel(file_path, total_pages, pipeline)
+                pages = total_pages
+            else:
+                # Run conversion in thread pool to avoid blocking
+                loop = asyncio.get_event_loop()
+                result = await loop.run_in_executor(
+                    None,
+                    self._converter_for(pipeline).convert,
+                    file_path
+                )
 
-            document = result.document
-            text = document.export_to_markdown()
+                document = result.document
+                text = document.export_to_markdown()
+                pages = len(document.pages) if hasattr(document, "pages") else 1
 
-            metadata = {
-                "filename": path.name,
-                "pages": len(document.pages) if hasattr(document, "pages") else 1,
-                "file_size": file_size,
-                "content_type": self._get_content_type(path.suffix)
-            }
+            metadata = self.build_metadata(file_path, pages, pipeline)
 
             logger.info(f"Document processed successfully: {path.name}", extra={
                 "pages": metadata["pages"],
+                "pipeline": pipeline.value,
                 "text_length": len(text)
             })
 
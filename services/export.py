@@ -0,0 +1,186 @@
+"""
+Streaming export of analyzed contracts as NDJSON, CSV or Parquet.
+
+Rows are read from ``contracts`` in keyset pages
+(``SupabaseService.iter_contracts``) and each page is encoded and handed to
+the response as soon as it arrives, so memory stays bounded by one page (one
+row group for Parquet) however many contracts are exported.
+
+Parquet output is written with ``pyarrow`` in row groups of
+``export_parquet_row_group_rows`` rows using a fixed schema: ``created_at``
+is a UTC timestamp, list columns are ``list<string>`` and the ``analysis``
+JSON is stored as a string.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator
+
+from exceptions import ContractAnalyzerException
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Everything except the raw ``analysis`` JSON, whose fields are already columns
+EXPORT_DEFAULT_COLUMNS = (
+    "id", "created_at", "filename", "pages", "file_size", "content_type",
+    "contract_type", "risk_level", "summary", "parties", "key_dates", "key_terms",
+)
+
+_LIST_COLUMNS = frozenset({"parties", "key_dates", "key_terms"})
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+async def ndjson_chunks(batches: AsyncIterable[list[dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """One JSON object per line, one chunk per batch."""
+    async for rows in batches:
+        yield "".join(_dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return _dumps(value)
+    return value
+
+
+async def csv_chunks(
+    batches: AsyncIterable[list[dict[str, Any]]],
+    columns: tuple[str, ...]
+) -> AsyncIterator[bytes]:
+    """CSV with a header row; list and JSON values are JSON-encoded in their cell."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(row.get(column)) for column in columns] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ContractAnalyzerException(
+            message="Parquet export requires pyarrow",
+            status_code=501,
+            details={"format": "parquet"}
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def require_format(fmt: str) -> None:
+    """Fail before streaming starts if ``fmt`` cannot be produced here."""
+    if fmt == "parquet":
+        _import_pyarrow()
+
+
+def parquet_schema(columns: tuple[str, ...]):
+    """Arrow schema for the exported columns."""
+    pa, _ = _import_pyarrow()
+    types = {
+        "created_at": pa.timestamp("us", tz="UTC"),
+        "pages": pa.int32(),
+        "file_size": pa.int64(),
+    }
+    return pa.schema([
+        pa.field(column, pa.list_(pa.string()) if column in _LIST_COLUMNS
+                 else types.get(column, pa.string()))
+        for column in columns
+    ])
+
+
+def _parquet_value(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column == "created_at" and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if column in _LIST_COLUMNS:
+        return [str(item) for item in value]
+    if isinstance(value, (list, dict)):
+        return _dumps(value)
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back out through ``drain``."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def parquet_chunks(
+    batches: AsyncIterable[list[dict[str, Any]]],
+    columns: tuple[str, ...],
+    row_group_rows: int = 10000
+) -> AsyncIterator[bytes]:
+    """
+    Parquet file written one row group at a time.
+
+    Rows are buffered column-wise until ``row_group_rows`` are available,
+    then written as a row group and streamed out; the footer follows the
+    last group.
+    """
+    pa, pq = _import_pyarrow()
+    schema = parquet_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    pending: dict[str, list[Any]] = {column: [] for column in columns}
+    pending_rows = 0
+
+    def flush() -> bytes:
+        nonlocal pending, pending_rows
+        writer.write_table(pa.Table.from_pydict(pending, schema=schema), row_group_size=row_group_rows)
+        pending = {column: [] for column in columns}
+        pending_rows = 0
+        return sink.drain()
+
+    try:
+        async for rows in batches:
+            for row in rows:
+                for column in columns:
+                    pending[column].append(_parquet_value(column, row.get(column)))
+                pending_rows += 1
+                if pending_rows >= row_group_rows:
+                    yield flush()
+        if pending_rows:
+            yield flush()
+    finally:
+        writer.close()
+    yield sink.drain()
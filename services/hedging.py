@@ -0,0 +1,197 @@
+"""
+Hedged requests for tail-latency reduction.
+
+If a call has not completed by a configurable percentile of observed
+latency, an identical backup call is sent; whichever finishes first wins and
+the other is cancelled. A token-bucket budget caps the extra spend, each
+hedge holds a unit of the caller's capacity budget (if any) while it is in
+flight, and primary latencies are tracked in a bounded streaming sketch.
+"""
+import asyncio
+import math
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencySketch:
+    """
+    Streaming quantile sketch with relative-error guarantees.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so quantile
+    estimates are within ``relative_accuracy`` of the true value using a
+    bounded number of buckets. Counts are halved once ``max_count`` is
+    reached, which decays old observations so the sketch tracks drift.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.02,
+        max_count: int = 10000,
+        min_value: float = 1e-3
+    ):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._max_count = max_count
+        self._buckets: dict[int, float] = {}
+        self.count = 0.0
+
+    def add(self, value: float) -> None:
+        """Record one observation (seconds)."""
+        key = math.ceil(math.log(max(value, self._min_value)) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0.0) + 1
+        self.count += 1
+        if self.count >= self._max_count:
+            self._buckets = {k: v / 2 for k, v in self._buckets.items() if v >= 1}
+            self.count = sum(self._buckets.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q`` quantile (0-1), or None if empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of primary requests.
+
+    Every primary request deposits ``ratio`` tokens (up to ``burst``); every
+    hedge spends one.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class HedgingPolicy:
+    """
+    Runs awaitable factories with an optional hedge after a latency percentile.
+
+    ``capacity`` is a budget with ``try_acquire``/``release`` (such as
+    ``AdmissionController.openai_calls``) that the primary call is already
+    counted against; a hedge is only sent if a unit of it is free right now.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget_ratio: float = 0.05,
+        min_delay_s: float = 0.5,
+        min_samples: int = 20,
+        capacity: Optional[Any] = None
+    ):
+        self.percentile = percentile
+        self.min_delay_s = min_delay_s
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(budget_ratio)
+        self.capacity = capacity
+        self._sketches: dict[str, LatencySketch] = {}
+        self._stats = {
+            "calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0, "capacity_denied": 0,
+        }
+
+    def sketch(self, key: str) -> LatencySketch:
+        """Latency sketch for a call class (e.g. one model)."""
+        return self._sketches.setdefault(key, LatencySketch())
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while warming up."""
+        sketch = self.sketch(key)
+        if sketch.count < self.min_samples:
+            return None
+        return max(self.min_delay_s, sketch.quantile(self.percentile) or 0.0)
+
+    async def run(self, factory: Callable[[], Awaitable[T]], key: str = "default") -> T:
+        """
+        Await ``factory()``, hedging with a second call if it is slow.
+
+        Args:
+            factory: Zero-argument callable returning a fresh awaitable
+            key: Latency class; each key has its own sketch
+
+        Returns:
+            Result of whichever call succeeded first
+        """
+        loop = asyncio.get_running_loop()
+        self._stats["calls"] += 1
+        self.budget.deposit()
+
+        started = {}
+        primary = asyncio.ensure_future(factory())
+        started[primary] = loop.time()
+        pending = {primary}
+
+        try:
+            delay = self.hedge_delay(key)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    if self.capacity is not None and not self.capacity.try_acquire(1):
+                        self._stats["capacity_denied"] += 1
+                    elif self.budget.try_spend():
+                        hedge = asyncio.ensure_future(factory())
+                        if self.capacity is not None:
+                            # Held until the hedge finishes or is cancelled
+                            hedge.add_done_callback(lambda _: self.capacity.release(1))
+                        started[hedge] = loop.time()
+                        pending.add(hedge)
+                        self._stats["hedged"] += 1
+                        logger.debug("Hedging slow call", extra={"key": key, "delay_s": round(delay, 3)})
+                    else:
+                        if self.capacity is not None:
+                            self.capacity.release(1)
+                        self._stats["budget_denied"] += 1
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        # Delays come from primary latency: when the hedge
+                        # wins, the primary's elapsed time is a lower bound
+                        self.sketch(key).add(loop.time() - started[primary])
+                        if task is not primary:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Hedging statistics and latency percentiles per key."""
+        return {
+            **self._stats,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "latency_s": {
+                key: {
+                    f"p{int(q * 100)}": round(sketch.quantile(q) or 0.0, 3)
+                    for q in (0.5, 0.95, 0.99)
+                }
+                for key, sketch in self._sketches.items()
+            },
+        }
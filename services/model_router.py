@@ -0,0 +1,148 @@
+"""
+Model routing for contract analysis.
+
+Picks a model tier from cheap document features (token estimate, section
+count, rule tier output) and records per-tier latency, token usage and cost
+so the thresholds can be tuned from production data.
+"""
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+from models import ModelTier, RouteDecision, RoutingFeatures, RuleExtraction
+from logger import get_logger
+from services.near_duplicate import split_sections
+
+logger = get_logger(__name__)
+
+# Rough chars-per-token ratio for English legal text
+CHARS_PER_TOKEN = 4
+
+
+class ModelRouter:
+    """
+    Routes analysis requests to a small or large model tier.
+    """
+
+    def __init__(self, settings: Any):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+        self._reasons: Counter = Counter()
+
+    def features(self, prompt_text: str, full_text: str, rules: RuleExtraction) -> RoutingFeatures:
+        """
+        Compute routing features.
+
+        Args:
+            prompt_text: Contract text that will be sent to the model
+            full_text: Complete extracted text (for structure features)
+            rules: Output of the deterministic rule tier
+        """
+        return RoutingFeatures(
+            token_estimate=len(prompt_text) // CHARS_PER_TOKEN,
+            section_count=len(split_sections(full_text)),
+            rules_fired=rules.rules_fired,
+            contract_type=rules.contract_type,
+            risk_signal_count=len(rules.risk_signals),
+        )
+
+    def _model_for(self, tier: ModelTier) -> str:
+        if tier == ModelTier.SMALL:
+            return self.settings.openai_small_model
+        if tier == ModelTier.LARGE:
+            return self.settings.openai_large_model
+        return self.settings.openai_model
+
+    def route(self, features: RoutingFeatures) -> RouteDecision:
+        """Pick the model tier for a document."""
+        if not self.settings.model_routing_enabled:
+            tier, reason = ModelTier.DEFAULT, "routing_disabled"
+        elif features.risk_signal_count >= self.settings.routing_high_risk_signals:
+            tier, reason = ModelTier.LARGE, "high_risk_signals"
+        elif features.token_estimate > self.settings.routing_small_max_tokens:
+            tier, reason = ModelTier.LARGE, "long_document"
+        elif features.section_count > self.settings.routing_small_max_sections:
+            tier, reason = ModelTier.LARGE, "many_sections"
+        elif features.contract_type not in self.settings.routing_small_contract_types:
+            tier, reason = ModelTier.LARGE, "complex_contract_type"
+        else:
+            tier, reason = ModelTier.SMALL, "short_simple_contract"
+
+        decision = RouteDecision(
+            tier=tier, model=self._model_for(tier), reason=reason, features=features
+        )
+        with self._lock:
+            self._reasons[reason] += 1
+        return decision
+
+    def fallback(self, decision: RouteDecision) -> Optional[RouteDecision]:
+        """Decision to retry with after a small-tier validation failure."""
+        if decision.tier != ModelTier.SMALL:
+            return None
+        with self._lock:
+            self._reasons["validation_fallback"] += 1
+        return RouteDecision(
+            tier=ModelTier.LARGE,
+            model=self._model_for(ModelTier.LARGE),
+            reason="validation_fallback",
+            features=decision.features,
+        )
+
+    def _cost_per_1k(self, tier: ModelTier) -> float:
+        if tier == ModelTier.SMALL:
+            return self.settings.openai_small_cost_per_1k_tokens
+        if tier == ModelTier.LARGE:
+            return self.settings.openai_large_cost_per_1k_tokens
+        return self.settings.openai_default_cost_per_1k_tokens
+
+    def record(
+        self,
+        decision: RouteDecision,
+        latency_s: float,
+        total_tokens: Optional[int],
+        success: bool = True
+    ) -> None:
+        """Record the outcome of one model call for a routing decision."""
+        tokens = total_tokens or 0
+        cost = tokens / 1000 * self._cost_per_1k(decision.tier)
+
+        with self._lock:
+            stats = self._stats.setdefault(decision.tier.value, {
+                "calls": 0, "failures": 0, "latency_s_total": 0.0,
+                "latency_s_max": 0.0, "tokens": 0, "cost_usd": 0.0,
+            })
+            stats["calls"] += 1
+            stats["failures"] += 0 if success else 1
+            stats["latency_s_total"] += latency_s
+            stats["latency_s_max"] = max(stats["latency_s_max"], latency_s)
+            stats["tokens"] += tokens
+            stats["cost_usd"] += cost
+
+        logger.info("Model call recorded", extra={
+            "tier": decision.tier.value,
+            "model": decision.model,
+            "reason": decision.reason,
+            "latency_ms": round(latency_s * 1000, 1),
+            "total_tokens": tokens,
+            "cost_usd": round(cost, 6),
+            "success": success,
+            **decision.features.model_dump(),
+        })
+
+    def snapshot(self) -> dict[str, Any]:
+        """Aggregate routing statistics for the metrics endpoint."""
+        with self._lock:
+            tiers = {}
+            for tier, stats in self._stats.items():
+                calls = stats["calls"] or 1
+                tiers[tier] = {
+                    **stats,
+                    "latency_ms_avg": round(stats["latency_s_total"] / calls * 1000, 1),
+                    "cost_usd": round(stats["cost_usd"], 6),
+                }
+            return {
+                "enabled": self.settings.model_routing_enabled,
+                "decisions": dict(self._reasons),
+                "tiers": tiers,
+            }
@@ -0,0 +1,272 @@
+"""
+Near-duplicate contract detection with MinHash signatures and an LSH index.
+
+Signatures are computed from word shingles of the extracted text and banded
+into an on-disk SQLite index, so memory stays bounded no matter how many
+contracts have been analyzed. A match carries the cached analysis of the
+nearest neighbour and the sections of the new document that differ from it.
+
+Documents are indexed per tenant and only match documents of the same
+tenant: one customer's analysis is never served to, or sent in a prompt
+for, another customer. Each document also records the analyzer fingerprint
+that produced its analysis, and only documents of the caller's fingerprint
+match, so a prompt or model change never reuses (or deltas against) an
+analysis the current analyzer would not produce.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+from array import array
+from typing import Optional
+
+from models import ContractAnalysis, NearDuplicateMatch
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"\w+")
+_SECTION_SPLIT_RE = re.compile(r"\n\s*\n|\n(?=#)")
+
+# Candidates fetched per LSH bucket; boilerplate-heavy buckets are capped
+MAX_BUCKET_CANDIDATES = 50
+
+# Bump when the table layout changes; the index is a cache, so files with an
+# older layout are emptied and refill as contracts are analyzed
+SCHEMA_VERSION = 3
+
+
+def _stable_hash(value: str) -> int:
+    """32-bit hash that is stable across processes (unlike ``hash``)."""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little"
+    )
+
+
+def split_sections(text: str) -> list[str]:
+    """Split extracted markdown into headings/paragraph sections."""
+    return [section.strip() for section in _SECTION_SPLIT_RE.split(text) if section.strip()]
+
+
+def section_hash(section: str) -> str:
+    """Whitespace- and case-insensitive fingerprint of a section."""
+    normalized = " ".join(section.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class MinHasher:
+    """
+    MinHash over word shingles using universal hashing permutations.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def _shingles(self, text: str) -> set[int]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(tokens) < k:
+            return {_stable_hash(" ".join(tokens))} if tokens else set()
+        return {_stable_hash(" ".join(tokens[i:i + k])) for i in range(len(tokens) - k + 1)}
+
+    def signature(self, text: str) -> array:
+        """Compute the MinHash signature of a text."""
+        shingles = self._shingles(text)
+        if not shingles:
+            return array("I", [_MAX_HASH] * self.num_perm)
+        prime = _MERSENNE_PRIME
+        return array("I", [
+            min(((a * x + b) % prime) & _MAX_HASH for x in shingles)
+            for a, b in self._perms
+        ])
+
+    @staticmethod
+    def similarity(left: array, right: array) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        if not left:
+            return 0.0
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class NearDuplicateIndex:
+    """
+    Disk-backed LSH index of analyzed contracts.
+
+    Signatures are split into ``bands`` bands of ``num_perm / bands`` rows;
+    documents of the same tenant sharing any band bucket become candidates
+    and are ranked by estimated Jaccard similarity.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_perm: int = 128,
+        bands: int = 16,
+        cache_size_kb: int = 16384
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(f"""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA cache_size=-{cache_size_kb};
+        """)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            logger.info("Rebuilding near-duplicate index with the current layout",
+                        extra={"path": path, "from_version": version})
+            self._conn.executescript("DROP TABLE IF EXISTS documents; DROP TABLE IF EXISTS buckets;")
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS documents (
+                tenant TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                section_hashes TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                PRIMARY KEY (tenant, doc_id)
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                tenant TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL,
+                PRIMARY KEY (tenant, fingerprint, band, bucket, doc_id)
+            ) WITHOUT ROWID;
+            PRAGMA user_version={SCHEMA_VERSION};
+        """)
+        logger.info("NearDuplicateIndex opened", extra={"path": path})
+
+    def _band_buckets(self, signature: array) -> list[tuple[int, int]]:
+        """Hash each band of a signature to a signed 64-bit bucket id."""
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+        return buckets
+
+    @staticmethod
+    def document_id(text: str) -> str:
+        """Content id of an extracted text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def find(
+        self,
+        text: str,
+        threshold: float,
+        tenant: str,
+        fingerprint: str
+    ) -> Optional[NearDuplicateMatch]:
+        """
+        Find the most similar contract of ``tenant`` at or above ``threshold``.
+
+        Args:
+            text: Extracted contract text
+            threshold: Minimum estimated Jaccard similarity
+            tenant: Owner of the contract; only its own documents match
+            fingerprint: Current analyzer fingerprint; only documents
+                analyzed with it match
+
+        Returns:
+            NearDuplicateMatch for the nearest neighbour, or None
+        """
+        signature = self.hasher.signature(text)
+        buckets = self._band_buckets(signature)
+
+        with self._lock:
+            candidates: set[str] = set()
+            for band, bucket in buckets:
+                rows = self._conn.execute(
+                    "SELECT doc_id FROM buckets "
+                    "WHERE tenant = ? AND fingerprint = ? AND band = ? AND bucket = ? LIMIT ?",
+                    (tenant, fingerprint, band, bucket, MAX_BUCKET_CANDIDATES),
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+
+            best: Optional[tuple[float, str]] = None
+            for doc_id in candidates:
+                row = self._conn.execute(
+                    "SELECT signature FROM documents WHERE tenant = ? AND doc_id = ? AND fingerprint = ?",
+                    (tenant, doc_id, fingerprint)
+                ).fetchone()
+                if not row:
+                    continue
+                other = array("I")
+                other.frombytes(row[0])
+                score = MinHasher.similarity(signature, other)
+                if best is None or score > best[0]:
+                    best = (score, doc_id)
+
+            if best is None or best[0] < threshold:
+                return None
+
+            similarity, doc_id = best
+            section_hashes, analysis = self._conn.execute(
+                "SELECT section_hashes, analysis FROM documents WHERE tenant = ? AND doc_id = ?",
+                (tenant, doc_id),
+            ).fetchone()
+
+        known = set(json.loads(section_hashes))
+        changed = [s for s in split_sections(text) if section_hash(s) not in known]
+
+        return NearDuplicateMatch(
+            doc_id=doc_id,
+            similarity=round(similarity, 4),
+            changed_sections=changed,
+            analysis=ContractAnalysis.model_validate_json(analysis),
+        )
+
+    def add(self, text: str, analysis: ContractAnalysis, tenant: str, fingerprint: str) -> str:
+        """
+        Index a contract of ``tenant`` analyzed by the analyzer ``fingerprint``.
+
+        Returns:
+            The document id under which it was stored
+        """
+        doc_id = self.document_id(text)
+        signature = self.hasher.signature(text)
+        hashes = [section_hash(s) for s in split_sections(text)]
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(tenant, doc_id, fingerprint, signature, section_hashes, analysis) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (tenant, doc_id, fingerprint, signature.tobytes(), json.dumps(hashes),
+                 analysis.model_dump_json()),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO buckets (tenant, fingerprint, band, bucket, doc_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(tenant, fingerprint, band, bucket, doc_id)
+                 for band, bucket in self._band_buckets(signature)],
+            )
+        return doc_id
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
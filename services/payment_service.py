@@ -4,7 +4,7 @@ Payment processing service using Stripe.
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 import stripe
@@ -19,6 +19,9 @@ from models.subscription_models import (
     SubscriptionStatus,
 )
 
+if TYPE_CHECKING:
+    from services.subscription_service import SubscriptionService
+
 logger = get_logger(__name__)
 settings = get_settings()
 
@@ -26,15 +29,22 @@ settings = get_settings()
 class PaymentService:
     """Service for handling payments via Stripe."""
 
-    def __init__(self, db_client: Client, stripe_api_key: str):
+    def __init__(
+        self,
+        db_client: Client,
+        stripe_api_key: str,
+        subscription_service: Optional["SubscriptionService"] = None
+    ):
         """
         Initialize payment service.
 
         Args:
             db_client: Supabase client instance
             stripe_api_key: Stripe API key
+            subscription_service: Service whose subscription cache webhooks invalidate
         """
         self.db = db_client
+        self.subscription_service = subscription_service
         stripe.api_key = stripe_api_key
         logger.info("Payment service initialized with Stripe")
 
@@ -272,7 +282,9 @@ class PaymentService:
                 await self._handle_payment_succeeded(event["data"]["object"])
             elif event["type"] == "invoice.payment_failed":
                 await self._handle_payment_failed(event["data"]["object"])
-            
+
+            await self._invalidate_cached_subscription(event)
+
             return event
 
         except stripe.error.SignatureVerificationError as e:
@@ -282,6 +294,19 @@ class PaymentService:
             logger.error(f"Webhook handling failed: {str(e)}", exc_info=True)
             raise
 
+    async def _invalidate_cached_subscription(self, event: dict):
+        """Drop the cached subscription a subscription or invoice event is about."""
+        if self.subscription_service is None:
+            return
+        obj = event["data"]["object"]
+        if event["type"].startswith("customer.subscription."):
+            stripe_subscription_id = obj.get("id")
+        elif event["type"].startswith("invoice."):
+            stripe_subscription_id = obj.get("subscription")
+        else:
+            return
+        await self.subscription_service.invalidate_stripe_subscription(stripe_subscription_id)
+
     async def _handle_subscription_updated(self, subscription: dict):
         """Handle subscription updated event."""
         # Update subscription status in database
@@ -0,0 +1,199 @@
+"""
+Incremental re-analysis of records produced by an older prompt or model.
+
+Every stored analysis carries the ``ContractAnalyzer.fingerprint`` that
+produced it. When the prompt, models or analysis settings change, the
+fingerprint changes and older records become stale. ``ReanalysisJob``
+walks them in ``id`` order, reads each contract's extracted text from the
+text store (docling is never run), re-analyzes it and writes the new
+analysis and fingerprint back, then refreshes the contract in the search
+index.
+
+* Progress is checkpointed to a JSON file after every batch; an interrupted
+  run resumes after the last finished batch. Checkpoints for another
+  fingerprint are discarded.
+* At most ``reanalysis_openai_share`` of ``admission_max_openai_calls``
+  are in flight at once. The command line job runs in its own process,
+  apart from the API's fair scheduler, so this cap is what bounds its load
+  on OpenAI. Calls are marked bulk priority, which only orders them behind
+  interactive work when the job is given an analyzer that has a
+  ``TenantScheduler``. With ``reanalysis_backend=batch`` each batch goes
+  through the OpenAI Batch API instead.
+
+    python -m services.reanalysis --max-records 1000
+"""
+import argparse
+import asyncio
+import os
+from typing import Any, Optional
+
+from config import get_settings
+from logger import get_logger, setup_logging
+from models import ContractAnalysis, Priority, ReanalysisReport
+from services.batch_analysis import BatchAnalyzer
+from services.contract_analyzer import ContractAnalyzer
+from services.database import SupabaseService
+from services.scheduler import scheduling_priority
+from services.search import SearchIndex
+from services.text_store import TextStore
+
+logger = get_logger(__name__)
+
+
+class ReanalysisJob:
+    """
+    Resumable job that refreshes stale analyses from stored text.
+    """
+
+    def __init__(
+        self,
+        db: SupabaseService,
+        analyzer: ContractAnalyzer,
+        text_store: TextStore,
+        settings: Optional[object] = None,
+        batch_analyzer: Optional[BatchAnalyzer] = None,
+        search: Optional[SearchIndex] = None
+    ):
+        self.db = db
+        self.analyzer = analyzer
+        self.text_store = text_store
+        self.search = search
+        self.settings = settings or get_settings()
+        self.batch_size = self.settings.reanalysis_batch_size
+        self.checkpoint_path = self.settings.reanalysis_checkpoint_path
+        self.concurrency = max(
+            1, int(self.settings.admission_max_openai_calls * self.settings.reanalysis_openai_share))
+        self.batch_analyzer = batch_analyzer
+        if self.batch_analyzer is None and self.settings.reanalysis_backend == "batch":
+            self.batch_analyzer = BatchAnalyzer(analyzer, settings=self.settings)
+
+    def _load_checkpoint(self, fingerprint: str) -> ReanalysisReport:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as fh:
+                report = ReanalysisReport.model_validate_json(fh.read())
+        except FileNotFoundError:
+            return ReanalysisReport(fingerprint=fingerprint)
+        if report.fingerprint != fingerprint or report.finished:
+            logger.info("Discarding re-analysis checkpoint", extra={
+                "checkpoint_fingerprint": report.fingerprint, "finished": report.finished})
+            return ReanalysisReport(fingerprint=fingerprint)
+        logger.info("Resuming re-analysis", extra={"after_id": report.after_id, "analyzed": report.analyzed})
+        return report
+
+    def _save_checkpoint(self, report: ReanalysisReport) -> None:
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(report.model_dump_json())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    async def _analyze_online(self, items: list[tuple[str, str]]) -> dict[str, Any]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(text: str) -> Any:
+            async with semaphore:
+                try:
+                    return await self.analyzer.analyze(text)
+                except Exception as e:
+                    return e
+
+        results = await asyncio.gather(*(one(text) for _, text in items))
+        return {record_id: result for (record_id, _), result in zip(items, results)}
+
+    async def _analyze_batch(self, items: list[tuple[str, str]]) -> dict[str, Any]:
+        results = await self.batch_analyzer.run(items)
+        outcomes: dict[str, Any] = {}
+        for record_id, _ in items:
+            result = results.get(record_id)
+            if result is not None and result.analysis is not None:
+                outcomes[record_id] = result.analysis
+            else:
+                outcomes[record_id] = RuntimeError(result.error if result else "missing from batch output")
+        return outcomes
+
+    async def _process(self, rows: list[dict[str, Any]], report: ReanalysisReport) -> None:
+        texts = await asyncio.gather(*(self.text_store.get(row["text_key"]) for row in rows))
+        items = [(row["id"], text) for row, text in zip(rows, texts) if text is not None]
+        report.missing_text += len(rows) - len(items)
+
+        if self.batch_analyzer is not None:
+            results = await self._analyze_batch(items)
+        else:
+            results = await self._analyze_online(items)
+
+        by_id = {row["id"]: row for row in rows}
+        texts_by_id = dict(items)
+        for record_id, result in results.items():
+            if isinstance(result, ContractAnalysis):
+                analysis = result.model_dump()
+                await self.db.update_analysis(record_id, analysis, report.fingerprint)
+                report.analyzed += 1
+                if self.search:
+                    row = by_id[record_id]
+                    await self.search.index_contract(
+                        record_id, row.get("user_id"), {"filename": row.get("filename")},
+                        analysis, texts_by_id[record_id])
+            else:
+                report.failed += 1
+                logger.warning(f"Re-analysis failed: {str(result)}", extra={"record_id": record_id})
+
+    async def run(self, max_records: Optional[int] = None) -> ReanalysisReport:
+        """
+        Re-analyze stale records until none are left (or ``max_records``
+        have been read in this run).
+
+        Returns:
+            Cumulative report for the current fingerprint
+        """
+        report = self._load_checkpoint(self.analyzer.fingerprint)
+        scanned_this_run = 0
+
+        with scheduling_priority(Priority.BULK):
+            while max_records is None or scanned_this_run < max_records:
+                limit = self.batch_size
+                if max_records is not None:
+                    limit = min(limit, max_records - scanned_this_run)
+                rows = await self.db.list_stale_contracts(report.fingerprint, report.after_id, limit)
+                if not rows:
+                    report.finished = True
+                    break
+
+                await self._process(rows, report)
+                scanned_this_run += len(rows)
+                report.scanned += len(rows)
+                report.after_id = rows[-1]["id"]
+                self._save_checkpoint(report)
+                logger.info("Re-analysis batch done", extra=report.model_dump())
+
+        self._save_checkpoint(report)
+        logger.info("Re-analysis run finished", extra=report.model_dump())
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-records", type=int, help="Stop after reading this many stale records")
+    args = parser.parse_args()
+
+    from services.search import create_search_index
+    from services.text_store import create_text_store
+
+    setup_logging()
+    settings = get_settings()
+    text_store = create_text_store(settings)
+    if text_store is None:
+        raise SystemExit("Re-analysis requires the text store (TEXT_STORE_*)")
+    db = SupabaseService()
+    search = create_search_index(settings, db.client)
+    job = ReanalysisJob(db, ContractAnalyzer(settings), text_store, settings, search=search)
+    try:
+        print(asyncio.run(job.run(args.max_records)).model_dump_json(indent=2))
+    finally:
+        if search:
+            search.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Data retention: expire contracts, usage rows and stored text per plan.
+
+Each tenant keeps data for its plan's ``data_retention_days`` (the longest
+of its trial or active subscriptions); anonymous uploads and users without
+a plan keep ``retention_default_days``. A retention reaching back before
+``datetime.min`` (e.g. Enterprise's 999999 days) keeps data forever: the
+tenant is skipped. ``RetentionService`` deletes rows
+created before each tenant's cutoff through the RPCs in
+``migrations/007_data_retention.sql``:
+
+* Deletes run in batches of ``retention_batch_size``, oldest first, one
+  transaction each, paced to ``retention_rows_per_second`` so locks stay
+  short and WAL is written at a steady rate.
+* Portfolio rollups are decremented in the same transaction as the delete.
+* Extracted text blobs are removed once no remaining contract references
+  their key (blobs are content-addressed and may be shared). Uploads touch
+  the blob they re-use before referencing it, so blobs written or touched
+  within ``retention_text_grace_s`` of the run's start are kept for a later
+  run: an analysis racing the reference check cannot lose its text.
+* Usage rows of a billing period that has not ended are kept.
+* Tables listed in ``retention_partitioned_tables`` are monthly partitioned;
+  partitions older than the longest retention of any tenant are dropped
+  whole, and partitions for the next ``retention_partition_months_ahead``
+  months are created. Text blobs of rows removed this way are not
+  collected.
+
+Without ``--execute`` the job is a dry run that reports what would go (row
+counts then include rows in partitions that would be dropped):
+
+    python -m services.retention
+    python -m services.retention --execute
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from config import get_settings
+from exceptions import DatabaseError
+from logger import get_logger, setup_logging
+from models import RetentionReport
+from services.text_store import TextStore
+
+logger = get_logger(__name__)
+
+
+def retention_cutoff(now: datetime, retention_days: int) -> Optional[datetime]:
+    """
+    Oldest creation time kept for ``retention_days``.
+
+    Returns:
+        The cutoff, or None when the retention reaches back further than a
+        datetime can represent (keep forever)
+    """
+    try:
+        return now - timedelta(days=retention_days)
+    except OverflowError:
+        return None
+
+
+class RetentionService:
+    """
+    Applies per-tenant retention to the database and the text store.
+    """
+
+    def __init__(self, client: Any, text_store: Optional[TextStore] = None, settings: Optional[object] = None):
+        self.client = client
+        self.text_store = text_store
+        self.settings = settings or get_settings()
+        self.batch_size = self.settings.retention_batch_size
+        self.rows_per_second = self.settings.retention_rows_per_second
+        # Blobs modified at or after this time (epoch seconds) are kept; set per run
+        self._texts_written_before: Optional[float] = None
+
+    def _rpc(self, name: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+        try:
+            res = self.client.rpc(name, params).execute()
+        except Exception as e:
+            logger.error(f"{name} failed: {str(e)}", exc_info=True)
+            raise DatabaseError(
+                message=f"Retention purge failed: {str(e)}",
+                details={"error": str(e), "function": name}
+            ) from e
+        return res.data or []
+
+    async def _call(self, name: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self._rpc, name, params)
+
+    async def _pace(self, rows: int, started: float) -> None:
+        """Sleep so that ``rows`` deleted since ``started`` stay under the rate."""
+        if self.rows_per_second <= 0:
+            return
+        remaining = rows / self.rows_per_second - (time.perf_counter() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    async def policies(self) -> list[dict[str, Any]]:
+        """One ``{user_id, retention_days}`` row per tenant (user_id None: anonymous)."""
+        return await self._call("retention_policies", {"p_default_days": self.settings.retention_default_days})
+
+    def _unreferenced(self, keys: list[str]) -> list[str]:
+        res = self.client.table("contracts").select("text_key").in_("text_key", keys).execute()
+        referenced = {row["text_key"] for row in res.data or []}
+        return [key for key in keys if key not in referenced]
+
+    async def _delete_texts(self, keys: list[str], report: RetentionReport) -> None:
+        if self.text_store is None or not keys:
+            return
+        for key in await asyncio.to_thread(self._unreferenced, keys):
+            try:
+                freed = await self.text_store.delete(key, written_before=self._texts_written_before)
+            except Exception as e:
+                logger.warning(f"Failed to delete stored text: {str(e)}", extra={"text_key": key})
+                continue
+            if freed:
+                report.text_blobs += 1
+                report.text_bytes += freed
+
+    async def _preview(self, user_id: Optional[str], cutoff: str, report: RetentionReport) -> None:
+        for row in await self._call("retention_preview", {"p_user_id": user_id, "p_cutoff": cutoff}):
+            if row["table_name"] == "contracts":
+                report.contract_rows += row["row_count"]
+                report.contract_bytes += row["bytes"]
+                report.text_blobs += row["text_keys"]
+            else:
+                report.usage_rows += row["row_count"]
+                report.usage_bytes += row["bytes"]
+
+    async def _purge(self, user_id: Optional[str], cutoff: str, report: RetentionReport) -> None:
+        params = {"p_user_id": user_id, "p_cutoff": cutoff, "p_limit": self.batch_size}
+        started = time.perf_counter()
+        deleted = 0
+
+        while True:
+            rows = await self._call("purge_expired_contracts", params)
+            batch = rows[0] if rows else {"deleted": 0}
+            if not batch["deleted"]:
+                break
+            deleted += batch["deleted"]
+            report.contract_rows += batch["deleted"]
+            report.contract_bytes += batch["bytes"]
+            await self._delete_texts(batch.get("text_keys") or [], report)
+            await self._pace(deleted, started)
+
+        # Anonymous uploads have no usage rows
+        while user_id is not None:
+            rows = await self._call("purge_expired_usage", params)
+            batch = rows[0] if rows else {"deleted": 0}
+            if not batch["deleted"]:
+                break
+            deleted += batch["deleted"]
+            report.usage_rows += batch["deleted"]
+            report.usage_bytes += batch["bytes"]
+            await self._pace(deleted, started)
+
+        if deleted:
+            logger.info("Purged expired rows", extra={"user_id": user_id, "rows": deleted})
+
+    async def _ensure_partitions(self, now: datetime) -> None:
+        for table in self.settings.retention_partitioned_tables:
+            created = await self._call("ensure_monthly_partitions", {
+                "p_parent": f"public.{table}",
+                "p_from": now.date().isoformat(),
+                "p_months_ahead": self.settings.retention_partition_months_ahead,
+            })
+            if created:
+                logger.info("Created monthly partitions", extra={"table": table, "partitions": created})
+
+    async def _drop_partitions(self, before: datetime, dry_run: bool, report: RetentionReport) -> None:
+        for table in self.settings.retention_partitioned_tables:
+            dropped = await self._call("drop_partitions_before", {
+                "p_parent": f"public.{table}", "p_before": before.isoformat(), "p_dry_run": dry_run})
+            for row in dropped:
+                report.partitions_dropped.append(row["partition_name"])
+                report.partition_bytes += row["bytes"]
+            if table == "contracts" and dropped and not dry_run:
+                # Dropped partitions bypass purge_expired_contracts; rebuild the rollups
+                await self._call("compact_contract_rollups", {"p_since": "-infinity"})
+
+    async def run(self, dry_run: bool = True, now: Optional[datetime] = None) -> RetentionReport:
+        """
+        Expire every tenant's data older than its retention.
+
+        Args:
+            dry_run: Only report what would be deleted
+            now: Reference time for the cutoffs (defaults to the current time)
+
+        Returns:
+            Rows, bytes, blobs and partitions deleted (or due, in a dry run)
+        """
+        now = now or datetime.now(timezone.utc)
+        report = RetentionReport(dry_run=dry_run)
+        start = time.perf_counter()
+        self._texts_written_before = time.time() - self.settings.retention_text_grace_s
+        policies = await self.policies()
+
+        if not dry_run:
+            await self._ensure_partitions(now)
+
+        cutoffs = [(policy["user_id"], retention_cutoff(now, policy["retention_days"]))
+                   for policy in policies]
+        expiring = [(user_id, cutoff) for user_id, cutoff in cutoffs if cutoff is not None]
+        if len(expiring) < len(cutoffs):
+            logger.info("Tenants kept forever", extra={"tenants": len(cutoffs) - len(expiring)})
+
+        # Drop whole partitions first so the batched deletes only see what is
+        # left; a tenant that keeps data forever keeps every partition
+        if expiring and len(expiring) == len(cutoffs) and self.settings.retention_partitioned_tables:
+            await self._drop_partitions(min(cutoff for _, cutoff in expiring), dry_run, report)
+
+        for user_id, cutoff in expiring:
+            if dry_run:
+                await self._preview(user_id, cutoff.isoformat(), report)
+            else:
+                await self._purge(user_id, cutoff.isoformat(), report)
+            report.tenants += 1
+
+        report.elapsed_s = round(time.perf_counter() - start, 2)
+        logger.info("Retention run finished", extra=report.model_dump())
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--execute", action="store_true", help="Delete data (default is a dry run)")
+    args = parser.parse_args()
+
+    from services.database import SupabaseService
+    from services.text_store import create_text_store
+
+    setup_logging()
+    settings = get_settings()
+    service = RetentionService(SupabaseService().client, create_text_store(settings), settings)
+    print(asyncio.run(service.run(dry_run=not args.execute)).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Deterministic rule-based extraction tier for contract text.
+
+Dates, monetary amounts, preamble parties, governing law and a handful of
+risk signals are pulled out with precompiled regular expressions before the
+OpenAI call. The results are used as candidates for the model prompt and, in
+``rules_only`` mode, as the analysis itself.
+"""
+import re
+from datetime import datetime
+from typing import Iterable, Optional
+
+from models import ContractAnalysis, RuleExtraction
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Parties, title and contract type live in the first page or so
+PREAMBLE_CHARS = 3000
+MAX_DATES = 10
+MAX_AMOUNTS = 10
+MAX_PARTIES = 6
+
+_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|"
+    r"Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+
+# Python's regex engine retries every alternation branch at each offset, so
+# each family is anchored on a cheap literal first (a year, a currency sign, a
+# corporate suffix) and the expensive pattern only runs on a small window.
+# Anchors avoid leading \b / lookbehinds, which disable the engine's
+# literal-prefix scan; boundaries are checked by hand instead.
+_YEAR_RE = re.compile(r"(?:19|20)\d\d")
+_DATE_PREFIX_RE = re.compile(
+    rf"(?:{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?{_MONTHS},?"
+    r"|\d{1,2}/\d{1,2}/)\s*$",
+    re.IGNORECASE,
+)
+_ISO_SUFFIX_RE = re.compile(r"-\d{2}-\d{2}\b")
+_DATE_WINDOW = 40
+
+_AMOUNT_RE = re.compile(
+    r"(?:USD|US\$|\$|€|£)\s?\d{1,3}(?:,\d{3})*(?:\.\d{2})?"
+    r"(?:\s?(?:[Mm]illion|[Bb]illion|[Tt]housand))?"
+)
+_AMOUNT_WORDS_RE = re.compile(r"\b\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s(?:dollars|USD|EUR|GBP)\b")
+_AMOUNT_WORDS = ("dollars", "USD", "EUR", "GBP")
+
+_ENTITY_SUFFIX_RE = re.compile(
+    r"(?:Inc\.?|LLC|L\.L\.C\.|Ltd\.?|Limited|Corp\.?|Corporation|Company|"
+    r"LLP|L\.P\.|LP|GmbH|PLC|plc|S\.A\.)(?![A-Za-z])"
+)
+_ENTITY_NAME_RE = re.compile(
+    r"(?<![A-Za-z])[A-Z][A-Za-z0-9&.'\-]*(?:\s+[A-Z][A-Za-z0-9&.'\-]*){0,5},?$"
+)
+_ENTITY_WINDOW = 80
+
+_GOVERNING_LAW_RE = re.compile(
+    r"governed\s+by(?:,?\s+and\s+(?:construed|interpreted)\s+in\s+accordance\s+with,?)?"
+    r"\s+the\s+laws?\s+of\s+(?:the\s+)?(?:State\s+of\s+|Commonwealth\s+of\s+)?"
+    r"(?P<law>[A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+){0,3})",
+)
+
+# Ordered: the first matching title wins, so specific types come first
+_CONTRACT_TYPES: tuple[tuple[str, re.Pattern], ...] = tuple(
+    (name, re.compile(pattern))
+    for name, pattern in (
+        ("NDA", r"non-?disclosure|confidentiality\s+agreement"),
+        ("MSA", r"master\s+services?\s+agreement"),
+        ("SOW", r"statement\s+of\s+work"),
+        ("Employment Agreement", r"employment\s+agreement|offer\s+letter"),
+        ("Lease", r"\blease\b"),
+        ("License Agreement", r"licen[cs]e\s+agreement"),
+        ("Purchase Agreement", r"(?:asset|stock|share|purchase)\s+(?:purchase\s+)?agreement"),
+        ("Loan Agreement", r"loan\s+agreement|promissory\s+note"),
+        ("Services Agreement", r"services?\s+agreement|consulting\s+agreement"),
+    )
+)
+
+# Substring probes over lowercased text with line breaks folded to spaces
+_RISK_SIGNALS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("uncapped_liability", ("unlimited liability", "uncapped", "without limitation of liability")),
+    ("indemnification", ("indemnif",)),
+    ("liquidated_damages", ("liquidated damages",)),
+    ("auto_renewal", ("automatically renew", "automatic renewal", "auto-renew", "autorenew")),
+    ("non_compete", ("non-compet", "noncompet", "non compet")),
+    ("exclusivity", ("exclusiv",)),
+    ("termination_for_convenience", ("for convenience",)),
+)
+
+_DATE_FORMATS = ("%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y", "%m/%d/%Y", "%Y-%m-%d")
+_ORDINAL_RE = re.compile(r"(?<=\d)(?:st|nd|rd|th)\b|\bday\s+of\s+|[.,]", re.IGNORECASE)
+_DEDUPE_KEY_RE = re.compile(r"[\W_]+")
+_PARTY_TRIM_RE = re.compile(r"[\s\"'“”,;:]+$|^[\s\"'“”,;:]+")
+_PARTY_TAIL_RE = re.compile(
+    r",?\s+(?:a|an)\s+[A-Z]?[a-z].*$|\s*\(.*$|,\s*(?:with|having|whose).*$"
+    r"|,?\s+(?:on|dated|effective|as\s+of)\s.*$"
+)
+# A period only ends the party clause when a new sentence starts ("Inc. and" does not)
+_CLAUSE_END_RE = re.compile(r"\.\s+(?=[A-Z])|\.$|\n\s*\n|\bWHEREAS\b|\bRECITALS\b")
+
+
+def _normalize_date(raw: str) -> str:
+    """Normalize a matched date to ISO format when it can be parsed."""
+    cleaned = " ".join(_ORDINAL_RE.sub(" ", raw).split())
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return raw.strip()
+
+
+def _clean_party(raw: str) -> Optional[str]:
+    """Strip role descriptions and punctuation from a party candidate."""
+    party = _PARTY_TAIL_RE.sub("", raw.strip())
+    party = _PARTY_TRIM_RE.sub("", party)
+    if len(party) < 2 or len(party) > 120 or not party[0].isupper():
+        return None
+    return party
+
+
+def _dedupe(values: Iterable[str], limit: int) -> list[str]:
+    """Deduplicate preserving first-seen order, ignoring case and punctuation."""
+    seen: set[str] = set()
+    out: list[str] = []
+    for value in values:
+        key = _DEDUPE_KEY_RE.sub("", value.casefold())
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(value)
+        if len(out) >= limit:
+            break
+    return out
+
+
+class RuleExtractor:
+    """
+    Regex-based extractor for fields that do not need a language model.
+    """
+
+    def _extract_parties(self, preamble: str) -> list[str]:
+        """Extract party names from the agreement preamble."""
+        candidates: list[str] = []
+
+        between = preamble.lower().find("between")
+        if between != -1:
+            # The party clause ends at the first sentence break after "between"
+            start = between + len("between")
+            clause = preamble[start:start + 600]
+            clause = _CLAUSE_END_RE.split(clause, maxsplit=1)[0]
+            for part in re.split(r"\s+and\s+|;", clause):
+                party = _clean_party(part)
+                if party:
+                    candidates.append(party)
+
+        for suffix in _ENTITY_SUFFIX_RE.finditer(preamble):
+            if not suffix.start() or not preamble[suffix.start() - 1].isspace():
+                continue
+            window = preamble[max(0, suffix.start() - _ENTITY_WINDOW):suffix.start() - 1]
+            name = _ENTITY_NAME_RE.search(window)
+            if name:
+                candidates.append(f"{name.group(0).rstrip(',')} {suffix.group(0).strip()}")
+        return _dedupe(candidates, MAX_PARTIES)
+
+    def _extract_dates(self, text: str) -> list[str]:
+        """Extract dates by anchoring on four-digit years."""
+        dates: list[str] = []
+        for year in _YEAR_RE.finditer(text):
+            start, end = year.span()
+            if (start and text[start - 1].isdigit()) or text[end:end + 1].isdigit():
+                continue
+            iso = _ISO_SUFFIX_RE.match(text, year.end())
+            if iso:
+                dates.append(text[year.start():iso.end()])
+                continue
+            window = text[max(0, year.start() - _DATE_WINDOW):year.start()]
+            prefix = _DATE_PREFIX_RE.search(window)
+            if prefix:
+                dates.append(_normalize_date(prefix.group(0) + year.group(0)))
+            if len(dates) >= MAX_DATES * 2:
+                break
+        return _dedupe(dates, MAX_DATES)
+
+    def _extract_amounts(self, text: str) -> list[str]:
+        """Extract monetary amounts."""
+        amounts = [" ".join(m.group(0).split()) for m in _AMOUNT_RE.finditer(text)]
+        if any(word in text for word in _AMOUNT_WORDS):
+            amounts.extend(m.group(0) for m in _AMOUNT_WORDS_RE.finditer(text))
+        return _dedupe(amounts, MAX_AMOUNTS)
+
+    def _extract_contract_type(self, preamble: str) -> Optional[str]:
+        """Detect the contract type from the title area."""
+        head = preamble[:500].lower()
+        for name, pattern in _CONTRACT_TYPES:
+            if pattern.search(head):
+                return name
+        return None
+
+    def extract(self, text: str) -> RuleExtraction:
+        """
+        Run all rules over a contract text.
+
+        Args:
+            text: Extracted contract text (markdown)
+
+        Returns:
+            RuleExtraction with the deterministic candidates
+        """
+        preamble = text[:PREAMBLE_CHARS]
+
+        dates = self._extract_dates(text)
+        amounts = self._extract_amounts(text)
+        parties = self._extract_parties(preamble)
+        contract_type = self._extract_contract_type(preamble)
+
+        law_match = _GOVERNING_LAW_RE.search(text)
+        governing_law = law_match.group("law") if law_match else None
+
+        lowered = text.lower().replace("\n", " ")
+        risk_signals = [
+            name for name, needles in _RISK_SIGNALS
+            if any(needle in lowered for needle in needles)
+        ]
+
+        rules_fired = [
+            name for name, fired in (
+                ("dates", dates),
+                ("amounts", amounts),
+                ("parties", parties),
+                ("contract_type", contract_type),
+                ("governing_law", governing_law),
+                ("risk_signals", risk_signals),
+            ) if fired
+        ]
+
+        return RuleExtraction(
+            contract_type=contract_type,
+            parties=parties,
+            key_dates=dates,
+            amounts=amounts,
+            governing_law=governing_law,
+            risk_signals=risk_signals,
+            rules_fired=rules_fired,
+        )
+
+    def extract_many(self, texts: Iterable[str]) -> list[RuleExtraction]:
+        """Run the rules over a batch of texts (bulk triage)."""
+        return [self.extract(text) for text in texts]
+
+    def to_analysis(self, rules: RuleExtraction) -> ContractAnalysis:
+        """
+        Build a triage-grade ContractAnalysis from rule output alone.
+
+        Risk is graded by the number of distinct risk signals found.
+        """
+        key_terms: list[str] = []
+        if rules.governing_law:
+            key_terms.append(f"Governing law: {rules.governing_law}")
+        key_terms.extend(f"Amount: {amount}" for amount in rules.amounts)
+        key_terms.extend(
+            f"Risk signal: {signal.replace('_', ' ')}" for signal in rules.risk_signals
+        )
+
+        signal_count = len(rules.risk_signals)
+        if signal_count >= 3:
+            risk_level = "High"
+        elif signal_count >= 1:
+            risk_level = "Medium"
+        else:
+            risk_level = "Low"
+
+        return ContractAnalysis(
+            contract_type=rules.contract_type or "Unknown",
+            parties=rules.parties,
+            key_dates=rules.key_dates,
+            key_terms=key_terms,
+            risk_level=risk_level,
+            summary="Rule-based triage only; not reviewed by the AI model.",
+        )
@@ -0,0 +1,277 @@
+"""
+Per-tenant weighted fair scheduling for analysis work.
+
+Document extraction and OpenAI calls each run through a ``FairScheduler``
+lane with a fixed concurrency. When a lane is saturated, waiting work is
+dispatched by start-time fair queueing: every request gets a virtual start
+tag of ``max(virtual_time, tenant's last finish)`` and advances its tenant's
+finish by ``cost / weight``, and the smallest start tag runs next. A tenant
+with a deep backlog (a 2,400-contract batch) therefore only gets its
+weighted share, while a tenant with a single request is served almost
+immediately. Weights and per-tenant concurrency caps come from the
+subscription plan.
+
+Work is also either interactive (a user waiting on ``/api/v1/analyze``) or
+bulk (batches and background jobs). Bulk work only uses idle capacity and
+yields to interactive work, so even within one tenant a dashboard request
+does not queue behind that tenant's batch.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from logger import get_logger
+from models import Priority, Tenant
+
+logger = get_logger(__name__)
+
+# Tenant and priority of the work being served; read by lanes deep in the call stack
+current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+current_priority: ContextVar[Priority] = ContextVar("current_priority", default=Priority.INTERACTIVE)
+
+ANONYMOUS_TENANT = Tenant(id="anonymous", plan="starter", weight=1.0, max_concurrency=1)
+
+
+@contextmanager
+def scheduling_priority(priority: Priority) -> Iterator[None]:
+    """Schedule lane slots taken inside the block at ``priority``."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+@dataclass
+class _Waiter:
+    start_tag: float
+    seq: int
+    future: asyncio.Future
+
+
+@dataclass
+class _TenantState:
+    tenant: Tenant
+    priority: Priority
+    queue: deque = field(default_factory=deque)
+    in_flight: int = 0
+    last_finish: float = 0.0
+
+
+class FairScheduler:
+    """
+    One scheduling lane (e.g. extraction or LLM calls) with a concurrency limit.
+
+    Interactive and bulk work are queued separately, each fair across
+    tenants. Interactive waiters are always dispatched first; bulk work only
+    runs on idle capacity, never while interactive work is waiting and never
+    in the ``interactive_reserved`` slots kept free for the next interactive
+    request.
+    """
+
+    def __init__(self, name: str, capacity: int, interactive_reserved: int = 0):
+        self.name = name
+        self.capacity = capacity
+        self.interactive_reserved = min(interactive_reserved, max(capacity - 1, 0))
+        self.in_flight = 0
+        self._seq = itertools.count()
+        self._virtual_time = {priority: 0.0 for priority in Priority}
+        self._in_flight_by_priority = {priority: 0 for priority in Priority}
+        self._tenants: dict[tuple[Priority, str], _TenantState] = {}
+        self._plans: dict[str, dict[str, float]] = {}
+
+    def _plan_stats(self, plan: str) -> dict[str, float]:
+        return self._plans.setdefault(plan, {"dispatched": 0, "wait_s_total": 0.0, "wait_s_max": 0.0})
+
+    def _next(self, priority: Priority) -> Optional[_TenantState]:
+        best: Optional[_TenantState] = None
+        for state in self._tenants.values():
+            if state.priority is not priority or not state.queue:
+                continue
+            if state.in_flight >= state.tenant.max_concurrency:
+                continue
+            head = state.queue[0]
+            if best is None or (head.start_tag, head.seq) < (best.queue[0].start_tag, best.queue[0].seq):
+                best = state
+        return best
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.capacity:
+            best = self._next(Priority.INTERACTIVE)
+            if best is None:
+                if any(s.queue for s in self._tenants.values() if s.priority is Priority.INTERACTIVE):
+                    # Interactive work is only waiting on its tenant caps; keep bulk out
+                    return
+                if self.in_flight >= self.capacity - self.interactive_reserved:
+                    return
+                best = self._next(Priority.BULK)
+            if best is None:
+                return
+            waiter = best.queue.popleft()
+            virtual_time = self._virtual_time[best.priority]
+            self._virtual_time[best.priority] = max(virtual_time, waiter.start_tag)
+            best.in_flight += 1
+            self._in_flight_by_priority[best.priority] += 1
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    def _prune(self, state: _TenantState) -> None:
+        # Idle tenants with no outstanding credit carry no state
+        if (not state.queue and not state.in_flight
+                and state.last_finish <= self._virtual_time[state.priority]):
+            self._tenants.pop((state.priority, state.tenant.id), None)
+
+    async def acquire(
+        self,
+        tenant: Tenant,
+        cost: float = 1.0,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> None:
+        """
+        Wait for this tenant's turn in the lane.
+
+        Args:
+            tenant: Requesting tenant (weight and cap come from its plan)
+            cost: Relative size of the work, e.g. pages for extraction
+            priority: Interactive (user waiting) or bulk (batches, jobs)
+        """
+        key = (priority, tenant.id)
+        state = self._tenants.get(key)
+        if state is None:
+            state = self._tenants[key] = _TenantState(tenant=tenant, priority=priority)
+        start_tag = max(self._virtual_time[priority], state.last_finish)
+        state.last_finish = start_tag + max(cost, 0.0) / tenant.weight
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(start_tag=start_tag, seq=next(self._seq), future=loop.create_future())
+        state.queue.append(waiter)
+        enqueued = time.monotonic()
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(tenant, priority)
+            else:
+                state.queue.remove(waiter)
+                self._prune(state)
+                self._dispatch()
+            raise
+
+        waited = time.monotonic() - enqueued
+        stats = self._plan_stats(tenant.plan)
+        stats["dispatched"] += 1
+        stats["wait_s_total"] += waited
+        stats["wait_s_max"] = max(stats["wait_s_max"], waited)
+
+    def release(self, tenant: Tenant, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Finish one unit of work for ``tenant`` and dispatch the next waiter."""
+        state = self._tenants.get((priority, tenant.id))
+        if state is not None:
+            state.in_flight = max(0, state.in_flight - 1)
+        self._in_flight_by_priority[priority] = max(0, self._in_flight_by_priority[priority] - 1)
+        self.in_flight = max(0, self.in_flight - 1)
+        self._dispatch()
+        if state is not None:
+            self._prune(state)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tenant: Optional[Tenant] = None,
+        cost: float = 1.0,
+        priority: Optional[Priority] = None
+    ) -> AsyncIterator[None]:
+        """Hold a lane slot (defaults: the current request's tenant and priority)."""
+        tenant = tenant or current_tenant.get() or ANONYMOUS_TENANT
+        priority = priority or current_priority.get()
+        await self.acquire(tenant, cost, priority)
+        try:
+            yield
+        finally:
+            self.release(tenant, priority)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Lane occupancy, per-tenant and per-priority queue depth, per-plan wait times."""
+        tenants: dict[str, dict[str, Any]] = {}
+        for state in self._tenants.values():
+            if not (state.queue or state.in_flight):
+                continue
+            entry = tenants.setdefault(
+                state.tenant.id, {"plan": state.tenant.plan, "in_flight": 0, "queued": 0})
+            entry["in_flight"] += state.in_flight
+            entry["queued"] += len(state.queue)
+
+        return {
+            "capacity": self.capacity,
+            "interactive_reserved": self.interactive_reserved,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(len(s.queue) for s in self._tenants.values()),
+            "priorities": {
+                priority.value: {
+                    "in_flight": self._in_flight_by_priority[priority],
+                    "queued": sum(len(s.queue) for s in self._tenants.values() if s.priority is priority),
+                }
+                for priority in Priority
+            },
+            "tenants": tenants,
+            "plans": {
+                plan: {
+                    "dispatched": int(stats["dispatched"]),
+                    "wait_ms_avg": round(stats["wait_s_total"] / (stats["dispatched"] or 1) * 1000, 1),
+                    "wait_ms_max": round(stats["wait_s_max"] * 1000, 1),
+                }
+                for plan, stats in self._plans.items()
+            },
+        }
+
+
+class TenantScheduler:
+    """
+    Extraction and LLM lanes plus plan-based tenant weights and caps.
+    """
+
+    def __init__(self, settings: Any):
+        self.settings = settings
+        reserved = settings.scheduler_interactive_reserved_slots
+        self.extraction = FairScheduler("extraction", settings.scheduler_extraction_concurrency, reserved)
+        self.llm = FairScheduler("llm", settings.scheduler_llm_concurrency, reserved)
+
+    def tenant(self, tenant_id: str, plan: Optional[str] = None) -> Tenant:
+        """Build a Tenant with the weight and cap of its plan."""
+        plan = plan or self.settings.scheduler_anonymous_plan
+        return Tenant(
+            id=tenant_id,
+            plan=plan,
+            weight=self.settings.scheduler_plan_weights.get(plan, 1.0),
+            max_concurrency=self.settings.scheduler_plan_max_concurrency.get(plan, 1),
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "extraction": self.extraction.snapshot(),
+            "llm": self.llm.snapshot(),
+        }
+
+
+async def scheduled_sections(
+    lane: FairScheduler,
+    sections: AsyncIterator[Any],
+    cost: float = 1.0
+) -> AsyncIterator[Any]:
+    """Hold a lane slot while an async generator of sections is consumed."""
+    async with lane.slot(cost=cost):
+        try:
+            async for section in sections:
+                yield section
+        finally:
+            # Stop the extraction (and its worker futures) before freeing the slot
+            aclose = getattr(sections, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,321 @@
+"""
+Full-text search over analyzed contracts.
+
+Two backends share one interface:
+
+* ``PostgresSearchIndex``: a weighted ``tsvector`` column on ``contracts``
+  (summary > key terms and parties > extracted text) behind a GIN index,
+  queried through the ``search_contracts`` RPC with ``websearch_to_tsquery``,
+  ``ts_rank_cd`` and ``ts_headline``. The extracted text is only stored as a
+  tsvector, computed by the ``insert_contract`` RPC that writes the row, not
+  as raw text in the row.
+* ``SqliteSearchIndex``: an embedded SQLite FTS5 inverted index with BM25
+  ranking and snippets, for deployments without Supabase.
+
+Both are updated incrementally as each analysis is persisted, and both
+accept the same web-search style query syntax: words are ANDed, ``or``
+separates alternatives, ``"quoted phrases"`` match in order, and ``-word``
+excludes. Searches only return the given user's contracts; anonymous
+uploads are not searchable.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from logger import get_logger
+from models import SearchHit
+
+logger = get_logger(__name__)
+
+_QUERY_TOKEN_RE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+")
+
+
+def to_fts5_query(query: str) -> Optional[str]:
+    """
+    Translate a web-search style query into an FTS5 MATCH expression.
+
+    Every term is quoted, so FTS5 operators and punctuation in user input
+    cannot break the expression. ``auto-renewal`` becomes the phrase
+    ``"auto renewal"``.
+
+    Returns:
+        The MATCH expression, or None if the query has no positive terms
+    """
+    groups: list[list[str]] = []
+    negated: list[str] = []
+    join_next = False
+
+    for match in _QUERY_TOKEN_RE.finditer(query):
+        minus, phrase, word = match.groups()
+        if word is not None:
+            if word.lower() == "or":
+                join_next = bool(groups)
+                continue
+            if word.lower() == "and":
+                continue
+            minus, text = ("-", word[1:]) if word.startswith("-") and len(word) > 1 else ("", word)
+        else:
+            text = phrase
+
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if minus:
+            negated.append(term)
+        elif join_next:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_next = False
+
+    if not groups:
+        return None
+    expression = " AND ".join(
+        group[0] if len(group) == 1 else "(" + " OR ".join(group) + ")" for group in groups
+    )
+    for term in negated:
+        expression += f" NOT {term}"
+    return expression
+
+
+class SearchIndex(ABC):
+    """Incrementally updated full-text index of analyzed contracts."""
+
+    @abstractmethod
+    async def index(
+        self,
+        record_id: str,
+        user_id: str,
+        metadata: dict[str, Any],
+        analysis: dict[str, Any],
+        text: str
+    ) -> None:
+        """Add or replace one analyzed contract."""
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        user_id: str,
+        limit: int = 20,
+        contract_type: Optional[str] = None,
+        risk_level: Optional[str] = None
+    ) -> list[SearchHit]:
+        """Best matches for ``query`` among ``user_id``'s contracts, highest rank first."""
+
+    def row_body(self, text: str) -> Optional[str]:
+        """Extracted text to write with the contract row, for backends indexed on insert."""
+        return None
+
+    async def index_contract(
+        self,
+        record_id: Optional[str],
+        user_id: Optional[str],
+        metadata: dict[str, Any],
+        analysis: dict[str, Any],
+        text: str
+    ) -> None:
+        """Index a just-persisted contract; failures are logged, not raised."""
+        if not record_id or user_id is None:
+            return
+        try:
+            await self.index(record_id, user_id, metadata, analysis, text)
+        except Exception as e:
+            logger.warning(f"Failed to index contract for search: {str(e)}",
+                           extra={"record_id": record_id})
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class SqliteSearchIndex(SearchIndex):
+    """
+    Embedded SQLite FTS5 index.
+
+    Column weights for BM25 favour the summary, then key terms and parties,
+    then the extracted text.
+    """
+
+    RANK = "bm25(4.0, 2.0, 2.0, 1.0)"
+
+    def __init__(self, path: str, max_body_chars: int = 200_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.max_body_chars = max_body_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS contracts (
+                rowid INTEGER PRIMARY KEY,
+                record_id TEXT NOT NULL UNIQUE,
+                user_id TEXT,
+                filename TEXT,
+                contract_type TEXT,
+                risk_level TEXT,
+                summary TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS contracts_fts USING fts5(
+                summary, key_terms, parties, body,
+                tokenize = 'porter unicode61'
+            );
+        """)
+        # Indexes created before searches were scoped to an owner; their
+        # rows have no owner and are not returned until re-indexed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(contracts)")}
+        if "user_id" not in columns:
+            self._conn.execute("ALTER TABLE contracts ADD COLUMN user_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS contracts_user_id ON contracts (user_id)")
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO contracts_fts (contracts_fts, rank) VALUES ('rank', ?)", (self.RANK,)
+            )
+        logger.info("SqliteSearchIndex opened", extra={"path": path})
+
+    def _index(self, record_id: str, user_id: str, metadata: dict, analysis: dict, text: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT rowid FROM contracts WHERE record_id = ?", (record_id,)
+            ).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM contracts_fts WHERE rowid = ?", (row[0],))
+                self._conn.execute("DELETE FROM contracts WHERE rowid = ?", (row[0],))
+            rowid = self._conn.execute(
+                "INSERT INTO contracts "
+                "(record_id, user_id, filename, contract_type, risk_level, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record_id, user_id, metadata.get("filename"), analysis.get("contract_type"),
+                 analysis.get("risk_level"), analysis.get("summary"), time.time()),
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO contracts_fts (rowid, summary, key_terms, parties, body) VALUES (?, ?, ?, ?, ?)",
+                (rowid, analysis.get("summary") or "",
+                 "\n".join(analysis.get("key_terms") or []),
+                 "\n".join(analysis.get("parties") or []),
+                 text[:self.max_body_chars]),
+            )
+
+    async def index(self, record_id, user_id, metadata, analysis, text) -> None:
+        await asyncio.to_thread(self._index, record_id, user_id, metadata, analysis, text)
+
+    def _search(
+        self, expression: str, user_id: str, limit: int, contract_type, risk_level
+    ) -> list[SearchHit]:
+        sql = (
+            "SELECT c.record_id, c.filename, c.contract_type, c.risk_level, c.summary, "
+            "-contracts_fts.rank, "
+            "snippet(contracts_fts, -1, '<mark>', '</mark>', '…', 16) "
+            "FROM contracts_fts JOIN contracts c ON c.rowid = contracts_fts.rowid "
+            "WHERE contracts_fts MATCH ? AND c.user_id = ?"
+        )
+        params: list[Any] = [expression, user_id]
+        if contract_type:
+            sql += " AND c.contract_type = ?"
+            params.append(contract_type)
+        if risk_level:
+            sql += " AND c.risk_level = ?"
+            params.append(risk_level)
+        sql += " ORDER BY contracts_fts.rank LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            SearchHit(id=record_id, filename=filename, contract_type=ctype, risk_level=risk,
+                      summary=summary, rank=rank, highlights=[snippet] if snippet else [])
+            for record_id, filename, ctype, risk, summary, rank, snippet in rows
+        ]
+
+    async def search(self, query, user_id, limit=20, contract_type=None, risk_level=None) -> list[SearchHit]:
+        expression = to_fts5_query(query)
+        if expression is None:
+            return []
+        return await asyncio.to_thread(self._search, expression, user_id, limit, contract_type, risk_level)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresSearchIndex(SearchIndex):
+    """
+    Postgres ``tsvector``/GIN index on the ``contracts`` table.
+
+    The extracted text is indexed by the insert itself (``row_body`` is passed
+    to ``SupabaseService.insert_contract``), and summary, key terms and
+    parties by a generated column whenever the row is written, so indexing is
+    a no-op here; this backend only runs queries. The owner is the row's
+    ``user_id``.
+    """
+
+    def __init__(self, client: Any, max_body_chars: int = 200_000):
+        self.client = client
+        self.max_body_chars = max_body_chars
+
+    def row_body(self, text: str) -> Optional[str]:
+        return text[:self.max_body_chars]
+
+    async def index(self, record_id, user_id, metadata, analysis, text) -> None:
+        return None
+
+    async def search(self, query, user_id, limit=20, contract_type=None, risk_level=None) -> list[SearchHit]:
+        if to_fts5_query(query) is None:
+            return []
+        res = await asyncio.to_thread(self.client.rpc("search_contracts", {
+            "p_user_id": user_id,
+            "p_query": query,
+            "p_limit": limit,
+            "p_contract_type": contract_type,
+            "p_risk_level": risk_level,
+        }).execute)
+        return [
+            SearchHit(
+                id=str(row["id"]),
+                filename=row.get("filename"),
+                contract_type=row.get("contract_type"),
+                risk_level=row.get("risk_level"),
+                summary=row.get("summary"),
+                created_at=row.get("created_at"),
+                rank=round(row.get("rank") or 0.0, 4),
+                highlights=[row["headline"]] if row.get("headline") else [],
+            )
+            for row in res.data or []
+        ]
+
+
+def create_search_index(settings: Any, client: Optional[Any] = None) -> Optional[SearchIndex]:
+    """
+    Build the configured backend (None if disabled or unavailable).
+
+    ``search_backend=auto`` picks Postgres when a Supabase ``client`` is
+    given, else SQLite FTS5.
+    """
+    if not settings.search_enabled:
+        return None
+    backend = settings.search_backend
+    if backend == "auto":
+        backend = "postgres" if client is not None else "sqlite"
+    try:
+        if backend == "postgres":
+            if client is None:
+                logger.warning("Postgres search backend requires Supabase; search disabled")
+                return None
+            index: SearchIndex = PostgresSearchIndex(client, settings.search_max_body_chars)
+        else:
+            index = SqliteSearchIndex(settings.search_index_path, settings.search_max_body_chars)
+    except Exception as e:
+        logger.warning(f"Failed to initialize search index: {str(e)}")
+        return None
+    logger.info("Search index initialized", extra={"backend": backend})
+    return index
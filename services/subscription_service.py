@@ -1,10 +1,25 @@
 """
 Subscription management service.
+
+The active subscription of a user is read on most authenticated requests
+(tenant scheduling, usage tracking, plan changes), so it is cached:
+
+* Per process, per user, for ``subscription_cache_ttl_s`` seconds (misses
+  included). Creating, upgrading or canceling a subscription and Stripe
+  webhook events for it invalidate the entry right away; other worker
+  processes see the change when their entry expires.
+* Per request: inside ``subscription_request_scope`` (entered by
+  ``RequestScopeMiddleware``) a user's subscription is looked up at most
+  once, even after the process cache entry expires mid-request.
 """
 
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from uuid import UUID
 
 from supabase import Client
@@ -28,18 +43,80 @@ from models.subscription_models import (
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Subscriptions already looked up by the current request, keyed by user id
+_request_subscriptions: ContextVar[Optional[dict]] = ContextVar("request_subscriptions", default=None)
+
+
+@contextmanager
+def subscription_request_scope() -> Iterator[None]:
+    """Look up each user's subscription at most once inside the block."""
+    token = _request_subscriptions.set({})
+    try:
+        yield
+    finally:
+        _request_subscriptions.reset(token)
+
 
 class SubscriptionService:
     """Service for managing subscriptions and usage."""
 
-    def __init__(self, db_client: Client):
+    def __init__(
+        self,
+        db_client: Client,
+        cache_ttl_s: Optional[float] = None,
+        cache_max_entries: Optional[int] = None
+    ):
         """
         Initialize subscription service.
 
         Args:
             db_client: Supabase client instance
+            cache_ttl_s: Seconds a user's subscription stays cached (0 disables)
+            cache_max_entries: Users kept in the cache, least recently used evicted
         """
         self.db = db_client
+        self.cache_ttl_s = settings.subscription_cache_ttl_s if cache_ttl_s is None else cache_ttl_s
+        self.cache_max_entries = (
+            settings.subscription_cache_max_entries if cache_max_entries is None else cache_max_entries)
+        self._cache: "OrderedDict[str, tuple[float, Optional[SubscriptionWithPlan]]]" = OrderedDict()
+        # Bumped on every invalidation; a lookup that raced one is not cached
+        self._cache_version = 0
+
+    def invalidate(self, user_id: UUID) -> None:
+        """
+        Drop a user's cached subscription after it changed.
+
+        Args:
+            user_id: User ID
+        """
+        key = str(user_id)
+        self._cache_version += 1
+        self._cache.pop(key, None)
+        memo = _request_subscriptions.get()
+        if memo is not None:
+            memo.pop(key, None)
+
+    async def invalidate_stripe_subscription(self, stripe_subscription_id: Optional[str]) -> None:
+        """
+        Drop cached subscriptions of the users a Stripe subscription belongs to.
+
+        Args:
+            stripe_subscription_id: Stripe subscription ID from a webhook event
+        """
+        if not stripe_subscription_id:
+            return
+        try:
+            result = self.db.table("subscriptions").select("user_id").eq(
+                "stripe_subscription_id", stripe_subscription_id
+            ).execute()
+        except Exception as e:
+            # Without the owner, drop everything rather than serve a stale plan
+            logger.warning(f"Failed to resolve Stripe subscription owner: {str(e)}")
+            self._cache_version += 1
+            self._cache.clear()
+            return
+        for row in result.data or []:
+            self.invalidate(row["user_id"])
 
     async def get_all_plans(self) -> List[SubscriptionPlan]:
         """
@@ -141,6 +218,7 @@ class SubscriptionService:
                 raise ValidationError("Failed to create subscription")
 
             subscription = Subscription(**result.data[0])
+            self.invalidate(user_id)
             logger.info(
                 f"Subscription created for user {user_id}: "
                 f"{subscription_data.plan_name} ({subscription_data.billing_cycle})"
@@ -157,12 +235,37 @@ class SubscriptionService:
         """
         Get active subscription for a user with plan details.
 
+        Served from the request memo or the TTL cache when possible.
+
         Args:
             user_id: User ID
 
         Returns:
             Subscription with plan or None if no active subscription
         """
+        key = str(user_id)
+        memo = _request_subscriptions.get()
+        if memo is not None and key in memo:
+            return memo[key]
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            subscription = cached[1]
+        else:
+            version = self._cache_version
+            subscription = await self._fetch_user_subscription(user_id)
+            if self.cache_ttl_s > 0 and version == self._cache_version:
+                self._cache[key] = (time.monotonic() + self.cache_ttl_s, subscription)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_max_entries:
+                    self._cache.popitem(last=False)
+
+        if memo is not None:
+            memo[key] = subscription
+        return subscription
+
+    async def _fetch_user_subscription(self, user_id: UUID) -> Optional[SubscriptionWithPlan]:
         try:
             result = self.db.table("subscriptions").select(
                 "*, plan:subscription_plans(*)"
@@ -173,13 +276,8 @@ class SubscriptionService:
             if not result.data:
                 return None
 
-            data = result.data[0]
-            plan_data = data.pop("plan")
-            
-            subscription = Subscription(**data)
-            plan = SubscriptionPlan(**plan_data)
-            
-            return SubscriptionWithPlan(**subscription.dict(), plan=plan)
+            # The nested plan is validated as SubscriptionPlan in one pass
+            return SubscriptionWithPlan.model_validate(result.data[0])
 
         except Exception as e:
             logger.error(
@@ -222,6 +320,9 @@ class SubscriptionService:
                 "usage_type": usage_type.value,
                 "quantity": quantity,
                 "metadata": metadata or {},
+                # The server restamps the period from the current subscription
+                # (migrations/011_usage_period_server_side.sql): this one may
+                # be cached from before a rollover
                 "billing_period_start": subscription.current_period_start.isoformat(),
                 "billing_period_end": subscription.current_period_end.isoformat(),
             }
@@ -327,6 +428,7 @@ class SubscriptionService:
                 raise ValidationError("Failed to upgrade subscription")
 
             subscription = Subscription(**result.data[0])
+            self.invalidate(user_id)
             logger.info(
                 f"Subscription upgraded for user {user_id}: "
                 f"{current_sub.plan.name} -> {new_plan_name}"
@@ -368,6 +470,7 @@ class SubscriptionService:
                 raise ValidationError("Failed to cancel subscription")
 
             subscription = Subscription(**result.data[0])
+            self.invalidate(user_id)
             logger.info(f"Subscription canceled for user {user_id}")
             return subscription
 
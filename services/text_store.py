@@ -0,0 +1,311 @@
+"""
+Content-addressed store for extracted contract text.
+
+Docling conversion is the most expensive step of an analysis, so the
+extracted markdown is kept: zstd-compressed and keyed by the SHA-256 of the
+original file (``content_key``). Uploading the same file twice stores one
+blob, and ``contracts.text_key`` lets a stored contract be re-analyzed
+straight from its text without touching docling.
+
+Two backends share one interface:
+
+* ``LocalTextStore``: files under a directory, fanned out by key prefix.
+* ``S3TextStore``: objects in an S3-compatible bucket; point
+  ``TEXT_STORE_S3_ENDPOINT_URL`` at a local stand-in such as MinIO for
+  development.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def content_key(data: bytes) -> str:
+    """Store key for an uploaded file: hex SHA-256 of its bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class TextStore(ABC):
+    """zstd-compressed extracted text, keyed by ``content_key``."""
+
+    def __init__(self, level: int = 10):
+        import zstandard
+
+        self._zstd = zstandard
+        self.level = level
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        """Compressed blob for ``key``, or None if absent."""
+
+    @abstractmethod
+    def _write(self, key: str, blob: bytes) -> None:
+        """Store a compressed blob under ``key``."""
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        """Whether ``key`` is stored."""
+
+    @abstractmethod
+    def _delete(self, key: str) -> int:
+        """Remove ``key``; compressed bytes freed (0 if absent)."""
+
+    @abstractmethod
+    def _touch(self, key: str) -> bool:
+        """Refresh the modification time of ``key``; False if it is not stored."""
+
+    @abstractmethod
+    def _modified(self, key: str) -> Optional[float]:
+        """Modification time of ``key`` (epoch seconds), or None if absent."""
+
+    def _put(self, key: str, text: str) -> bool:
+        # An existing blob is touched: the upload re-references it, and the
+        # retention job leaves recently modified blobs alone
+        if self._touch(key):
+            return False
+        # Compressor objects are not thread-safe; they are cheap to create
+        blob = self._zstd.ZstdCompressor(level=self.level).compress(text.encode("utf-8"))
+        self._write(key, blob)
+        return True
+
+    def _get(self, key: str) -> Optional[str]:
+        blob = self._read(key)
+        if blob is None:
+            return None
+        return self._zstd.ZstdDecompressor().decompress(blob).decode("utf-8")
+
+    async def put(self, key: str, text: str) -> bool:
+        """
+        Store ``text`` under ``key`` unless it is already there.
+
+        Returns:
+            True if a new blob was written
+        """
+        return await asyncio.to_thread(self._put, key, text)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Extracted text for ``key``, or None if it was never stored."""
+        return await asyncio.to_thread(self._get, key)
+
+    def _delete_older(self, key: str, written_before: Optional[float]) -> int:
+        if written_before is not None:
+            modified = self._modified(key)
+            if modified is None or modified >= written_before:
+                return 0
+        return self._delete(key)
+
+    async def delete(self, key: str, written_before: Optional[float] = None) -> int:
+        """
+        Remove the blob stored under ``key``.
+
+        Args:
+            key: Content key
+            written_before: Only remove the blob if it was last written or
+                re-stored before this time (epoch seconds)
+
+        Returns:
+            Compressed bytes freed, 0 if nothing was stored or it is newer
+        """
+        return await asyncio.to_thread(self._delete_older, key, written_before)
+
+    async def store_text(self, key: Optional[str], text: str) -> Optional[str]:
+        """Store a just-extracted text; failures are logged, not raised.
+
+        Returns:
+            ``key`` if the text is stored, None otherwise
+        """
+        if not key or not text:
+            return None
+        try:
+            await self.put(key, text)
+            return key
+        except Exception as e:
+            logger.warning(f"Failed to store extracted text: {str(e)}", extra={"text_key": key})
+            return None
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class LocalTextStore(TextStore):
+    """Blobs on the local filesystem at ``<root>/<k[:2]>/<k[2:4]>/<k>.md.zst``."""
+
+    def __init__(self, root: str, level: int = 10):
+        super().__init__(level)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        logger.info("LocalTextStore opened", extra={"path": root})
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}.md.zst")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, blob: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _delete(self, key: str) -> int:
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def _touch(self, key: str) -> bool:
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _modified(self, key: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+
+class S3TextStore(TextStore):
+    """Blobs in an S3-compatible bucket at ``<prefix><key>.md.zst``."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        level: int = 10,
+        client: Optional[Any] = None
+    ):
+        super().__init__(level)
+        if client is None:
+            import boto3
+
+            # Credentials and region come from the standard AWS environment
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        logger.info("S3TextStore opened", extra={"bucket": bucket, "endpoint_url": endpoint_url})
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.md.zst"
+
+    @staticmethod
+    def _is_missing(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            res = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return res["Body"].read()
+
+    def _write(self, key: str, blob: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=blob,
+            ContentType="text/markdown",
+            ContentEncoding="zstd",
+        )
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def _delete(self, key: str) -> int:
+        object_key = self._object_key(key)
+        try:
+            size = self.client.head_object(Bucket=self.bucket, Key=object_key)["ContentLength"]
+        except Exception as e:
+            if self._is_missing(e):
+                return 0
+            raise
+        self.client.delete_object(Bucket=self.bucket, Key=object_key)
+        return size
+
+    def _touch(self, key: str) -> bool:
+        # Copying an object onto itself is how S3 refreshes LastModified
+        object_key = self._object_key(key)
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=object_key,
+                CopySource={"Bucket": self.bucket, "Key": object_key},
+                MetadataDirective="REPLACE",
+                ContentType="text/markdown",
+                ContentEncoding="zstd",
+            )
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def _modified(self, key: str) -> Optional[float]:
+        try:
+            res = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return res["LastModified"].timestamp()
+
+
+def create_text_store(settings: Any) -> Optional[TextStore]:
+    """Build the configured backend (None if disabled or unavailable)."""
+    if not settings.text_store_enabled:
+        return None
+    try:
+        if settings.text_store_backend == "s3":
+            if not settings.text_store_s3_bucket:
+                logger.warning("S3 text store requires TEXT_STORE_S3_BUCKET; text store disabled")
+                return None
+            store: TextStore = S3TextStore(
+                settings.text_store_s3_bucket,
+                prefix=settings.text_store_s3_prefix,
+                endpoint_url=settings.text_store_s3_endpoint_url,
+                level=settings.text_store_zstd_level,
+            )
+        else:
+            store = LocalTextStore(settings.text_store_path, level=settings.text_store_zstd_level)
+    except Exception as e:
+        logger.warning(f"Failed to initialize text store: {str(e)}")
+        return None
+    logger.info("Text store initialized", extra={"backend": settings.text_store_backend})
+    return store
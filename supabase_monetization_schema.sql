@@ -88,7 +88,8 @@ CREATE TABLE IF NOT EXISTS usage_tracking (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Indexes for fast aggregation
+-- Indexes for fast aggregation (migrations/008 replaces this table with a
+-- monthly partitioned one and adds usage_period_counters)
 CREATE INDEX idx_usage_user_period ON usage_tracking(user_id, billing_period_start, billing_period_end);
 CREATE INDEX idx_usage_subscription ON usage_tracking(subscription_id);
 CREATE INDEX idx_usage_type ON usage_tracking(usage_type);
@@ -184,49 +185,7 @@ CREATE POLICY overages_select_own ON overage_charges FOR SELECT USING (auth.uid(
 -- HELPER FUNCTIONS
 -- ============================================================================
 
--- Function to get current usage for a user in current billing period
-CREATE OR REPLACE FUNCTION get_current_usage(p_user_id UUID)
-RETURNS TABLE (
-    contracts_used INTEGER,
-    contracts_limit INTEGER,
-    overage INTEGER,
-    billing_period_start TIMESTAMP WITH TIME ZONE,
-    billing_period_end TIMESTAMP WITH TIME ZONE
-) AS $$
-BEGIN
-    RETURN QUERY
-    SELECT 
-        COUNT(ut.id)::INTEGER as contracts_used,
-        sp.contracts_per_month as contracts_limit,
-        GREATEST(COUNT(ut.id)::INTEGER - sp.contracts_per_month, 0) as overage,
-        s.current_period_start,
-        s.current_period_end
-    FROM subscriptions s
-    JOIN subscription_plans sp ON s.plan_id = sp.id
-    LEFT JOIN usage_tracking ut ON ut.user_id = s.user_id 
-        AND ut.created_at >= s.current_period_start 
-        AND ut.created_at < s.current_period_end
-        AND ut.usage_type = 'contract_analysis'
-    WHERE s.user_id = p_user_id 
-        AND s.status IN ('trial', 'active')
-    GROUP BY sp.contracts_per_month, s.current_period_start, s.current_period_end;
-END;
-$$ LANGUAGE plpgsql;
-
--- Function to check if user has reached their limit
-CREATE OR REPLACE FUNCTION check_usage_limit(p_user_id UUID)
-RETURNS BOOLEAN AS $$
-DECLARE
-    v_usage_info RECORD;
-BEGIN
-    SELECT * INTO v_usage_info FROM get_current_usage(p_user_id);
-    
-    IF v_usage_info IS NULL THEN
-        RETURN FALSE; -- No active subscription
-    END IF;
-    
-    -- Allow overage (will be charged)
-    RETURN TRUE;
-END;
-$$ LANGUAGE plpgsql;
-
+-- get_current_usage and check_usage_limit read the per-period counters in
+-- usage_period_counters; both are created by
+-- migrations/008_usage_partitions_and_counters.sql, which also partitions
+-- usage_tracking by month. Apply migrations/*.sql after this file.
@@ -1,5 +1,6 @@
 -- Run this in Supabase SQL editor to create the `contracts` table
 -- Updated schema for production-ready contract analyzer
+-- Then apply migrations/*.sql in order (functions, triggers and rollups)
 
 create table if not exists public.contracts (
   id uuid default gen_random_uuid() primary key,
@@ -13,7 +14,17 @@ create table if not exists public.contracts (
   key_terms jsonb,
   risk_level text,
   summary text,
-  analysis jsonb,
+  analysis_extra jsonb,  -- analysis keys without a typed column (services/contract_storage.py)
+  text_key text,  -- extracted text in the text store (services/text_store.py)
+  analyzer_fingerprint text,  -- ContractAnalyzer.fingerprint that produced the analysis
+  user_id uuid,  -- owner (references users.id), null for anonymous uploads
+  body_tsv tsvector,  -- extracted text, set by the insert_contract RPC
+  search_tsv tsvector generated always as (
+    setweight(to_tsvector('english', coalesce(summary, '')), 'A') ||
+    setweight(jsonb_to_tsvector('english', coalesce(key_terms, '[]'::jsonb), '["string"]'), 'B') ||
+    setweight(jsonb_to_tsvector('english', coalesce(parties, '[]'::jsonb), '["string"]'), 'B') ||
+    coalesce(body_tsv, ''::tsvector)
+  ) stored,
   created_at timestamptz default now(),
   updated_at timestamptz default now()
 );
@@ -23,6 +34,19 @@ create index if not exists idx_contracts_created_at on public.contracts(created_
 create index if not exists idx_contracts_contract_type on public.contracts(contract_type);
 create index if not exists idx_contracts_risk_level on public.contracts(risk_level);
 
+-- Keyset pagination on (created_at desc, id desc), optionally filtered
+create index if not exists idx_contracts_created_at_id on public.contracts(created_at desc, id desc);
+create index if not exists idx_contracts_type_created_at_id on public.contracts(contract_type, created_at desc, id desc);
+create index if not exists idx_contracts_risk_created_at_id on public.contracts(risk_level, created_at desc, id desc);
+
+-- Contracts referencing a stored extracted text
+create index if not exists idx_contracts_text_key on public.contracts(text_key) where text_key is not null;
+
+-- Full-text search (see migrations/002_contracts_full_text_search.sql,
+-- 009_search_owner_scope.sql for search_contracts and
+-- 010_contract_body_tsv_on_insert.sql for insert_contract)
+create index if not exists idx_contracts_search_tsv on public.contracts using gin (search_tsv);
+
 -- Enable Row Level Security (RLS)
 alter table public.contracts enable row level security;
 
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from config import Settings
+from exceptions import ServiceOverloadedError
+from services.admission import AdmissionController, ResourceBudget
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_order_on_release():
+    budget = ResourceBudget("pages", capacity=10, max_queue=5, retry_after_s=2)
+    assert await budget.acquire(8, timeout=1) == 8
+
+    order = []
+
+    async def wait(name, amount):
+        await budget.acquire(amount, timeout=1)
+        order.append(name)
+
+    first = asyncio.create_task(wait("first", 6))
+    second = asyncio.create_task(wait("second", 1))
+    await asyncio.sleep(0)
+    # "second" would fit now but must not overtake the queued request
+    assert order == [] and budget.snapshot()["queue_depth"] == 2
+
+    budget.release(8)
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"]
+    assert budget.in_use == 7
+
+
+@pytest.mark.asyncio
+async def test_overload_is_rejected_with_retry_after():
+    budget = ResourceBudget("bytes", capacity=100, max_queue=1, retry_after_s=3)
+    await budget.acquire(100, timeout=1)
+
+    queued = asyncio.create_task(budget.acquire(10, timeout=0.05))
+    await asyncio.sleep(0)
+    with pytest.raises(ServiceOverloadedError) as full:
+        await budget.acquire(10, timeout=1)
+    with pytest.raises(ServiceOverloadedError):
+        await queued
+
+    assert full.value.status_code == 503 and full.value.retry_after == 3
+    snapshot = budget.snapshot()
+    assert snapshot["rejected_queue_full"] == 1 and snapshot["rejected_timeout"] == 1
+    assert snapshot["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ticket_clamps_oversized_requests_and_releases_everything():
+    controller = AdmissionController(Settings(
+        openai_api_key="test", admission_max_inflight_mb=1, admission_max_inflight_pages=50,
+    ))
+
+    ticket = await controller.admit(5 * 1024 * 1024)
+    await ticket.acquire_pages(400)
+    assert controller.bytes.in_use == 1024 * 1024 and controller.pages.in_use == 50
+
+    ticket.release()
+    ticket.release()
+    assert controller.bytes.in_use == 0 and controller.pages.in_use == 0
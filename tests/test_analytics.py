@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from services.analytics import PortfolioAnalytics, tenant_key
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc=False):
+        self.rows = sorted(self.rows, key=lambda row: row[column], reverse=desc)
+        return self
+
+    def limit(self, n):
+        self.rows = self.rows[:n]
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class FakeClient:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return FakeTable(self.tables[name])
+
+
+@pytest.mark.asyncio
+async def test_portfolio_report_is_built_from_rollups():
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    rollups = [
+        {"month": this_month.isoformat(), "contract_type": "NDA", "risk_level": "Low", "contracts": 7},
+        {"month": this_month.isoformat(), "contract_type": "MSA", "risk_level": "High", "contracts": 2},
+        # Outside the requested window: counted in totals only
+        {"month": "2019-03-01", "contract_type": "MSA", "risk_level": "Low", "contracts": 5},
+    ]
+    parties = [
+        {"party": "Globex LLC", "contracts": 3},
+        {"party": "Acme Inc.", "contracts": 9},
+        {"party": "Initech", "contracts": 1},
+    ]
+    analytics = PortfolioAnalytics(FakeClient({
+        "contract_rollups_monthly": rollups,
+        "contract_party_rollups": parties,
+    }))
+
+    report = await analytics.portfolio(tenant_key(None), months=3, top_parties=2)
+
+    assert report.tenant == "anonymous"
+    assert report.total_contracts == 14
+    assert report.by_type == {"NDA": 7, "MSA": 7}
+    assert report.by_risk == {"Low": 12, "High": 2}
+    assert [bucket.month for bucket in report.monthly][-1] == this_month
+    assert len(report.monthly) == 3 and report.monthly[0].month < report.monthly[1].month
+    assert report.monthly[-1].contracts == 9
+    assert report.monthly[-1].by_risk == {"Low": 7, "High": 2}
+    assert report.monthly[0].contracts == 0
+    assert [(p.party, p.contracts) for p in report.top_counterparties] == [("Acme Inc.", 9), ("Globex LLC", 3)]
+
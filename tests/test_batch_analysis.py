@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from config import Settings
+from services.batch_analysis import BatchAnalyzer, LocalBatchTransport
+from services.contract_analyzer import ContractAnalyzer
+
+ANALYSIS_JSON = json.dumps({
+    "contract_type": "NDA",
+    "parties": None,
+    "key_dates": None,
+    "key_terms": ["Confidentiality"],
+    "risk_level": "Low",
+    "summary": "Mutual NDA",
+})
+
+CONTRACTS = {
+    "job-1": "MUTUAL NON-DISCLOSURE AGREEMENT\nThis Agreement is made on January 5, 2024 "
+             "between Acme Inc. and Globex LLC.",
+    "job-2": "CONSULTING AGREEMENT\nThis Agreement is made between Initech LLC and Hooli Inc.",
+    "job-3": "SERVICES AGREEMENT\nBetween Umbrella Corp and Soylent Inc.",
+}
+
+
+def _batch_analyzer(tmp_path, responder, **overrides) -> BatchAnalyzer:
+    settings = Settings(
+        openai_api_key="test",
+        near_duplicate_enabled=False,
+        openai_batch_work_dir=str(tmp_path / "work"),
+        **overrides,
+    )
+    transport = LocalBatchTransport(tmp_path / "provider", responder)
+    return BatchAnalyzer(ContractAnalyzer(settings), transport)
+
+
+@pytest.mark.asyncio
+async def test_batch_results_map_back_to_job_ids(tmp_path):
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        if "Initech" in body["messages"][-1]["content"]:
+            return "not json"
+        if "Umbrella" in body["messages"][-1]["content"]:
+            raise RuntimeError("rate limited")
+        return ANALYSIS_JSON
+
+    batch = _batch_analyzer(tmp_path, responder, openai_batch_max_requests=2)
+    results = await batch.run(CONTRACTS.items(), timeout=5)
+
+    # Three requests split into two request files
+    assert len(bodies) == 3 and len(list((tmp_path / "work").glob("*.manifest.json"))) == 2
+    assert set(results) == set(CONTRACTS)
+
+    nda = results["job-1"].analysis
+    # Null fields were filled from the rule candidates stored at submit time
+    assert nda.parties and nda.key_dates == ["2024-01-05"]
+    assert results["job-1"].model == "gpt-4o-mini"
+    assert results["job-2"].analysis is None and "JSON" in results["job-2"].error
+    assert results["job-3"].error == "rate limited"
+
+
+@pytest.mark.asyncio
+async def test_collect_reports_jobs_missing_from_output(tmp_path):
+    batch = _batch_analyzer(tmp_path, lambda body: ANALYSIS_JSON)
+    [batch_id] = await batch.submit(CONTRACTS.items())
+
+    output = batch.transport._output_path(batch_id)
+    lines = output.read_text().splitlines()
+    output.write_text("\n".join(lines[:1]) + "\n")
+
+    results = await batch.collect(batch_id)
+    assert sum(1 for result in results.values() if result.analysis) == 1
+    assert sum(1 for result in results.values() if result.error == "No result returned for request") == 2
@@ -0,0 +1,27 @@
+import re
+import zipfile
+
+from benchmarks.corpus import LINES_PER_PAGE, build_corpus, build_pages
+
+
+def test_corpus_has_requested_page_counts(tmp_path):
+    manifest = build_corpus(tmp_path, page_counts=(3,))
+    paths = {entry["format"]: entry["path"] for entry in manifest}
+
+    pdf = open(paths["pdf"], "rb").read()
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert len(re.findall(rb"/Type /Page\b", pdf)) == 3
+    assert b"/Count 3" in pdf
+
+    with zipfile.ZipFile(paths["docx"]) as archive:
+        document = archive.read("word/document.xml").decode()
+    assert document.count('w:type="page"') == 2
+
+    assert open(paths["txt"], encoding="utf-8").read().count("\f") == 2
+
+
+def test_page_layout_is_deterministic_and_full():
+    pages = build_pages(10, seed=3)
+
+    assert pages == build_pages(10, seed=3)
+    assert all(len(lines) == LINES_PER_PAGE for lines in pages)
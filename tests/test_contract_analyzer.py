@@ -1,5 +1,13 @@
 import json
 from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai import MockOpenAIConfig, create_app
+from config import Settings
+from exceptions import ContractAnalysisError
 from services.contract_analyzer import ContractAnalyzer
 
 
@@ -11,9 +19,11 @@ class DummyChoiceMsg:
 class DummyResponse:
     def __init__(self, content):
         self.choices = [DummyChoiceMsg(content)]
+        self.usage = None
 
 
-def test_analyze_parses_json(monkeypatch):
+@pytest.mark.asyncio
+async def test_analyze_parses_json(monkeypatch):
     sample_json = json.dumps({
         "contract_type": "NDA",
         "parties": ["Company A", "Company B"],
@@ -23,7 +33,7 @@ def test_analyze_parses_json(monkeypatch):
         "summary": "Short summary"
     })
 
-    def fake_create(*args, **kwargs):
+    async def fake_create(*args, **kwargs):
         return DummyResponse(sample_json)
 
     # Monkeypatch the module helper used by the analyzer via the module object
@@ -31,9 +41,40 @@ def test_analyze_parses_json(monkeypatch):
     mod = importlib.import_module("services.contract_analyzer")
     monkeypatch.setattr(mod, "_chat_create", fake_create)
 
-    analyzer = ContractAnalyzer()
-    res = analyzer.analyze("some text")
+    analyzer = ContractAnalyzer(Settings(openai_api_key="test"))
+    res = await analyzer.analyze("some text")
 
     assert res.contract_type == "NDA"
     assert "Company A" in res.parties
     assert res.risk_level == "Low"
+
+
+def _analyzer_against_mock(config: MockOpenAIConfig) -> ContractAnalyzer:
+    analyzer = ContractAnalyzer(Settings(openai_api_key="test"))
+    analyzer.client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://mock/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(config))),
+    )
+    return analyzer
+
+
+@pytest.mark.asyncio
+async def test_analyze_against_offline_openai_stand_in():
+    analyzer = _analyzer_against_mock(MockOpenAIConfig(latency="constant:0"))
+
+    res = await analyzer.analyze("Mutual Non-Disclosure Agreement between Acme Inc. and Globex LLC.")
+
+    assert res.contract_type == "NDA"
+    assert res.risk_level == "Low"
+
+
+@pytest.mark.asyncio
+async def test_malformed_stand_in_completion_raises(monkeypatch):
+    analyzer = _analyzer_against_mock(MockOpenAIConfig(latency="constant:0", malformed_rate=1.0))
+    # Skip tenacity's backoff between attempts
+    monkeypatch.setattr(analyzer._call_openai.retry, "sleep", lambda _: None, raising=False)
+
+    with pytest.raises(ContractAnalysisError):
+        await analyzer.analyze("Some agreement text.")
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from exceptions import ValidationError
+from services.database import SupabaseService, decode_cursor, encode_cursor
+
+ROWS = [
+    {"id": f"00000000-0000-0000-0000-0000000000{i:02d}", "created_at": f"2025-01-01T00:00:{59 - i:02d}+00:00"}
+    for i in range(5)
+]
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return record
+
+    def execute(self):
+        limit = next(args[0] for name, args, _ in self.calls if name == "limit")
+        return SimpleNamespace(data=self.rows[:limit], error=None)
+
+
+def _service(rows) -> SupabaseService:
+    svc = SupabaseService.__new__(SupabaseService)
+    svc.table = FakeQuery(rows)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_list_contracts_pages_by_keyset():
+    svc = _service(ROWS)
+    rows, next_cursor = await svc.list_contracts("u-1", limit=2, contract_type="NDA", columns=("summary",))
+
+    assert [row["id"] for row in rows] == [ROWS[0]["id"], ROWS[1]["id"]]
+    assert decode_cursor(next_cursor) == (ROWS[1]["created_at"], ROWS[1]["id"])
+    calls = [(name, args) for name, args, _ in svc.table.calls]
+    assert calls[0] == ("select", ("id,created_at,summary",))
+    assert calls[1] == ("eq", ("user_id", "u-1"))
+    assert ("eq", ("contract_type", "NDA")) in calls
+    assert ("limit", (3,)) in calls
+    assert not any(name == "or_" for name, _ in calls)
+
+    svc = _service(ROWS[2:3])
+    rows, last_cursor = await svc.list_contracts("u-1", limit=2, cursor=next_cursor)
+    created_at, record_id = ROWS[1]["created_at"], ROWS[1]["id"]
+    keyset = f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{record_id}")'
+    assert ("or_", (keyset,), {}) in svc.table.calls
+    assert last_cursor is None
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    record_id = ROWS[0]["id"]
+    cursor = encode_cursor("2025-01-01T00:00:00+00:00", record_id)
+    assert decode_cursor(cursor) == ("2025-01-01T00:00:00+00:00", record_id)
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor")
+    # Well-formed cursors carrying values Postgres would reject
+    for created_at, bad_id in [("2025-01-01T00:00:00+00:00", "abc"), ("yesterday", record_id)]:
+        with pytest.raises(ValidationError):
+            decode_cursor(encode_cursor(created_at, bad_id))
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.contract_storage import SlimBackfill, compose_analysis, contract_row
+from services.database import SupabaseService
+
+ANALYSIS = {
+    "contract_type": "NDA", "parties": ["Acme Inc.", "Globex LLC"], "key_dates": ["2025-01-01"],
+    "key_terms": ["Confidentiality"], "risk_level": "Low", "summary": "Mutual NDA",
+}
+
+
+def test_row_stores_analysis_once_and_round_trips():
+    row = contract_row({"filename": "a.pdf", "pages": 3}, ANALYSIS, user_id="u-1")
+
+    assert "analysis" not in row
+    assert row["analysis_extra"] is None
+    assert row["contract_type"] == "NDA" and row["user_id"] == "u-1"
+    assert compose_analysis(row) == ANALYSIS
+
+    extended = {**ANALYSIS, "governing_law": "New York"}
+    row = contract_row({"filename": "a.pdf"}, extended)
+    assert row["analysis_extra"] == {"governing_law": "New York"}
+    assert compose_analysis(row) == extended
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selected = None
+
+    def select(self, columns):
+        self.selected = columns
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[dict(row) for row in self.rows])
+
+
+@pytest.mark.asyncio
+async def test_listing_rebuilds_analysis_from_columns():
+    svc = SupabaseService.__new__(SupabaseService)
+    svc.table = FakeQuery([{"id": "c-1", "created_at": "2025-01-01T00:00:00+00:00",
+                            "filename": "a.pdf", **ANALYSIS, "analysis_extra": None}])
+
+    rows, _ = await svc.list_contracts("u-1", columns=("filename", "analysis"))
+
+    selected = svc.table.selected.split(",")
+    assert "analysis_extra" in selected and "analysis" not in selected
+    assert rows == [{"id": "c-1", "created_at": "2025-01-01T00:00:00+00:00",
+                     "filename": "a.pdf", "analysis": ANALYSIS}]
+
+
+class FakeRpcClient:
+    def __init__(self, legacy_rows, total_rows):
+        self.legacy = legacy_rows
+        self.total = total_rows
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        if name == "contract_storage_stats":
+            data = [{"total_rows": self.total, "legacy_rows": self.legacy,
+                     "avg_row_bytes": 900.0 if self.legacy else 450.0}]
+        else:
+            start = 0 if params["p_after"] is None else int(params["p_after"]) + 1
+            processed = max(0, min(params["p_limit"], self.total - start))
+            self.legacy = max(0, self.legacy - processed)
+            data = [{"processed": processed, "last_id": str(start + processed - 1) if processed else None}]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+
+@pytest.mark.asyncio
+async def test_backfill_walks_batches_and_reports_before_after():
+    client = FakeRpcClient(legacy_rows=5, total_rows=5)
+
+    report = await SlimBackfill(client, batch_size=2).run()
+
+    batch_calls = [params for name, params in client.calls if name == "slim_contracts_batch"]
+    assert [params["p_after"] for params in batch_calls] == [None, "1", "3"]
+    assert report["rows_scanned"] == 5 and report["batches"] == 3
+    assert report["before"]["avg_row_bytes"] == 900.0
+    assert report["after"]["legacy_rows"] == 0
+
+    # Nothing left to slim: only the stats are read
+    client.calls.clear()
+    await SlimBackfill(client, batch_size=2).run()
+    assert [name for name, _ in client.calls] == ["contract_storage_stats", "contract_storage_stats"]
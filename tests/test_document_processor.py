@@ -1,8 +1,13 @@
 import types
+
+import pytest
+
+from config import Settings
 from services.document_processor import ContractProcessor
 
 
-def test_process_returns_text_and_metadata(monkeypatch):
+@pytest.mark.asyncio
+async def test_process_returns_text_and_metadata(monkeypatch, tmp_path):
     # Create fake document object
     class FakeDoc:
         def __init__(self):
@@ -22,9 +27,88 @@ def test_process_returns_text_and_metadata(monkeypatch):
     monkeypatch.setattr(
         "services.document_processor.DocumentConverter", lambda: FakeConverter())
 
-    p = ContractProcessor()
-    out = p.process("dummy.pdf")
+    pdf = tmp_path / "dummy.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+
+    p = ContractProcessor(Settings(openai_api_key="test"))
+    out = await p.process(str(pdf))
 
     assert "text" in out and out["text"].startswith("# Contract")
     assert out["metadata"]["filename"] == "dummy.pdf"
     assert out["metadata"]["pages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_chosen_from_text_layer_and_cached(monkeypatch, tmp_path):
+    from models import ConversionPipeline
+    from services import document_processor
+
+    built = []
+
+    class FakeConverter:
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+        def convert(self, path):
+            return types.SimpleNamespace(document=types.SimpleNamespace(
+                pages=[1], export_to_markdown=lambda: f"# {self.pipeline.value}"))
+
+    def build(pipeline):
+        built.append(pipeline)
+        return FakeConverter(pipeline)
+
+    chars = {"born_digital.pdf": 1800.0, "scanned.pdf": 4.0, "broken.pdf": None}
+    monkeypatch.setattr(
+        document_processor, "DocumentConverter", lambda: build(ConversionPipeline.DEFAULT))
+    monkeypatch.setattr(document_processor, "_build_converter", build)
+    monkeypatch.setattr(document_processor, "_pdf_page_count", lambda path: 1)
+    monkeypatch.setattr(
+        document_processor, "_pdf_text_chars_per_page",
+        lambda path, pages: chars[path.rsplit("/", 1)[-1]])
+
+    p = ContractProcessor(Settings(openai_api_key="test"))
+    results = {}
+    for name in ["born_digital.pdf", "born_digital.pdf", "scanned.pdf", "broken.pdf", "terms.docx"]:
+        (tmp_path / name).write_bytes(b"x")
+        results[name] = await p.process(str(tmp_path / name))
+
+    assert results["born_digital.pdf"]["metadata"]["pipeline"] == "light"
+    assert results["scanned.pdf"]["metadata"]["pipeline"] == "full"
+    assert results["broken.pdf"]["metadata"]["pipeline"] == "default"
+    assert results["terms.docx"]["text"] == "# default"
+    # Each converter is built when its pipeline is first chosen, not eagerly
+    assert built == [ConversionPipeline.LIGHT, ConversionPipeline.FULL, ConversionPipeline.DEFAULT]
+
+
+def test_docling_is_loaded_by_warm_up_not_construction(monkeypatch):
+    from services import document_processor
+
+    built = []
+    monkeypatch.setattr(document_processor, "DocumentConverter", lambda: built.append("default"))
+    monkeypatch.setattr(document_processor, "_build_converter", lambda pipeline: built.append(pipeline.value))
+
+    p = ContractProcessor(Settings(openai_api_key="test"))
+    assert built == [] and not p.ready
+
+    p.warm_up()
+    assert p.ready and p.warmup_error is None
+    assert built == ["light"]
+
+    p = ContractProcessor(Settings(openai_api_key="test", pdf_pipeline_auto=False))
+    p.warm_up()
+    assert built == ["light", "default"]
+
+
+def test_failed_warm_up_is_reported(monkeypatch):
+    from services import document_processor
+
+    def missing():
+        raise ImportError("No module named 'docling'")
+
+    monkeypatch.setattr(document_processor, "DocumentConverter", missing)
+
+    p = ContractProcessor(Settings(openai_api_key="test", pdf_pipeline_auto=False))
+    p.warm_up()
+
+    assert not p.ready
+    assert "docling" in p.warmup_error
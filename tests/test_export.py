@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from services.database import SupabaseService
+from services.export import csv_chunks, ndjson_chunks, parquet_chunks
+
+ROWS = [
+    {"id": f"00000000-0000-0000-0000-0000000000{i:02d}", "created_at": f"2025-01-01T00:00:{59 - i:02d}+00:00", "user_id": "u-1",
+     "filename": f"c{i}.pdf", "pages": i + 1, "contract_type": "NDA",
+     "parties": ["Acme Inc.", f"Party {i}"], "summary": "Mutual NDA, \"standard\" terms"}
+    for i in range(7)
+]
+
+
+class FakeTable:
+    """Newest-first rows; ``or_`` keysets are resolved on the ``id`` bound."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages = 0
+
+    def select(self, columns):
+        return FakeQuery(self)
+
+
+class FakeQuery:
+    def __init__(self, table):
+        self.table = table
+        self.filters = {}
+        self.after = None
+        self.n = None
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def or_(self, expression):
+        self.after = re.search(r'id\.lt\."([^"]+)"', expression).group(1)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        self.table.pages += 1
+        rows = [row for row in self.table.rows
+                if (self.after is None or row["id"] > self.after)
+                and all(row.get(column) == value for column, value in self.filters.items())]
+        return SimpleNamespace(data=rows[:self.n])
+
+
+def _service(rows) -> SupabaseService:
+    svc = SupabaseService.__new__(SupabaseService)
+    svc.table = FakeTable(rows)
+    return svc
+
+
+async def _collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_iter_contracts_walks_every_keyset_page():
+    svc = _service(ROWS)
+    batches = [batch async for batch in svc.iter_contracts("u-1", batch_size=3)]
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row["id"] for batch in batches for row in batch] == [row["id"] for row in ROWS]
+    assert svc.table.pages == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_contracts_exports_only_the_callers_rows():
+    others = [{**row, "id": f"{row['id']}-x", "user_id": "u-2"} for row in ROWS]
+    svc = _service(sorted(ROWS + others, key=lambda row: row["id"]))
+
+    batches = [batch async for batch in svc.iter_contracts("u-1", batch_size=3)]
+
+    assert [row["id"] for batch in batches for row in batch] == [row["id"] for row in ROWS]
+    assert {row["user_id"] for batch in batches for row in batch} == {"u-1"}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_and_csv_encode_batches():
+    svc = _service(ROWS)
+    columns = ("id", "created_at", "pages", "parties", "summary", "risk_level")
+
+    lines = (await _collect(ndjson_chunks(svc.iter_contracts("u-1", batch_size=4)))).decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+
+    text = (await _collect(csv_chunks(svc.iter_contracts("u-1", batch_size=4), columns))).decode()
+    records = list(csv.reader(io.StringIO(text)))
+    assert records[0] == list(columns)
+    assert len(records) == len(ROWS) + 1
+    assert records[1] == [ROWS[0]["id"], ROWS[0]["created_at"], "1",
+                          '["Acme Inc.","Party 0"]', ROWS[0]["summary"], ""]
+
+
+@pytest.mark.asyncio
+async def test_parquet_is_written_in_row_groups():
+    pq = pytest.importorskip("pyarrow.parquet")
+    svc = _service(ROWS)
+    columns = ("id", "created_at", "pages", "parties")
+
+    data = await _collect(parquet_chunks(svc.iter_contracts("u-1", batch_size=2), columns, row_group_rows=3))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == list(columns)
+    assert table.column("id").to_pylist() == [row["id"] for row in ROWS]
+    assert table.column("parties").to_pylist()[0] == ["Acme Inc.", "Party 0"]
+    assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from config import Settings
+from models import Priority
+from services.scheduler import FairScheduler, TenantScheduler, current_tenant, scheduling_priority
+
+
+def _scheduler(**overrides) -> TenantScheduler:
+    return TenantScheduler(Settings(openai_api_key="test", **overrides))
+
+
+async def _run(lane: FairScheduler, tenant, order: list, release: asyncio.Event):
+    async with lane.slot(tenant):
+        order.append(tenant.id)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_single_request_overtakes_queued_batch():
+    scheduler = _scheduler(scheduler_plan_max_concurrency={"starter": 50, "enterprise": 50})
+    lane = FairScheduler("llm", capacity=1)
+    batch = scheduler.tenant("user:batch", "enterprise")
+    solo = scheduler.tenant("user:solo", "starter")
+
+    order, release = [], asyncio.Event()
+    tasks = [asyncio.create_task(_run(lane, batch, order, release)) for _ in range(20)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_run(lane, solo, order, release)))
+    await asyncio.sleep(0)
+    assert lane.snapshot()["queue_depth"] == 20
+
+    release.set()
+    await asyncio.gather(*tasks)
+    # One batch item was already running; the solo request is next in line
+    assert order.index("user:solo") <= 2
+
+
+@pytest.mark.asyncio
+async def test_backlogged_tenants_share_by_plan_weight():
+    scheduler = _scheduler()
+    lane = FairScheduler("extraction", capacity=1)
+    blocker = scheduler.tenant("user:blocker", "business")
+    heavy = scheduler.tenant("user:heavy", "business")  # weight 4
+    light = scheduler.tenant("user:light", "starter")  # weight 1
+
+    await lane.acquire(blocker)
+    order, release = [], asyncio.Event()
+    release.set()
+    tasks = [asyncio.create_task(_run(lane, tenant, order, release))
+             for tenant in [heavy] * 10 + [light] * 10]
+    await asyncio.sleep(0)
+    lane.release(blocker)
+    await asyncio.gather(*tasks)
+
+    first_ten = order[:10]
+    assert first_ten.count("user:heavy") == 8
+    assert first_ten.count("user:light") == 2
+
+
+@pytest.mark.asyncio
+async def test_per_tenant_cap_and_cancellation():
+    scheduler = _scheduler(scheduler_plan_max_concurrency={"starter": 1})
+    lane = FairScheduler("llm", capacity=4)
+    tenant = scheduler.tenant("ip:10.0.0.1")
+    other = scheduler.tenant("ip:10.0.0.2")
+
+    token = current_tenant.set(tenant)
+    try:
+        async with lane.slot():
+            waiting = asyncio.create_task(lane.acquire(tenant))
+            await asyncio.sleep(0)
+            # Capped at one slot even though the lane has spare capacity
+            assert lane.snapshot()["tenants"]["ip:10.0.0.1"] == {
+                "plan": "starter", "in_flight": 1, "queued": 1}
+
+            await lane.acquire(other)
+            lane.release(other)
+
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+    finally:
+        current_tenant.reset(token)
+
+    snapshot = lane.snapshot()
+    assert snapshot["in_flight"] == 0 and snapshot["queue_depth"] == 0
+    assert snapshot["plans"]["starter"]["dispatched"] == 2
+
+
+@pytest.mark.asyncio
+async def test_interactive_work_is_dispatched_ahead_of_bulk():
+    scheduler = _scheduler(scheduler_plan_max_concurrency={"business": 10})
+    lane = FairScheduler("extraction", capacity=3, interactive_reserved=1)
+    tenant = scheduler.tenant("user:acme", "business")
+
+    # Bulk only uses idle capacity outside the reserved interactive slot
+    await lane.acquire(tenant, priority=Priority.BULK)
+    await lane.acquire(tenant, priority=Priority.BULK)
+    queued_bulk = asyncio.create_task(lane.acquire(tenant, priority=Priority.BULK))
+    await asyncio.sleep(0)
+    assert not queued_bulk.done()
+
+    with scheduling_priority(Priority.INTERACTIVE):
+        async with lane.slot(tenant):
+            snapshot = lane.snapshot()
+            assert snapshot["priorities"]["interactive"]["in_flight"] == 1
+            assert snapshot["priorities"]["bulk"] == {"in_flight": 2, "queued": 1}
+
+            # A second interactive request overtakes the queued bulk one
+            interactive = asyncio.create_task(lane.acquire(tenant))
+            await asyncio.sleep(0)
+            lane.release(tenant, Priority.BULK)
+            await asyncio.sleep(0)
+            assert interactive.done() and not queued_bulk.done()
+            lane.release(tenant)
+
+    lane.release(tenant, Priority.BULK)
+    await queued_bulk
+    assert lane.snapshot()["priorities"]["bulk"]["in_flight"] == 1
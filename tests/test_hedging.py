@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from services.hedging import HedgingPolicy, LatencySketch
+
+
+def test_sketch_quantiles_within_relative_error():
+    sketch = LatencySketch(relative_accuracy=0.02)
+    for i in range(1, 1001):
+        sketch.add(i / 1000)
+
+    assert sketch.quantile(0.5) == pytest.approx(0.5, rel=0.03)
+    assert sketch.quantile(0.99) == pytest.approx(0.99, rel=0.03)
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+    policy = HedgingPolicy(percentile=0.9, budget_ratio=1.0, min_delay_s=0.01, min_samples=5)
+    for _ in range(10):
+        policy.sketch("m").add(0.01)
+
+    calls = []
+    cancelled = asyncio.Event()
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "slow"
+        return "fast"
+
+    result = await asyncio.wait_for(policy.run(call, key="m"), timeout=1)
+    await asyncio.sleep(0)
+
+    assert result == "fast"
+    assert cancelled.is_set()
+    assert policy.snapshot()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges():
+    policy = HedgingPolicy(budget_ratio=0.0, min_delay_s=0.001, min_samples=1)
+    policy.sketch("m").add(0.001)
+
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    assert await policy.run(call, key="m") == "ok"
+    assert len(calls) == 1
+    assert policy.snapshot()["budget_denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_needs_a_free_capacity_unit_and_sketch_tracks_the_primary():
+    from services.admission import ResourceBudget
+
+    capacity = ResourceBudget("openai_calls", capacity=2, max_queue=10, retry_after_s=1)
+    policy = HedgingPolicy(budget_ratio=1.0, min_delay_s=0.01, min_samples=1, capacity=capacity)
+    policy.sketch("m").add(0.01)
+
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.2 if len(calls) == 1 else 0.0)
+        return len(calls)
+
+    # The primary's own unit plus another caller's: no room for a hedge
+    capacity.in_use = 2
+    assert await policy.run(call, key="m") == 1
+    assert len(calls) == 1 and policy.snapshot()["capacity_denied"] == 1
+
+    # One unit free: the hedge takes it and returns it once done
+    capacity.in_use = 1
+    calls.clear()
+    assert await policy.run(call, key="m") == 2
+    await asyncio.sleep(0)
+    assert capacity.in_use == 1
+    assert policy.snapshot()["hedge_wins"] == 1
+    # The primary's elapsed time (not the fast hedge) was recorded
+    assert policy.sketch("m").quantile(0.0) >= 0.009
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from config import Settings
+from models import ModelTier, RoutingFeatures
+from services.contract_analyzer import ContractAnalyzer
+from services.model_router import ModelRouter
+
+NDA = (
+    "# Mutual Non-Disclosure Agreement\n\n"
+    "This Agreement is made between Acme Inc. and Globex LLC on January 5, 2024.\n\n"
+    "Each party shall keep the other party's information confidential."
+)
+
+
+def _settings(**overrides):
+    return Settings(openai_api_key="test", model_routing_enabled=True, **overrides)
+
+
+def test_route_by_features():
+    router = ModelRouter(_settings())
+
+    short_nda = RoutingFeatures(token_estimate=500, section_count=10, contract_type="NDA")
+    long_nda = RoutingFeatures(token_estimate=9000, section_count=10, contract_type="NDA")
+    risky = RoutingFeatures(token_estimate=500, section_count=10, contract_type="NDA",
+                            risk_signal_count=4)
+    msa = RoutingFeatures(token_estimate=500, section_count=10, contract_type="MSA")
+
+    assert router.route(short_nda).tier == ModelTier.SMALL
+    assert router.route(long_nda).reason == "long_document"
+    assert router.route(risky).reason == "high_risk_signals"
+    assert router.route(msa).model == "gpt-4o"
+
+
+@pytest.mark.asyncio
+async def test_small_model_falls_back_to_large_on_invalid_output(monkeypatch):
+    analyzer = ContractAnalyzer(_settings())
+    models = []
+
+    async def fake_call(messages, route=None):
+        models.append(route.model)
+        if route.tier == ModelTier.SMALL:
+            return "not json at all"
+        return json.dumps({"contract_type": "NDA", "parties": None, "key_dates": None,
+                           "key_terms": [], "risk_level": "Low", "summary": "ok"})
+
+    monkeypatch.setattr(analyzer, "_call_openai", fake_call)
+
+    res = await analyzer.analyze(NDA)
+
+    assert models == ["gpt-4o-mini", "gpt-4o"]
+    assert res.parties == ["Acme Inc.", "Globex LLC"]
+    assert analyzer.router.snapshot()["decisions"]["validation_fallback"] == 1
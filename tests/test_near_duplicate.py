@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from config import Settings
+from models import ContractAnalysis
+from services.contract_analyzer import ContractAnalyzer
+from services.near_duplicate import NearDuplicateIndex
+
+TEMPLATE = "\n\n".join(
+    [
+        "# Master Services Agreement",
+        "This Agreement is entered into by and between {customer} and Acme Inc.",
+    ]
+    + [
+        f"{i}. Clause {i}. The Supplier shall perform the services described in "
+        f"schedule {i} with reasonable skill and care, and the Customer shall pay "
+        f"the fees set out in the order form within thirty days of invoice."
+        for i in range(1, 40)
+    ]
+)
+
+ANALYSIS = ContractAnalysis(
+    contract_type="MSA", parties=["Globex LLC", "Acme Inc."], key_dates=[],
+    key_terms=["Net 30"], risk_level="Low", summary="Standard MSA",
+)
+
+
+def test_index_finds_template_variant_and_diffs_sections(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "lsh.sqlite3"))
+    index.add(TEMPLATE.format(customer="Globex LLC"), ANALYSIS, "u-1", "v1")
+
+    match = index.find(TEMPLATE.format(customer="Initech Corp."), 0.8, "u-1", "v1")
+
+    assert match is not None
+    assert match.similarity >= 0.9
+    assert match.analysis == ANALYSIS
+    assert match.changed_sections == [
+        "This Agreement is entered into by and between Initech Corp. and Acme Inc."
+    ]
+    assert index.find("An entirely unrelated lease for office space.", 0.8, "u-1", "v1") is None
+
+
+def test_index_never_matches_another_tenants_documents(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "lsh.sqlite3"))
+    text = TEMPLATE.format(customer="Globex LLC")
+    index.add(text, ANALYSIS, "u-1", "v1")
+
+    assert index.find(text, 0.8, "u-2", "v1") is None
+    assert index.find(text, 0.8, "u-1", "v1").similarity == 1.0
+
+
+def test_index_only_matches_documents_of_the_current_fingerprint(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "lsh.sqlite3"))
+    text = TEMPLATE.format(customer="Globex LLC")
+    index.add(text, ANALYSIS, "u-1", "v1-old")
+
+    assert index.find(text, 0.8, "u-1", "v1-new") is None
+    index.add(text, ANALYSIS, "u-1", "v1-new")
+    assert index.find(text, 0.8, "u-1", "v1-new") is not None
+    assert index.find(text, 0.8, "u-1", "v1-old") is None
+
+
+@pytest.mark.asyncio
+async def test_analyzer_sends_only_changed_sections(tmp_path, monkeypatch):
+    analyzer = ContractAnalyzer(Settings(
+        openai_api_key="test",
+        near_duplicate_enabled=True,
+        near_duplicate_index_path=str(tmp_path / "lsh.sqlite3"),
+        near_duplicate_reuse_threshold=1.0,
+    ))
+    template = TEMPLATE.format(customer="Globex LLC")
+    analyzer.near_duplicates.add(template, ANALYSIS, "u-1", analyzer.fingerprint)
+    prompts = []
+
+    async def fake_call(messages, route=None):
+        prompts.append(messages[-1]["content"])
+        return json.dumps({**ANALYSIS.model_dump(), "parties": ["Initech Corp.", "Acme Inc."]})
+
+    monkeypatch.setattr(analyzer, "_call_openai", fake_call)
+
+    text = TEMPLATE.format(customer="Initech Corp.")
+    assert await analyzer.find_near_duplicate(text) is None
+    assert await analyzer.find_near_duplicate(text, "u-2") is None
+    match = await analyzer.find_near_duplicate(text, "u-1")
+    res = await analyzer.analyze(text, near_duplicate=match, user_id="u-1")
+
+    assert res.parties == ["Initech Corp.", "Acme Inc."]
+    assert "CHANGED SECTIONS" in prompts[0]
+    assert "Clause 12" not in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_reused_analysis_takes_parties_from_the_new_text(tmp_path, monkeypatch):
+    analyzer = ContractAnalyzer(Settings(
+        openai_api_key="test",
+        near_duplicate_enabled=True,
+        near_duplicate_index_path=str(tmp_path / "lsh.sqlite3"),
+        near_duplicate_reuse_threshold=0.8,
+    ))
+    template = TEMPLATE.format(customer="Globex LLC")
+    analyzer.near_duplicates.add(template, ANALYSIS, "u-1", analyzer.fingerprint)
+
+    async def fail_call(messages, route=None):
+        raise AssertionError("reused match must not call the model")
+
+    monkeypatch.setattr(analyzer, "_call_openai", fail_call)
+
+    text = TEMPLATE.format(customer="Initech Corp.")
+    # An exact match analyzed by an older prompt or model is never reused
+    stale = ANALYSIS.model_copy(update={"summary": "Produced by an older prompt"})
+    analyzer.near_duplicates.add(text, stale, "u-1", "v0-stale")
+
+    match = await analyzer.find_near_duplicate(text, "u-1")
+    res = await analyzer.analyze(text, near_duplicate=match, user_id="u-1")
+
+    assert match.reused
+    assert res.parties == analyzer.rule_extractor.extract(text).parties
+    assert "Globex LLC" not in res.parties
+    assert res.summary == ANALYSIS.summary
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from config import Settings
+from exceptions import DocumentProcessingError
+from services import document_processor
+from services.document_processor import ContractProcessor, page_ranges
+
+
+def _processor(monkeypatch, total_pages, convert):
+    monkeypatch.setattr(document_processor, "DocumentConverter", lambda: object())
+    monkeypatch.setattr(document_processor, "_pdf_page_count", lambda path: total_pages)
+    monkeypatch.setattr(document_processor, "_convert_page_range", convert)
+    processor = ContractProcessor(Settings(
+        openai_api_key="test", parallel_pdf_enabled=True, parallel_pdf_min_pages=40,
+        parallel_pdf_chunk_pages=20,
+    ))
+    processor._pool = ThreadPoolExecutor(max_workers=4)
+    return processor
+
+
+def test_page_ranges_cover_document():
+    assert page_ranges(45, 20) == [(1, 20), (21, 40), (41, 45)]
+    assert page_ranges(5, 20) == [(1, 5)]
+
+
+@pytest.mark.asyncio
+async def test_large_pdf_is_converted_in_ranges_and_stitched_in_order(monkeypatch, tmp_path):
+    import time
+
+    def convert(path, start, end, pipeline):
+        # Earlier ranges finish last to prove results are re-ordered
+        time.sleep((100 - start) / 2000)
+        return start, f"pages {start}-{end}", end - start + 1
+
+    pdf = tmp_path / "bundle.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    processor = _processor(monkeypatch, 45, convert)
+
+    out = await processor.process(str(pdf))
+
+    assert out["text"] == "pages 1-20\n\npages 21-40\n\npages 41-45"
+    assert out["metadata"]["pages"] == 45
+    processor.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_range_raises_processing_error(monkeypatch, tmp_path):
+    def convert(path, start, end, pipeline):
+        if start == 21:
+            raise RuntimeError("corrupt page")
+        return start, "ok", end - start + 1
+
+    pdf = tmp_path / "bundle.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    processor = _processor(monkeypatch, 60, convert)
+
+    with pytest.raises(DocumentProcessingError) as exc:
+        await processor.process(str(pdf))
+
+    assert exc.value.details["failed_ranges"] == ["21-40"]
+    processor.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_sections_yields_ranges_in_page_order(monkeypatch, tmp_path):
+    def convert(path, start, end, pipeline):
+        return start, f"pages {start}-{end}", end - start + 1
+
+    pdf = tmp_path / "bundle.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    processor = _processor(monkeypatch, 45, convert)
+
+    sections = [s async for s in processor.stream_sections(str(pdf))]
+
+    assert [(s.start_page, s.end_page) for s in sections] == [(1, 20), (21, 40), (41, 45)]
+    assert all(s.total_pages == 45 for s in sections)
+    processor.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_sections_splits_in_process_under_default_settings(monkeypatch, tmp_path):
+    class Converter:
+        def convert(self, path, page_range):
+            start, end = page_range
+            document = SimpleNamespace(
+                export_to_markdown=lambda: f"pages {start}-{end}", pages=range(start, end + 1))
+            return SimpleNamespace(document=document)
+
+    monkeypatch.setattr(document_processor, "DocumentConverter", Converter)
+    monkeypatch.setattr(document_processor, "_pdf_page_count", lambda path: 45)
+    pdf = tmp_path / "bundle.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    processor = ContractProcessor(Settings(openai_api_key="test"))
+
+    sections = [s async for s in processor.stream_sections(str(pdf))]
+
+    assert [(s.start_page, s.end_page) for s in sections] == [(1, 20), (21, 40), (41, 45)]
+    assert [s.text for s in sections] == ["pages 1-20", "pages 21-40", "pages 41-45"]
+    # No worker pool was started
+    assert processor._pool is None
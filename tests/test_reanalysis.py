@@ -0,0 +1,156 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from config import Settings
+from models import ContractAnalysis, Priority
+from routers.contracts import reanalyze_contract
+from services.contract_analyzer import ContractAnalyzer
+from services.reanalysis import ReanalysisJob
+from services.scheduler import current_priority
+
+ANALYSIS = ContractAnalysis(contract_type="NDA", parties=["Acme Inc."], key_dates=[],
+                            key_terms=["Confidentiality"], risk_level="Low", summary="Mutual NDA")
+
+
+def _settings(tmp_path, **overrides) -> Settings:
+    return Settings(
+        openai_api_key="test",
+        near_duplicate_enabled=False,
+        reanalysis_batch_size=2,
+        reanalysis_checkpoint_path=str(tmp_path / "reanalysis.json"),
+        **overrides,
+    )
+
+
+def test_fingerprint_tracks_prompt_model_and_settings(tmp_path, monkeypatch):
+    base = ContractAnalyzer(_settings(tmp_path))
+
+    assert base.fingerprint == ContractAnalyzer(_settings(tmp_path)).fingerprint
+    assert base.fingerprint != ContractAnalyzer(_settings(tmp_path, openai_model="gpt-4o")).fingerprint
+    assert base.fingerprint != ContractAnalyzer(_settings(tmp_path, openai_temperature=0.2)).fingerprint
+
+    original = ContractAnalyzer._build_messages
+    monkeypatch.setattr(ContractAnalyzer, "_build_messages",
+                        lambda self, text, rules=None: original(self, text + "\nCite clauses.", rules))
+    assert ContractAnalyzer(_settings(tmp_path)).fingerprint != base.fingerprint
+
+
+class FakeDb:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = {}
+
+    async def list_stale_contracts(self, fingerprint, after_id=None, limit=100):
+        stale = [row for row in self.rows
+                 if self.updates.get(row["id"]) != fingerprint and (after_id is None or row["id"] > after_id)]
+        return stale[:limit]
+
+    async def update_analysis(self, record_id, analysis, analyzer_fingerprint=None):
+        self.updates[record_id] = analyzer_fingerprint
+
+
+class FakeStore:
+    def __init__(self, texts):
+        self.texts = texts
+
+    async def get(self, key):
+        return self.texts.get(key)
+
+
+@pytest.mark.asyncio
+async def test_job_refreshes_stale_records_and_resumes(tmp_path):
+    settings = _settings(tmp_path)
+    analyzer = ContractAnalyzer(settings)
+    rows = [{"id": f"c-{i}", "text_key": f"k-{i}"} for i in range(5)]
+    store = FakeStore({f"k-{i}": f"contract {i}" for i in range(5) if i != 3})
+    db = FakeDb(rows)
+    priorities = []
+
+    async def analyze(text):
+        priorities.append(current_priority.get())
+        if text == "contract 4":
+            raise RuntimeError("model timeout")
+        return ANALYSIS
+
+    analyzer.analyze = analyze
+
+    first = await ReanalysisJob(db, analyzer, store, settings).run(max_records=2)
+    assert (first.scanned, first.analyzed, first.after_id, first.finished) == (2, 2, "c-1", False)
+
+    # A new run resumes after the checkpoint instead of starting over
+    report = await ReanalysisJob(db, analyzer, store, settings).run()
+    assert report.finished
+    assert (report.scanned, report.analyzed, report.missing_text, report.failed) == (5, 3, 1, 1)
+    assert db.updates == {f"c-{i}": analyzer.fingerprint for i in (0, 1, 2)}
+    assert len(priorities) == 4 and set(priorities) == {Priority.BULK}
+
+    # Once finished, the next run starts over and retries what is still stale
+    retry = await ReanalysisJob(db, analyzer, store, settings).run()
+    assert (retry.scanned, retry.failed, retry.missing_text) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_reanalyze_endpoint_hides_other_users_contracts():
+    class FakeDb:
+        async def get_contract(self, record_id, columns):
+            assert "user_id" in columns
+            return {"filename": "a.pdf", "text_key": "k-1", "user_id": "u-1"}
+
+    class FailingStore:
+        async def get(self, key):
+            raise AssertionError("text of another user's contract must not be read")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await reanalyze_contract(
+            "c-1", db=FakeDb(), text_store=FailingStore(), analyzer=None, search=None,
+            tenant=None, user=SimpleNamespace(id="u-2"))
+    assert exc_info.value.status_code == 404
+
+
+def test_reanalyze_rejects_ids_that_are_not_uuids():
+    from fastapi.testclient import TestClient
+
+    import main
+    from dependencies import get_analyzer
+    from routers.contracts import require_db, require_user
+
+    class FakeDb:
+        async def get_contract(self, record_id, columns):
+            raise AssertionError("a malformed id must not reach the database")
+
+    main.app.dependency_overrides[require_db] = FakeDb
+    main.app.dependency_overrides[require_user] = lambda: SimpleNamespace(id="u-1")
+    main.app.dependency_overrides[get_analyzer] = lambda: None
+    try:
+        response = TestClient(main.app).post("/api/v1/contracts/not-a-uuid/reanalyze")
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_job_refreshes_the_search_index(tmp_path):
+    from services.search import SqliteSearchIndex
+
+    settings = _settings(tmp_path)
+    analyzer = ContractAnalyzer(settings)
+    rows = [{"id": "c-0", "text_key": "k-0", "user_id": "u-1", "filename": "nda.pdf"}]
+    index = SqliteSearchIndex(str(tmp_path / "search.sqlite3"))
+    try:
+        await index.index("c-0", "u-1", {"filename": "nda.pdf"},
+                          {"summary": "Draft services agreement"}, "contract 0")
+
+        async def analyze(text):
+            return ANALYSIS
+
+        analyzer.analyze = analyze
+        await ReanalysisJob(
+            FakeDb(rows), analyzer, FakeStore({"k-0": "contract 0"}), settings, search=index).run()
+
+        assert [hit.id for hit in await index.search("mutual nda", "u-1")] == ["c-0"]
+        assert await index.search("draft", "u-1") == []
+    finally:
+        index.close()
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from config import Settings
+from services.retention import RetentionService
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+class FakeClient:
+    """RPCs over in-memory contracts: (id, user_id, created_at, text_key)."""
+
+    def __init__(self, contracts, policies):
+        self.contracts = contracts
+        self.policies = policies
+        self.calls = []
+
+    def _result(self, data):
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+    def _expired(self, params):
+        rows = [c for c in self.contracts if c[1] == params["p_user_id"] and c[2] < params["p_cutoff"]]
+        return sorted(rows, key=lambda c: c[2])
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        if name == "retention_policies":
+            return self._result(self.policies)
+        if name == "retention_preview":
+            rows = self._expired(params)
+            return self._result([
+                {"table_name": "contracts", "row_count": len(rows), "bytes": 100 * len(rows),
+                 "text_keys": len({c[3] for c in rows})},
+                {"table_name": "usage_tracking", "row_count": 0, "bytes": 0, "text_keys": 0},
+            ])
+        if name == "purge_expired_contracts":
+            batch = self._expired(params)[:params["p_limit"]]
+            self.contracts = [c for c in self.contracts if c not in batch]
+            return self._result([{"deleted": len(batch), "bytes": 100 * len(batch),
+                                  "text_keys": sorted({c[3] for c in batch})}])
+        if name == "purge_expired_usage":
+            return self._result([{"deleted": 0, "bytes": 0}])
+        if name == "drop_partitions_before":
+            return self._result([{"partition_name": "contracts_p202401", "bytes": 8192}])
+        return self._result([])
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def select(self, columns):
+                return self
+
+            def in_(self, column, values):
+                self.values = values
+                return self
+
+            def execute(self):
+                return SimpleNamespace(data=[{"text_key": c[3]} for c in client.contracts if c[3] in self.values])
+
+        return Query()
+
+
+class FakeStore:
+    def __init__(self, keys):
+        self.keys = set(keys)
+
+    async def delete(self, key, written_before=None):
+        if key not in self.keys:
+            return 0
+        self.keys.discard(key)
+        return 10
+
+
+def _settings(**overrides) -> Settings:
+    overrides.setdefault("retention_partitioned_tables", [])
+    return Settings(openai_api_key="test", retention_batch_size=2, retention_rows_per_second=0, **overrides)
+
+
+def _fixture():
+    contracts = [
+        ("c-1", "u-1", "2025-01-01", "k-shared"),
+        ("c-2", "u-1", "2025-01-02", "k-1"),
+        ("c-3", "u-1", "2025-01-03", "k-1"),
+        ("c-4", "u-1", "2025-05-30", "k-new"),
+        ("c-5", None, "2025-04-01", "k-anon"),
+        ("c-6", "u-2", "2025-01-01", "k-shared"),  # pro plan: kept
+    ]
+    policies = [
+        {"user_id": "u-1", "retention_days": 30},
+        {"user_id": "u-2", "retention_days": 365},
+        {"user_id": None, "retention_days": 30},
+    ]
+    return FakeClient(contracts, policies)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_without_deleting():
+    client = _fixture()
+    store = FakeStore(["k-shared", "k-1", "k-anon"])
+
+    report = await RetentionService(client, store, _settings()).run(dry_run=True, now=NOW)
+
+    assert report.dry_run and report.tenants == 3
+    assert (report.contract_rows, report.contract_bytes) == (4, 400)
+    assert len(client.contracts) == 6 and len(store.keys) == 3
+    assert not any(name.startswith("purge") for name, _ in client.calls)
+
+
+@pytest.mark.asyncio
+async def test_execute_purges_in_batches_and_keeps_shared_text():
+    client = _fixture()
+    store = FakeStore(["k-shared", "k-1", "k-new", "k-anon"])
+
+    report = await RetentionService(client, store, _settings()).run(dry_run=False, now=NOW)
+
+    assert [c[0] for c in client.contracts] == ["c-4", "c-6"]
+    assert (report.contract_rows, report.contract_bytes) == (4, 400)
+    # k-shared is still referenced by another tenant's contract
+    assert store.keys == {"k-shared", "k-new"}
+    assert (report.text_blobs, report.text_bytes) == (2, 20)
+
+    purges = [params for name, params in client.calls if name == "purge_expired_contracts"]
+    assert all(params["p_limit"] == 2 for params in purges)
+    assert not any(name == "purge_expired_usage" and params["p_user_id"] is None
+                   for name, params in client.calls)
+
+
+@pytest.mark.asyncio
+async def test_partitions_dropped_at_longest_retention_before_batches():
+    client = _fixture()
+
+    report = await RetentionService(
+        client, None, _settings(retention_partitioned_tables=["contracts"])).run(dry_run=False, now=NOW)
+
+    names = [name for name, _ in client.calls]
+    assert names.index("ensure_monthly_partitions") < names.index("drop_partitions_before")
+    assert names.index("drop_partitions_before") < names.index("purge_expired_contracts")
+    assert dict(client.calls)["ensure_monthly_partitions"]["p_from"] == "2025-06-01"
+    drop = dict(client.calls)["drop_partitions_before"]
+    assert drop["p_before"].startswith("2024-06-01") and drop["p_dry_run"] is False
+    assert "compact_contract_rollups" in names
+    assert report.partitions_dropped == ["contracts_p202401"] and report.partition_bytes == 8192
+
+
+@pytest.mark.asyncio
+async def test_retention_past_datetime_range_keeps_data_forever():
+    client = _fixture()
+    client.contracts.append(("c-7", "u-3", "2001-01-01", "k-ent"))
+    client.policies.append({"user_id": "u-3", "retention_days": 999999})  # enterprise
+    store = FakeStore(["k-shared", "k-1", "k-anon", "k-ent"])
+
+    report = await RetentionService(
+        client, store, _settings(retention_partitioned_tables=["contracts"])).run(dry_run=False, now=NOW)
+
+    assert report.tenants == 3
+    assert [c[0] for c in client.contracts] == ["c-4", "c-6", "c-7"]
+    assert "k-ent" in store.keys
+    assert not any(params.get("p_user_id") == "u-3" for _, params in client.calls)
+    # Partitions hold every tenant's rows, so none are dropped
+    assert "drop_partitions_before" not in [name for name, _ in client.calls]
+    assert report.partitions_dropped == []
+
+
+@pytest.mark.asyncio
+async def test_text_reused_during_the_run_is_kept(tmp_path):
+    # An upload re-uses k-1 after the reference check saw it unreferenced
+    # and before the blob is deleted: it must survive for the new contract
+    pytest.importorskip("zstandard")
+    from services.text_store import LocalTextStore
+
+    client = _fixture()
+    store = LocalTextStore(str(tmp_path))
+    for key in ("k-1", "k-anon"):
+        await store.put(key, "extracted text")
+        path = store._path(key)
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    service = RetentionService(client, store, _settings())
+    unreferenced = service._unreferenced
+
+    def reference_check(keys):
+        result = unreferenced(keys)
+        if "k-1" in result:
+            asyncio.run(store.put("k-1", "extracted text"))
+            client.contracts.append(("c-8", "u-1", "2025-06-01", "k-1"))
+        return result
+
+    service._unreferenced = reference_check
+    await service.run(dry_run=False, now=NOW)
+
+    assert await store.get("k-1") == "extracted text"
+    assert await store.get("k-anon") is None
@@ -0,0 +1,45 @@
+import pytest
+
+from config import Settings
+from models import AnalysisMode
+from services.contract_analyzer import ContractAnalyzer
+from services.rule_extractor import RuleExtractor
+
+SAMPLE = """MUTUAL NON-DISCLOSURE AGREEMENT
+
+This Agreement is made on the 3rd day of March, 2023 by and between Initech Holdings, Inc.,
+a Texas corporation ("Initech") and Hooli Limited ("Hooli").
+
+Hooli shall pay USD 2,500,000 by 12/31/2023. The term begins 2023-04-01 and shall
+automatically renew. Each party shall indemnify the other.
+
+This Agreement is governed by the laws of the State of California.
+"""
+
+
+def test_extract_preamble_fields():
+    rules = RuleExtractor().extract(SAMPLE)
+
+    assert rules.contract_type == "NDA"
+    assert rules.parties[:2] == ["Initech Holdings, Inc.", "Hooli Limited"]
+    assert rules.key_dates == ["2023-03-03", "2023-12-31", "2023-04-01"]
+    assert rules.amounts == ["USD 2,500,000"]
+    assert rules.governing_law == "California"
+    assert rules.risk_signals == ["indemnification", "auto_renewal"]
+
+
+@pytest.mark.asyncio
+async def test_rules_only_mode_skips_openai(monkeypatch):
+    analyzer = ContractAnalyzer(Settings(openai_api_key="test"))
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("OpenAI must not be called in rules_only mode")
+
+    monkeypatch.setattr(analyzer, "_call_openai", fail)
+
+    res = await analyzer.analyze(SAMPLE, mode=AnalysisMode.RULES_ONLY)
+
+    assert res.contract_type == "NDA"
+    assert "Hooli Limited" in res.parties
+    assert res.risk_level == "Medium"
+    assert "Governing law: California" in res.key_terms
@@ -0,0 +1,148 @@
+import pytest
+
+from services.search import SqliteSearchIndex, to_fts5_query
+
+CONTRACTS = [
+    ("c-1", {"contract_type": "MSA", "risk_level": "High",
+             "summary": "Master services agreement with uncapped liability",
+             "key_terms": ["Auto-renewal", "Net 60"], "parties": ["Acme Inc."]},
+     "This Agreement renews automatically for successive one-year terms."),
+    ("c-2", {"contract_type": "NDA", "risk_level": "Low",
+             "summary": "Mutual NDA", "key_terms": ["Confidentiality"], "parties": ["Globex LLC"]},
+     "Either party may terminate on notice. Liability is capped at fees paid."),
+    ("c-3", {"contract_type": "MSA", "risk_level": "Medium",
+             "summary": "Services agreement", "key_terms": ["Auto-renewal"], "parties": ["Initech"]},
+     "Liability of the Supplier shall be unlimited for breach of confidentiality."),
+]
+
+
+def test_query_translation():
+    assert to_fts5_query("auto-renewal and uncapped liability") == \
+        '"auto renewal" AND "uncapped" AND "liability"'
+    assert to_fts5_query('"net 60" or net-30 -nda') == '("net 60" OR "net 30") NOT "nda"'
+    assert to_fts5_query("( ) * - and") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_index_ranks_highlights_and_reindexes(tmp_path):
+    index = SqliteSearchIndex(str(tmp_path / "search.sqlite3"))
+    try:
+        for record_id, analysis, text in CONTRACTS:
+            await index.index(record_id, "u-1", {"filename": f"{record_id}.pdf"}, analysis, text)
+        for n in range(6):
+            await index.index(f"filler-{n}", "u-1", {}, {"summary": "Purchase order"}, "Goods delivered FOB.")
+
+        hits = await index.search("auto-renewal liability", "u-1")
+        # Summary matches outrank matches in the extracted text
+        assert [hit.id for hit in hits] == ["c-1", "c-3"]
+        assert hits[0].rank > hits[1].rank
+        assert any("<mark>" in fragment for fragment in hits[0].highlights)
+
+        assert [hit.id for hit in await index.search("liability", "u-1", risk_level="Low")] == ["c-2"]
+        assert await index.search("liability -capped -unlimited -uncapped", "u-1") == []
+
+        # Re-indexing a record replaces its previous entry
+        await index.index_contract("c-2", "u-1", {"filename": "c-2.pdf"},
+                                   {**CONTRACTS[1][1], "summary": "Amended NDA"}, "")
+        assert await index.search("capped", "u-1") == []
+        assert [hit.summary for hit in await index.search("amended", "u-1")] == ["Amended NDA"]
+    finally:
+        index.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_index_only_returns_the_callers_contracts(tmp_path):
+    index = SqliteSearchIndex(str(tmp_path / "search.sqlite3"))
+    try:
+        record_id, analysis, text = CONTRACTS[0]
+        await index.index(record_id, "u-1", {}, analysis, text)
+        await index.index("c-9", "u-2", {}, analysis, text)
+        await index.index_contract("c-anon", None, {}, analysis, text)
+
+        assert [hit.id for hit in await index.search("liability", "u-1")] == ["c-1"]
+        assert [hit.id for hit in await index.search("liability", "u-2")] == ["c-9"]
+        assert await index.search("liability", "u-3") == []
+    finally:
+        index.close()
+
+
+def test_search_without_supabase_serves_the_local_tenant(tmp_path, monkeypatch):
+    # No Supabase: no users, every caller is the single local tenant, so
+    # what /analyze indexes is what /contracts/search finds
+    from types import SimpleNamespace
+
+    from fastapi.testclient import TestClient
+
+    import dependencies
+    import main
+    from config import Settings
+    from services.contract_analyzer import ContractAnalyzer
+
+    text = "MASTER SERVICES AGREEMENT. This Agreement renews automatically for one-year terms."
+
+    async def process(file_path):
+        return {"text": text, "metadata": processor.build_metadata(file_path, 1)}
+
+    processor = SimpleNamespace(
+        estimate_pages=lambda file_path: 1,
+        process=process,
+        build_metadata=lambda file_path, pages, pipeline=None: {
+            "filename": "msa.txt", "pages": pages, "file_size": len(text),
+            "content_type": "text/plain", "pipeline": "default"},
+    )
+    index = SqliteSearchIndex(str(tmp_path / "search.sqlite3"))
+    for name, value in {
+        "_processor": processor,
+        "_analyzer": ContractAnalyzer(Settings(openai_api_key="test")),
+        "_db": None, "_auth_service": None, "_admission": None, "_scheduler": None,
+        "_text_store": None, "_search": index,
+    }.items():
+        monkeypatch.setattr(dependencies, name, value)
+
+    try:
+        client = TestClient(main.app)
+        analyzed = client.post(
+            "/api/v1/analyze", params={"mode": "rules_only"},
+            files={"file": ("msa.txt", text.encode(), "text/plain")})
+        assert analyzed.status_code == 200
+
+        found = client.get("/api/v1/contracts/search", params={"q": "renews automatically"})
+        assert found.status_code == 200
+        assert [hit["id"] for hit in found.json()["hits"]] == [analyzed.json()["request_id"]]
+    finally:
+        index.close()
+
+
+@pytest.mark.asyncio
+async def test_postgres_body_is_indexed_by_the_insert(monkeypatch):
+    # One statement per analysis: the insert RPC carries the text and the
+    # search index has nothing left to write
+    from types import SimpleNamespace
+
+    import services.database as db_mod
+    from services.search import PostgresSearchIndex
+
+    calls = []
+
+    class FakeClient:
+        def rpc(self, name, params):
+            calls.append((name, params))
+            return SimpleNamespace(execute=lambda: SimpleNamespace(
+                data=[{"id": "c-1", "created_at": "2025-01-01T00:00:00Z"}], error=None))
+
+        def table(self, name):
+            return SimpleNamespace(insert=None)
+
+    monkeypatch.setattr(db_mod, "create_client", lambda url, key: FakeClient())
+    db = db_mod.SupabaseService(url="https://x", key="secret")
+    index = PostgresSearchIndex(db.client, max_body_chars=5)
+
+    record = await db.insert_contract(
+        {"filename": "a.pdf"}, {"summary": "ok"}, user_id="u-1",
+        body_text=index.row_body("renews automatically"))
+    await index.index_contract(record["id"], "u-1", {}, {}, "renews automatically")
+
+    assert record["id"] == "c-1" and record["filename"] == "a.pdf"
+    assert [name for name, _ in calls] == ["insert_contract"]
+    assert calls[0][1]["p_body"] == "renew"
+    assert calls[0][1]["p_row"]["user_id"] == "u-1"
@@ -0,0 +1,124 @@
+import os
+import sys
+
+import pytest
+
+import dependencies
+import serve
+from config import Settings
+from serve import memory_report, parse_smaps_rollup
+from services.document_processor import ContractProcessor
+
+SMAPS_ROLLUP = """\
+55d0c2a4f000-7ffc8a1f2000 ---p 00000000 00:00 0                          [rollup]
+Rss:              819200 kB
+Pss:              307200 kB
+Pss_Anon:         102400 kB
+Shared_Clean:     614400 kB
+Shared_Dirty:       2048 kB
+Private_Clean:     10240 kB
+Private_Dirty:    192512 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup():
+    fields = parse_smaps_rollup(SMAPS_ROLLUP)
+
+    assert fields["Rss"] == 819200
+    assert fields["Pss"] == 307200
+    assert "Pss_Anon" not in fields
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc")
+def test_memory_report_for_live_process():
+    report = memory_report([os.getpid(), 2 ** 22 + 12345])
+
+    assert [w["pid"] for w in report["workers"]] == [os.getpid()]
+    worker = report["workers"][0]
+    assert worker["rss_mb"] >= worker["pss_mb"] > 0
+    assert worker["saved_mb"] == pytest.approx(worker["rss_mb"] - worker["pss_mb"], abs=0.11)
+
+
+def test_workers_reuse_preloaded_processor_without_page_range_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(ContractProcessor, "warm_up", lambda self: setattr(self, "ready", True))
+    monkeypatch.setattr(serve.gc, "freeze", lambda: None)
+    settings = Settings(
+        openai_api_key="test", parallel_pdf_enabled=True, search_enabled=False,
+        text_store_path=str(tmp_path / "texts"),
+    )
+
+    serve.preload(settings)
+    preloaded = dependencies._preloaded_processor
+    try:
+        # What each forked worker runs at startup
+        dependencies.initialize_services(settings)
+
+        assert dependencies.get_processor() is preloaded
+        assert preloaded.ready
+        assert preloaded.settings.parallel_pdf_enabled is False
+        assert settings.parallel_pdf_enabled is True
+    finally:
+        dependencies.shutdown_services()
+        dependencies.set_preloaded_processor(None)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_worker_converts_with_models_loaded_single_threaded(tmp_path, monkeypatch):
+    import asyncio
+    import json
+    from types import SimpleNamespace
+
+    from services import document_processor
+
+    torch_threads = {"count": 8}
+    torch = SimpleNamespace(
+        get_num_threads=lambda: torch_threads["count"],
+        set_num_threads=lambda count: torch_threads.update(count=count),
+    )
+
+    class Converter:
+        def __init__(self):
+            # Models load while the master is single-threaded
+            self.loaded_with_threads = torch_threads["count"]
+
+        def convert(self, path, page_range=None):
+            text = f"converted with {torch_threads['count']} threads"
+            return SimpleNamespace(document=SimpleNamespace(
+                export_to_markdown=lambda: text, pages=[1]))
+
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setattr(document_processor, "DocumentConverter", Converter)
+    monkeypatch.setattr(serve.gc, "freeze", lambda: None)
+    settings = Settings(openai_api_key="test", search_enabled=False, pdf_pipeline_auto=False)
+    contract = tmp_path / "contract.txt"
+    contract.write_text("This Agreement renews automatically.")
+
+    serve.preload(settings)
+    processor = dependencies._preloaded_processor
+    try:
+        assert processor.ready and processor.converter.loaded_with_threads == 1
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.close(read_fd)
+                serve._prepare_worker()
+                processed = asyncio.run(processor.process(str(contract)))
+                os.write(write_fd, json.dumps(processed["text"]).encode())
+                code = 0
+            finally:
+                os._exit(code)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            output = pipe.read()
+        _, status = os.waitpid(pid, 0)
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert json.loads(output) == "converted with 8 threads"
+    finally:
+        dependencies.set_preloaded_processor(None)
+        serve._worker_torch_threads = None
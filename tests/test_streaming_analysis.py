@@ -0,0 +1,53 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from config import Settings
+from models import DocumentSection
+from services import contract_analyzer
+from services.contract_analyzer import ContractAnalyzer
+
+ANALYSIS_JSON = json.dumps({
+    "contract_type": "MSA",
+    "parties": ["Acme Inc.", "Globex LLC"],
+    "key_dates": ["January 5, 2024"],
+    "key_terms": ["Net 30"],
+    "risk_level": "Low",
+    "summary": "Services agreement",
+})
+
+
+@pytest.mark.asyncio
+async def test_model_call_starts_before_extraction_finishes(monkeypatch):
+    yielded = []
+    calls = []
+
+    async def fake_create(client, **kwargs):
+        calls.append(len(yielded))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=ANALYSIS_JSON))],
+            usage=None,
+        )
+
+    async def sections():
+        for page in range(1, 6):
+            await asyncio.sleep(0.01)
+            text = f"Page {page}. " + "The Supplier shall perform the services. " * 30
+            if page == 5:
+                text += "This Agreement terminates on March 1, 2027."
+            yielded.append(page)
+            yield DocumentSection(start_page=page, end_page=page, total_pages=5, text=text)
+
+    monkeypatch.setattr(contract_analyzer, "_chat_create", fake_create)
+    analyzer = ContractAnalyzer(Settings(openai_api_key="test", max_contract_chars=2000))
+
+    result = await analyzer.analyze_stream(sections())
+
+    assert calls and calls[0] < 5
+    assert result.pages == 5
+    assert "Page 5." in result.text
+    assert result.analysis.contract_type == "MSA"
+    # Dates on pages the model never saw are merged from the rule tier
+    assert result.analysis.key_dates == ["January 5, 2024", "2027-03-01"]
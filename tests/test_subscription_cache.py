@@ -0,0 +1,104 @@
+import pytest
+
+from services import subscription_service
+from services.subscription_service import SubscriptionService, subscription_request_scope
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _service(monkeypatch, ttl=60.0, max_entries=10, on_fetch=None):
+    """Service whose database lookups return a fresh object per call."""
+    service = SubscriptionService(db_client=None, cache_ttl_s=ttl, cache_max_entries=max_entries)
+    service.fetches = []
+
+    async def fetch(user_id):
+        service.fetches.append(str(user_id))
+        if on_fetch:
+            on_fetch(service, user_id)
+        return {"user_id": str(user_id), "fetch": len(service.fetches)}
+
+    monkeypatch.setattr(service, "_fetch_user_subscription", fetch)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_cached_until_ttl_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(subscription_service.time, "monotonic", clock)
+    service = _service(monkeypatch)
+
+    first = await service.get_user_subscription("u-1")
+    clock.now += 59
+    assert await service.get_user_subscription("u-1") is first
+    clock.now += 2
+    assert await service.get_user_subscription("u-1") is not first
+    assert service.fetches == ["u-1", "u-1"]
+
+
+@pytest.mark.asyncio
+async def test_misses_are_cached_and_lru_bounded(monkeypatch):
+    service = _service(monkeypatch, max_entries=2)
+
+    async def missing(user_id):
+        service.fetches.append(str(user_id))
+        return None
+
+    monkeypatch.setattr(service, "_fetch_user_subscription", missing)
+
+    for user_id in ("u-1", "u-2", "u-1", "u-3", "u-1", "u-2"):
+        assert await service.get_user_subscription(user_id) is None
+    # u-2 was least recently used when u-3 arrived
+    assert service.fetches == ["u-1", "u-2", "u-3", "u-2"]
+    assert list(service._cache) == ["u-1", "u-2"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_refetches(monkeypatch):
+    service = _service(monkeypatch)
+
+    first = await service.get_user_subscription("u-1")
+    await service.get_user_subscription("u-2")
+    service.invalidate("u-1")
+
+    assert await service.get_user_subscription("u-1") is not first
+    await service.get_user_subscription("u-2")
+    assert service.fetches == ["u-1", "u-2", "u-1"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_raced_by_invalidation_is_not_cached(monkeypatch):
+    # A plan change lands while the lookup is in flight: its result may
+    # predate the change, so it is returned but not cached
+    def change_plan(service, user_id):
+        if len(service.fetches) == 1:
+            service.invalidate(user_id)
+
+    service = _service(monkeypatch, on_fetch=change_plan)
+
+    await service.get_user_subscription("u-1")
+    assert "u-1" not in service._cache
+    await service.get_user_subscription("u-1")
+    await service.get_user_subscription("u-1")
+    assert service.fetches == ["u-1", "u-1"]
+
+
+@pytest.mark.asyncio
+async def test_request_scope_looks_up_once(monkeypatch):
+    service = _service(monkeypatch, ttl=0)
+
+    with subscription_request_scope():
+        first = await service.get_user_subscription("u-1")
+        assert await service.get_user_subscription("u-1") is first
+        service.invalidate("u-1")
+        assert await service.get_user_subscription("u-1") is not first
+    assert service.fetches == ["u-1", "u-1"]
+
+    # Outside a request scope, with the cache disabled, every call reads
+    await service.get_user_subscription("u-1")
+    assert len(service.fetches) == 3
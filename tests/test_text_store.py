@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+pytest.importorskip("zstandard")
+
+from services.text_store import LocalTextStore, S3TextStore, content_key  # noqa: E402
+
+TEXT = "# Master Services Agreement\n\n" + "The Supplier shall provide the Services. " * 200
+
+
+@pytest.mark.asyncio
+async def test_local_store_compresses_and_deduplicates(tmp_path):
+    store = LocalTextStore(str(tmp_path))
+    key = content_key(b"%PDF-1.7 original upload bytes")
+
+    assert await store.get(key) is None
+    assert await store.put(key, TEXT) is True
+    assert await store.put(key, TEXT) is False
+    assert await store.get(key) == TEXT
+
+    path = tmp_path / key[:2] / key[2:4] / f"{key}.md.zst"
+    assert os.path.getsize(path) < len(TEXT) / 10
+    assert await store.store_text(None, TEXT) is None
+
+
+class MissingKey(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = Body
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise MissingKey()
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        if (CopySource["Bucket"], CopySource["Key"]) not in self.objects:
+            raise MissingKey()
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise MissingKey()
+        body = self.objects[(Bucket, Key)]
+        return {"Body": type("Body", (), {"read": lambda self: body})()}
+
+
+@pytest.mark.asyncio
+async def test_s3_store_round_trip():
+    s3 = FakeS3()
+    store = S3TextStore("contracts", prefix="text/", client=s3)
+    key = content_key(b"docx bytes")
+
+    assert await store.store_text(key, TEXT) == key
+    assert list(s3.objects) == [("contracts", f"text/{key}.md.zst")]
+    assert await store.get(key) == TEXT
+    assert await store.get(content_key(b"other")) is None
+
+
+@pytest.mark.asyncio
+async def test_delete_reports_bytes_freed(tmp_path):
+    store = LocalTextStore(str(tmp_path))
+    key = content_key(b"expired upload")
+    await store.put(key, TEXT)
+
+    path = tmp_path / key[:2] / key[2:4] / f"{key}.md.zst"
+    size = os.path.getsize(path)
+    assert await store.delete(key) == size
+    assert not path.exists()
+    assert await store.delete(key) == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_keeps_blobs_written_or_reused_recently(tmp_path):
+    store = LocalTextStore(str(tmp_path))
+    key = content_key(b"re-uploaded")
+    await store.put(key, TEXT)
+    path = tmp_path / key[:2] / key[2:4] / f"{key}.md.zst"
+    os.utime(path, (1000, 1000))
+
+    # Storing the same text again re-uses the blob and refreshes it
+    assert await store.put(key, TEXT) is False
+    assert await store.delete(key, written_before=2000) == 0
+    assert path.exists()
+
+    os.utime(path, (1000, 1000))
+    assert await store.delete(key, written_before=2000) > 0